@@ -5,7 +5,11 @@ import os
 DB_PATH = "attendance.db"
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+    from app.profiling import QueryTracer, TracedConnection
+    if QueryTracer.enabled:
+        conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
+    else:
+        conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -18,10 +22,18 @@ def create_app():
     from app.routes.dashboard_routes import dashboard_bp
     from app.routes.attendance_routes import attendance_bp
     from app.routes.admin_routes import admin_bp
+    from app.routes.metrics_routes import metrics_bp
+    from app.routes.analytics_routes import analytics_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(attendance_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(analytics_bp)
+
+    # Opt-in request timing / query tracing (PROFILE_REQUESTS, TRACE_QUERIES)
+    from app.profiling import init_profiling
+    init_profiling(app)
 
     return app
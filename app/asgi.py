@@ -0,0 +1,105 @@
+import asyncio
+import os
+import re
+from urllib.parse import parse_qs
+
+from flask import session
+
+from app import create_app
+from app.services.attendance_service import AttendanceService
+from app.services.recognition_session import RecognitionSessions
+from app.services.stream_hub import StreamHub
+
+# ASGI serving mode
+# -----------------------------------------------------------------------------------------
+# /video_feed/<subject_id> is served natively as an async MJPEG stream from a StreamHub;
+# every other route goes to the regular Flask app through asgiref's WSGI adapter
+# (installed with `pip install "flask[async]"`). Like the Flask route, the stream needs
+# the `?session=` id of a live recognition session the logged-in teacher started for
+# that subject (404 otherwise); the session's Stop button then ends it.
+#
+#   uvicorn asgi:application --host 0.0.0.0 --port 5000
+# -----------------------------------------------------------------------------------------
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:
+    raise ImportError("ASGI mode needs asgiref: pip install 'flask[async]' uvicorn")
+
+VIDEO_FEED = re.compile(r"^/video_feed/(\d+)$")
+BOUNDARY_HEADERS = [
+    (b"content-type", b"multipart/x-mixed-replace; boundary=frame"),
+    (b"cache-control", b"no-cache, no-store"),
+]
+
+flask_app = create_app()
+wsgi = WsgiToAsgi(flask_app)
+hub = StreamHub(AttendanceService.gen_frames, max_streams=int(os.environ.get("MAX_STREAMS", "8")))
+
+
+def _teacher_id(scope):
+    """teacher_id from the Flask session cookie of an ASGI request, or None."""
+    headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope.get("headers", [])]
+    with flask_app.test_request_context(scope["path"], headers=headers):
+        return session.get("teacher_id")
+
+
+async def _plain(send, status, text, headers=()):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8"), *headers]})
+    await send({"type": "http.response.body", "body": text.encode()})
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _stream(broadcast, send):
+    async for chunk in broadcast.frames():
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def video_feed(subject_id, scope, receive, send):
+    session_id = parse_qs(scope.get("query_string", b"").decode()).get("session", [""])[0]
+    live = RecognitionSessions.get(session_id)
+    if live is None or live.subject_id != subject_id or live.teacher_id != _teacher_id(scope):
+        return await _plain(send, 404, "No live session for this subject; start one first.")
+    broadcast = hub.subscribe(subject_id, live)
+    if broadcast is None:
+        return await _plain(send, 503, "Too many live streams; try again shortly.", [(b"retry-after", b"5")])
+    await send({"type": "http.response.start", "status": 200, "headers": BOUNDARY_HEADERS})
+
+    streaming = asyncio.ensure_future(_stream(broadcast, send))
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await asyncio.wait({streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (streaming, disconnected):
+            task.cancel()
+        hub.unsubscribe(broadcast)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            RecognitionSessions.stop_all()
+            hub.executor.shutdown(wait=False, cancel_futures=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] == "http" and scope["method"] == "GET":
+        match = VIDEO_FEED.match(scope["path"])
+        if match:
+            return await video_feed(int(match.group(1)), scope, receive, send)
+    return await wsgi(scope, receive, send)
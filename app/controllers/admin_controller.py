@@ -1,7 +1,11 @@
-from flask import render_template, request, redirect, url_for, session, flash
+from flask import render_template, request, redirect, url_for, session, flash, jsonify
 from app.services.auth_service import AuthService
 from app.services.dashboard_service import DashboardService
 from app.services.admin_service import AdminService
+from app.services.page_cache import PageCache
+
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 100
 
 class AdminController:
     @staticmethod
@@ -42,18 +46,33 @@ class AdminController:
         if "admin_id" not in session:
             return redirect(url_for("admin.login"))
 
-        teachers = AdminService.get_all_teachers()
-        students = AdminService.get_all_students()
-        attendance_records = AdminService.get_all_attendance()
-        
-        # Keep old service reading for compatibility if needed, using new service primarily
-        return render_template(
-            "admin_dashboard.html", 
-            admin_name=session["admin_name"], 
-            teachers=teachers,
-            students=students,
-            attendance_records=attendance_records
-        )
+        # Only the shell is rendered here; the tabs page through /admin/api/*
+        return PageCache.respond(
+            "admin_dashboard", None, session["admin_id"],
+            lambda: render_template("admin_dashboard.html", admin_name=session["admin_name"],
+                                    per_page=DEFAULT_PER_PAGE))
+
+    # --- PAGINATED JSON (dashboard tabs) ---
+    @staticmethod
+    def _page(fetch):
+        if "admin_id" not in session:
+            return jsonify(error="login required"), 401
+        page = max(1, request.args.get("page", 1, type=int))
+        per_page = min(MAX_PER_PAGE, max(1, request.args.get("per_page", DEFAULT_PER_PAGE, type=int)))
+        items, total = fetch(per_page, (page - 1) * per_page)
+        return jsonify(items=items, total=total, page=page, per_page=per_page)
+
+    @staticmethod
+    def api_teachers():
+        return AdminController._page(AdminService.get_teachers_page)
+
+    @staticmethod
+    def api_students():
+        return AdminController._page(AdminService.get_students_page)
+
+    @staticmethod
+    def api_attendance():
+        return AdminController._page(AdminService.get_attendance_page)
 
     # --- TEACHER CRUD ---
     @staticmethod
@@ -0,0 +1,57 @@
+from flask import jsonify, request, session
+from app.services.analytics_service import AnalyticsService
+
+class AnalyticsController:
+    @staticmethod
+    def _authorized():
+        return "teacher_id" in session or "admin_id" in session
+
+    @staticmethod
+    def _range():
+        return (AnalyticsService.parse_date(request.args.get("start")),
+                AnalyticsService.parse_date(request.args.get("end")))
+
+    @staticmethod
+    def _respond(build):
+        if not AnalyticsController._authorized():
+            return jsonify(error="login required"), 401
+        try:
+            return jsonify(build())
+        except ValueError as e:
+            return jsonify(error=f"bad parameter: {e}"), 400
+
+    @staticmethod
+    def daily(subject_id):
+        def build():
+            start, end = AnalyticsController._range()
+            return {"subject_id": subject_id, "start": start, "end": end,
+                    "days": AnalyticsService.daily_counts(subject_id, start, end)}
+        return AnalyticsController._respond(build)
+
+    @staticmethod
+    def arrivals(subject_id):
+        def build():
+            start, end = AnalyticsController._range()
+            bucket = int(request.args.get("bucket", 15))
+            if not 1 <= bucket <= 240:
+                raise ValueError("bucket must be 1-240 minutes")
+            return {"subject_id": subject_id, "start": start, "end": end, "bucket_minutes": bucket,
+                    "buckets": AnalyticsService.arrival_distribution(subject_id, start, end, bucket)}
+        return AnalyticsController._respond(build)
+
+    @staticmethod
+    def heatmap(subject_id=None):
+        def build():
+            start, end = AnalyticsController._range()
+            return {"subject_id": subject_id, "start": start, "end": end,
+                    **AnalyticsService.weekday_hour_heatmap(subject_id, start, end)}
+        return AnalyticsController._respond(build)
+
+    @staticmethod
+    def students():
+        def build():
+            start, end = AnalyticsController._range()
+            subject_id = request.args.get("subject_id", type=int)
+            return {"subject_id": subject_id, "start": start, "end": end,
+                    "students": AnalyticsService.student_percentages(start, end, subject_id)}
+        return AnalyticsController._respond(build)
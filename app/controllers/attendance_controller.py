@@ -1,5 +1,7 @@
-from flask import render_template, Response, session, redirect, url_for
+from flask import render_template, Response, session, redirect, url_for, request, jsonify
 from app.services.attendance_service import AttendanceService
+from app.services.page_cache import PageCache
+from app.services.recognition_session import RecognitionSessions
 
 class AttendanceController:
     @staticmethod
@@ -8,10 +10,49 @@ class AttendanceController:
             return redirect(url_for("auth.login"))
         return render_template("camera_attendance.html", subject_id=subject_id)
 
+    @staticmethod
+    def _live_session(session_id):
+        """The caller's live session, or None."""
+        live = RecognitionSessions.get(session_id)
+        if live is None or live.teacher_id != session.get("teacher_id"):
+            return None
+        return live
+
+    @staticmethod
+    def start_session(subject_id):
+        if "teacher_id" not in session:
+            return jsonify(error="login required"), 401
+        live = RecognitionSessions.start(subject_id, session["teacher_id"])
+        return jsonify(
+            session_id=live.id,
+            video_url=url_for("attendance.video_feed", subject_id=subject_id, session=live.id),
+            heartbeat_url=url_for("attendance.heartbeat_session", session_id=live.id),
+            stop_url=url_for("attendance.stop_session", session_id=live.id),
+            idle_timeout=RecognitionSessions.idle_timeout,
+        )
+
+    @staticmethod
+    def heartbeat_session(session_id):
+        live = AttendanceController._live_session(session_id)
+        if live is None:
+            return jsonify(error="session ended"), 404
+        live.heartbeat()
+        return jsonify(ok=True)
+
+    @staticmethod
+    def stop_session(session_id):
+        if AttendanceController._live_session(session_id) is None:
+            return jsonify(stopped=False, error="session ended"), 404
+        released = RecognitionSessions.stop(session_id)
+        return jsonify(stopped=True, released=bool(released))
+
     @staticmethod
     def video_feed(subject_id):
+        live = AttendanceController._live_session(request.args.get("session", ""))
+        if live is None or live.subject_id != subject_id:
+            return Response("No live session for this subject; start one first.", status=404)
         return Response(
-            AttendanceService.gen_frames(subject_id),
+            AttendanceService.gen_frames(subject_id, live),
             mimetype="multipart/x-mixed-replace; boundary=frame"
         )
 
@@ -20,11 +61,13 @@ class AttendanceController:
         if "teacher_id" not in session:
             return redirect(url_for("auth.login"))
 
-        records, student_stats = AttendanceService.get_attendance_stats(subject_id)
+        def build():
+            records, student_stats = AttendanceService.get_attendance_stats(subject_id)
+            return render_template(
+                "attendance.html",
+                records=records,
+                student_stats=student_stats,
+                subject_id=subject_id
+            )
 
-        return render_template(
-            "attendance.html",
-            records=records,
-            student_stats=student_stats,
-            subject_id=subject_id
-        )
+        return PageCache.respond("view_records", subject_id, session["teacher_id"], build)
@@ -1,5 +1,6 @@
 from flask import render_template, session, redirect, url_for, request, flash
 from app.services.dashboard_service import DashboardService
+from app.services.page_cache import PageCache
 from datetime import datetime
 
 class DashboardController:
@@ -9,14 +10,19 @@ class DashboardController:
             return redirect(url_for("auth.login"))
 
         teacher_id = session["teacher_id"]
-        teacher_name, subjects = DashboardService.get_teacher_dashboard(teacher_id)
 
-        return render_template(
-            "dashboard.html",
-            teacher_name=teacher_name,
-            subjects=subjects,
-            now=datetime.now()
-        )
+        def build():
+            teacher_name, subjects = DashboardService.get_teacher_dashboard(teacher_id)
+            return render_template(
+                "dashboard.html",
+                teacher_name=teacher_name,
+                subjects=subjects,
+                now=datetime.now()
+            )
+
+        # The page shows today's date, so it is cached per day
+        return PageCache.respond("dashboard", teacher_id, teacher_id, build,
+                                 extra=datetime.now().strftime("%Y-%m-%d"))
 
     @staticmethod
     def add_subject():
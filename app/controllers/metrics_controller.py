@@ -0,0 +1,15 @@
+import os
+from flask import Response
+from app.services.inference_service import InferenceClient
+from app.services.metrics_service import MetricsService
+
+class MetricsController:
+    @staticmethod
+    def metrics():
+        # Recognition stages run in the inference worker when there is one
+        inference_socket = os.environ.get("INFERENCE_SOCKET")
+        remote = InferenceClient.fetch_metrics(inference_socket) if inference_socket else None
+        return Response(
+            MetricsService.render_prometheus(remote),
+            mimetype="text/plain; version=0.0.4"
+        )
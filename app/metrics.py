@@ -0,0 +1,178 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Low-overhead in-process metrics, exposed at /metrics in Prometheus text format.
+# Each metric is a few floats updated under a lock; no external dependency needed.
+# This module only depends on the standard library, so any layer can record metrics
+# without pulling in the services; the service-level metrics live in metrics_service.
+# Every repository query is timed into DB_QUERY_SECONDS (label query=<method name>).
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple((k, labels[k]) for k in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple((k, labels[k]) for k in self.label_names)
+        return self._values.get(key, 0)
+
+    def render(self, extra=()):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values) or {(): 0}
+        for key, value in values.items():
+            lines.append(f"{self.name}{_format_labels(key + extra)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        key = tuple((k, labels[k]) for k in self.label_names)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = tuple((k, labels[k]) for k in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple((k, labels[k]) for k in self.label_names)
+        return self._values.get(key, 0)
+
+    def remove(self, **labels):
+        """Drop every series matching the given labels (e.g. a stream that ended)."""
+        with self._lock:
+            for key in [k for k in self._values if all((n, v) in k for n, v in labels.items())]:
+                del self._values[key]
+
+    def render(self, extra=()):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            values = dict(self._values) or ({(): 0} if not self.label_names else {})
+        for key, value in values.items():
+            lines.append(f"{self.name}{_format_labels(key + extra)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((k, labels[k]) for k in self.label_names)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (last slot is +Inf), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self, extra=()):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = [(k + extra, (list(v[0]), v[1], v[2])) for k, v in self._series.items()]
+        for key, (counts, total, count) in series_items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                labels = key + (("le", bound),)
+                lines.append(f"{self.name}_bucket{_format_labels(labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsService:
+    _metrics = []
+
+    @staticmethod
+    def register(metric):
+        MetricsService._metrics.append(metric)
+        return metric
+
+    @staticmethod
+    def timed(histogram, **labels):
+        """Decorator recording each call's duration in `histogram`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def export(**labels):
+        """{metric name: rendered lines} with `labels` added to every series, for merging
+        this process's metrics into another process's /metrics."""
+        extra = tuple(labels.items())
+        return {metric.name: metric.render(extra) for metric in MetricsService._metrics}
+
+    @staticmethod
+    def render_prometheus(remote=None):
+        """Prometheus text of this process's metrics. `remote` is an export() from another
+        process; its series are appended to the matching family (HELP/TYPE once)."""
+        remote = dict(remote or {})
+        lines = []
+        for metric in MetricsService._metrics:
+            lines.extend(metric.render())
+            lines.extend(remote.pop(metric.name, [])[2:])
+        for family in remote.values():
+            lines.extend(family)
+        return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# DATABASE
+# -----------------------------
+DB_QUERY_SECONDS = MetricsService.register(Histogram(
+    "attendance_db_query_seconds", "Repository call latency", label_names=("query",)))
+DB_ERRORS = MetricsService.register(Counter(
+    "attendance_db_errors_total", "Repository calls that failed, by error kind (locked = SQLite 'database is locked')",
+    ("query", "error")))
@@ -0,0 +1,198 @@
+import os
+import sqlite3
+import sys
+import time
+import threading
+import weakref
+from collections import defaultdict, deque
+from flask import g, request
+
+from app.metrics import MetricsService, Histogram
+
+# Opt-in profiling for the Flask app.
+#   PROFILE_REQUESTS=1   -> per-route latency percentiles, logged every REQUEST_LOG_EVERY hits
+#   TRACE_QUERIES=1      -> SQL text, duration and rows for every repository query;
+#                           queries slower than SLOW_QUERY_MS are logged with their call site
+
+REQUEST_SECONDS = MetricsService.register(Histogram(
+    "http_request_seconds", "Flask request latency", label_names=("endpoint",)))
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_ROOT_DIR = os.path.dirname(_PACKAGE_DIR)
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes", "on")
+
+
+def _percentile(sorted_values, pct):
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class RequestTimer:
+    def __init__(self, log_every=100, window=1000):
+        self.log_every = log_every
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.hits = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._stop)
+
+    def _start(self):
+        g._request_started = time.perf_counter()
+
+    def _stop(self, response):
+        started = g.pop("_request_started", None)
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or "unmatched"
+        REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+
+        with self.lock:
+            self.samples[endpoint].append(elapsed)
+            self.hits[endpoint] += 1
+            should_log = self.hits[endpoint] % self.log_every == 0
+            snapshot = sorted(self.samples[endpoint]) if should_log else None
+
+        if snapshot:
+            print(f"[TIMING] {endpoint}: n={len(snapshot)} "
+                  f"p50={_percentile(snapshot, 50) * 1000:.1f}ms "
+                  f"p95={_percentile(snapshot, 95) * 1000:.1f}ms "
+                  f"p99={_percentile(snapshot, 99) * 1000:.1f}ms")
+        return response
+
+    def summary(self):
+        with self.lock:
+            items = {k: sorted(v) for k, v in self.samples.items()}
+        return {
+            endpoint: {
+                "count": self.hits[endpoint],
+                "p50_ms": round(_percentile(v, 50) * 1000, 2),
+                "p95_ms": round(_percentile(v, 95) * 1000, 2),
+                "p99_ms": round(_percentile(v, 99) * 1000, 2),
+            }
+            for endpoint, v in items.items() if v
+        }
+
+
+# -----------------------------
+# QUERY TRACING
+# -----------------------------
+def _call_site():
+    # First frame outside this module and the app/__init__ connection helper.
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and not filename.endswith(os.path.join("app", "__init__.py")):
+            return f"{os.path.relpath(filename, _ROOT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryTracer:
+    enabled = _env_flag("TRACE_QUERIES")
+    slow_ms = float(os.environ.get("SLOW_QUERY_MS", "100"))
+    records = deque(maxlen=1000)
+
+    @staticmethod
+    def record(sql, duration, rows, call_site):
+        entry = {
+            "sql": " ".join(sql.split()),
+            "duration_ms": round(duration * 1000, 3),
+            "rows": rows,
+            "call_site": call_site,
+        }
+        QueryTracer.records.append(entry)
+        if entry["duration_ms"] >= QueryTracer.slow_ms:
+            print(f"[SLOW QUERY] {entry['duration_ms']:.1f}ms rows={rows} at {call_site}: {entry['sql']}")
+
+
+class TracedCursor(sqlite3.Cursor):
+    # sqlite steps SELECTs lazily, so fetch time counts towards the query.
+    # The trace is flushed on the next execute or when the cursor/connection closes.
+    _trace = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self._trace = [sql, 0.0, 0, _call_site()]
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._trace[1] += time.perf_counter() - start
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        self._trace = [sql, 0.0, 0, _call_site()]
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._trace[1] += time.perf_counter() - start
+
+    def _timed_fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        if self._trace is not None:
+            self._trace[1] += time.perf_counter() - start
+            if isinstance(result, list):
+                self._trace[2] += len(result)
+            elif result is not None:
+                self._trace[2] += 1
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._timed_fetch(super().fetchmany)
+        return self._timed_fetch(super().fetchmany, size)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def _finish(self):
+        if self._trace is None:
+            return
+        sql, duration, rows, call_site = self._trace
+        self._trace = None
+        if rows == 0 and self.rowcount > 0:
+            rows = self.rowcount  # INSERT/UPDATE/DELETE
+        QueryTracer.record(sql, duration, rows, call_site)
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class TracedConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=TracedCursor):
+        cur = super().cursor(factory)
+        if isinstance(cur, TracedCursor):
+            self._cursors.add(cur)
+        return cur
+
+    def close(self):
+        for cur in list(self._cursors):
+            cur._finish()
+        super().close()
+
+
+def init_profiling(app):
+    if _env_flag("PROFILE_REQUESTS"):
+        timer = RequestTimer(log_every=int(os.environ.get("REQUEST_LOG_EVERY", "100")))
+        timer.init_app(app)
+        app.extensions["request_timer"] = timer
+        print("[INFO] Request timing enabled.")
+    if QueryTracer.enabled:
+        print(f"[INFO] Query tracing enabled (slow threshold {QueryTracer.slow_ms:.0f}ms).")
@@ -0,0 +1,96 @@
+from app import get_db_connection
+from app.metrics import MetricsService, DB_QUERY_SECONDS
+
+# Aggregates are computed in SQLite, never by pulling raw rows into Python.
+# `start`/`end` are inclusive YYYY-MM-DD strings; None leaves that side open.
+# The (subject_id, date, time) and (date, student_name) indexes from database_setup.py
+# make every query below an index range scan.
+
+_MINUTES = "(CAST(substr(time, 1, 2) AS INTEGER) * 60 + CAST(substr(time, 4, 2) AS INTEGER))"
+
+
+def _date_filter(start, end, subject_id=None):
+    clauses, params = [], []
+    if subject_id is not None:
+        clauses.append("subject_id = ?")
+        params.append(subject_id)
+    if start:
+        clauses.append("date >= ?")
+        params.append(start)
+    if end:
+        clauses.append("date <= ?")
+        params.append(end)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class AnalyticsRepository:
+    @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="analytics_daily_counts")
+    def daily_counts(subject_id, start=None, end=None):
+        where, params = _date_filter(start, end, subject_id)
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(f"SELECT date, COUNT(*) AS present FROM attendance{where} GROUP BY date ORDER BY date", params)
+        rows = [dict(row) for row in cur.fetchall()]
+        conn.close()
+        return rows
+
+    @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="analytics_student_percentages")
+    def student_percentages(start=None, end=None, subject_id=None):
+        """Per student: classes attended vs. classes held (distinct subject/date pairs)."""
+        where, params = _date_filter(start, end, subject_id)
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(f"""
+            WITH held AS (
+                SELECT COUNT(*) AS total FROM (SELECT DISTINCT subject_id, date FROM attendance{where})
+            )
+            SELECT student_name,
+                   COUNT(*) AS attended,
+                   COUNT(DISTINCT subject_id) AS subjects,
+                   held.total AS total,
+                   ROUND(100.0 * COUNT(*) / held.total, 1) AS percentage
+            FROM attendance, held{where}
+            GROUP BY student_name
+            ORDER BY percentage DESC, student_name
+        """, params + params)
+        rows = [dict(row) for row in cur.fetchall()]
+        conn.close()
+        return rows
+
+    @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="analytics_arrival_distribution")
+    def arrival_distribution(subject_id, start=None, end=None, bucket_minutes=15):
+        where, params = _date_filter(start, end, subject_id)
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT ({_MINUTES} / ?) * ? AS minute, COUNT(*) AS arrivals
+            FROM attendance{where}
+            GROUP BY minute ORDER BY minute
+        """, [bucket_minutes, bucket_minutes] + params)
+        rows = [
+            {"time": f"{row['minute'] // 60:02d}:{row['minute'] % 60:02d}", "arrivals": row["arrivals"]}
+            for row in cur.fetchall()
+        ]
+        conn.close()
+        return rows
+
+    @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="analytics_weekday_hour")
+    def weekday_hour_counts(subject_id=None, start=None, end=None):
+        """Arrivals per (weekday, hour); weekday 0 = Sunday as in SQLite's strftime('%w')."""
+        where, params = _date_filter(start, end, subject_id)
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT CAST(strftime('%w', date) AS INTEGER) AS weekday,
+                   CAST(substr(time, 1, 2) AS INTEGER) AS hour,
+                   COUNT(*) AS arrivals
+            FROM attendance{where}
+            GROUP BY weekday, hour
+        """, params)
+        rows = cur.fetchall()
+        conn.close()
+        return [(row["weekday"], row["hour"], row["arrivals"]) for row in rows]
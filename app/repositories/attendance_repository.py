@@ -1,9 +1,13 @@
 from app import get_db_connection
+from app.services.analytics_service import AnalyticsService
+from app.metrics import MetricsService, DB_QUERY_SECONDS, DB_ERRORS
+from app.services.page_cache import PageCache
 import sqlite3
 from datetime import datetime
 
 class AttendanceRepository:
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="mark_attendance")
     def mark_attendance(subject_id, student_name):
         today = datetime.now().strftime("%Y-%m-%d")
         now_time = datetime.now().strftime("%H:%M:%S")
@@ -26,15 +30,81 @@ class AttendanceRepository:
                 (subject_id, student_name, today, now_time)
             )
             conn.commit()
+            PageCache.attendance_changed(subject_id)
+            AnalyticsService.invalidate(subject_id, today)
             print(f"[ATTENDANCE] Marked {student_name} for Subject ID {subject_id} at {now_time}")
             return True
         except sqlite3.Error as e:
             print(f"[ERROR] Database error: {e}")
+            DB_ERRORS.inc(query="mark_attendance", error="locked" if "locked" in str(e) else "other")
             return False
         finally:
             conn.close()
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_marked_students")
+    def get_marked_students(subject_id, date):
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT student_name FROM attendance WHERE subject_id = ? AND date = ?",
+            (subject_id, date)
+        )
+        names = [row["student_name"] for row in cur.fetchall()]
+        conn.close()
+        return names
+
+    @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="insert_attendance")
+    def insert_attendance(subject_id, student_name, date, time):
+        """Single round-trip insert; the UNIQUE(subject_id, student_name, date)
+        constraint does the duplicate check. True if a row was added.
+        Raises sqlite3.Error so callers can retry."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "INSERT OR IGNORE INTO attendance (subject_id, student_name, date, time) VALUES (?, ?, ?, ?)",
+                (subject_id, student_name, date, time)
+            )
+            conn.commit()
+            if cur.rowcount != 1:
+                return False
+            PageCache.attendance_changed(subject_id)
+            AnalyticsService.invalidate(subject_id, date)
+            return True
+        finally:
+            conn.close()
+
+    @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="update_attendance")
+    def update_attendance(record_id, student_name, date, time):
+        """Admin edit of one record. Raises sqlite3.Error."""
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("UPDATE attendance SET student_name = ?, date = ?, time = ? WHERE id = ?",
+                        (student_name, date, time, record_id))
+            conn.commit()
+        finally:
+            conn.close()
+        # The record may have moved between dates, so widen to every subject / date
+        PageCache.attendance_changed()
+        AnalyticsService.invalidate()
+
+    @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="delete_attendance")
+    def delete_attendance(record_id):
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute("DELETE FROM attendance WHERE id = ?", (record_id,))
+        conn.commit()
+        conn.close()
+        PageCache.attendance_changed()
+        AnalyticsService.invalidate()
+
+    @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_records_by_subject")
     def get_records_by_subject(subject_id):
         conn = get_db_connection()
         cur = conn.cursor()
@@ -47,6 +117,7 @@ class AttendanceRepository:
         return records
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_total_classes_by_subject")
     def get_total_classes_by_subject(subject_id):
         conn = get_db_connection()
         cur = conn.cursor()
@@ -56,6 +127,7 @@ class AttendanceRepository:
         return total_classes
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_student_stats_by_subject")
     def get_student_stats_by_subject(subject_id):
         conn = get_db_connection()
         cur = conn.cursor()
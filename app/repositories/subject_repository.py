@@ -1,7 +1,11 @@
 from app import get_db_connection
+from app.metrics import MetricsService, DB_QUERY_SECONDS
+from app.services.analytics_service import AnalyticsService
+from app.services.page_cache import PageCache
 
 class SubjectRepository:
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="create_subject")
     def create_subject(teacher_id, subject_name):
         conn = get_db_connection()
         cur = conn.cursor()
@@ -11,8 +15,10 @@ class SubjectRepository:
         )
         conn.commit()
         conn.close()
+        PageCache.teacher_changed(teacher_id)
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_subjects_by_teacher_id")
     def get_subjects_by_teacher_id(teacher_id):
         conn = get_db_connection()
         cur = conn.cursor()
@@ -25,6 +31,7 @@ class SubjectRepository:
         return subjects
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_all_subjects")
     def get_all_subjects():
         conn = get_db_connection()
         cur = conn.cursor()
@@ -34,9 +41,13 @@ class SubjectRepository:
         return subjects
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="delete_subject")
     def delete_subject(subject_id):
         conn = get_db_connection()
         cur = conn.cursor()
         cur.execute("DELETE FROM subjects WHERE id = ?", (subject_id,))
         conn.commit()
         conn.close()
+        PageCache.teacher_changed()
+        PageCache.attendance_changed(subject_id)
+        AnalyticsService.invalidate(subject_id)
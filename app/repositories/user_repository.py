@@ -1,8 +1,11 @@
 from app import get_db_connection
+from app.metrics import MetricsService, DB_QUERY_SECONDS
+from app.services.page_cache import PageCache
 import sqlite3
 
 class UserRepository:
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_teacher_by_email")
     def get_teacher_by_email(email):
         conn = get_db_connection()
         cur = conn.cursor()
@@ -12,6 +15,7 @@ class UserRepository:
         return teacher
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="create_teacher")
     def create_teacher(name, email, password_hash):
         conn = get_db_connection()
         cur = conn.cursor()
@@ -22,6 +26,7 @@ class UserRepository:
             )
             teacher_id = cur.lastrowid
             conn.commit()
+            PageCache.teacher_changed(teacher_id)
             return teacher_id
         except sqlite3.IntegrityError:
             conn.rollback()
@@ -30,6 +35,7 @@ class UserRepository:
             conn.close()
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_teacher_by_id")
     def get_teacher_by_id(teacher_id):
         conn = get_db_connection()
         cur = conn.cursor()
@@ -39,6 +45,7 @@ class UserRepository:
         return teacher
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_all_teachers")
     def get_all_teachers():
         conn = get_db_connection()
         cur = conn.cursor()
@@ -48,6 +55,7 @@ class UserRepository:
         return teachers
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="count_admins")
     def count_admins():
         conn = get_db_connection()
         cur = conn.cursor()
@@ -57,6 +65,7 @@ class UserRepository:
         return count
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="create_admin")
     def create_admin(name, email, password_hash):
         conn = get_db_connection()
         cur = conn.cursor()
@@ -74,6 +83,7 @@ class UserRepository:
             conn.close()
 
     @staticmethod
+    @MetricsService.timed(DB_QUERY_SECONDS, query="get_admin_by_email")
     def get_admin_by_email(email):
         conn = get_db_connection()
         cur = conn.cursor()
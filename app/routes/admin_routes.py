@@ -15,6 +15,19 @@ def login():
 def dashboard():
     return AdminController.dashboard()
 
+# Dashboard tab data (JSON, paginated)
+@admin_bp.route("/api/teachers")
+def api_teachers():
+    return AdminController.api_teachers()
+
+@admin_bp.route("/api/students")
+def api_students():
+    return AdminController.api_students()
+
+@admin_bp.route("/api/attendance")
+def api_attendance():
+    return AdminController.api_attendance()
+
 # Teachers
 @admin_bp.route("/teacher/add", methods=["POST"])
 def add_teacher():
@@ -0,0 +1,24 @@
+from flask import Blueprint
+from app.controllers.analytics_controller import AnalyticsController
+
+analytics_bp = Blueprint("analytics", __name__, url_prefix="/analytics")
+
+@analytics_bp.route("/subject/<int:subject_id>/daily")
+def daily(subject_id):
+    return AnalyticsController.daily(subject_id)
+
+@analytics_bp.route("/subject/<int:subject_id>/arrivals")
+def arrivals(subject_id):
+    return AnalyticsController.arrivals(subject_id)
+
+@analytics_bp.route("/subject/<int:subject_id>/heatmap")
+def subject_heatmap(subject_id):
+    return AnalyticsController.heatmap(subject_id)
+
+@analytics_bp.route("/heatmap")
+def heatmap():
+    return AnalyticsController.heatmap()
+
+@analytics_bp.route("/students")
+def students():
+    return AnalyticsController.students()
@@ -7,6 +7,18 @@ attendance_bp = Blueprint("attendance", __name__)
 def start_attendance(subject_id):
     return AttendanceController.start_attendance(subject_id)
 
+@attendance_bp.route("/attendance/session/<int:subject_id>/start", methods=["POST"])
+def start_session(subject_id):
+    return AttendanceController.start_session(subject_id)
+
+@attendance_bp.route("/attendance/session/<session_id>/heartbeat", methods=["POST"])
+def heartbeat_session(session_id):
+    return AttendanceController.heartbeat_session(session_id)
+
+@attendance_bp.route("/attendance/session/<session_id>/stop", methods=["POST"])
+def stop_session(session_id):
+    return AttendanceController.stop_session(session_id)
+
 @attendance_bp.route("/video_feed/<int:subject_id>")
 def video_feed(subject_id):
     return AttendanceController.video_feed(subject_id)
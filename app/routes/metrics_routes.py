@@ -0,0 +1,8 @@
+from flask import Blueprint
+from app.controllers.metrics_controller import MetricsController
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route("/metrics")
+def metrics():
+    return MetricsController.metrics()
@@ -1,27 +1,36 @@
 from app import get_db_connection
 import sqlite3
+from app.repositories.attendance_repository import AttendanceRepository
 from app.repositories.subject_repository import SubjectRepository
+from app.services.attendance_session import AttendanceSession
+from app.services.page_cache import PageCache
 
 class AdminService:
     # -----------------------------
     # TEACHER MANAGEMENT
     # -----------------------------
     @staticmethod
-    def get_all_teachers():
+    def get_teachers_page(limit, offset):
+        """One page of teachers with their subjects, and the total count."""
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute("SELECT * FROM teachers")
-        start_teachers = cur.fetchall()
-        
-        # Convert to list of dicts and fetch subjects
-        teachers = []
-        for row in start_teachers:
-            t = dict(row)
-            t["subjects"] = SubjectRepository.get_subjects_by_teacher_id(t["id"])
-            teachers.append(t)
-            
+        cur.execute("SELECT COUNT(*) FROM teachers")
+        total = cur.fetchone()[0]
+        cur.execute("SELECT id, name, email FROM teachers ORDER BY id LIMIT ? OFFSET ?", (limit, offset))
+        teachers = [dict(row, subjects=[]) for row in cur.fetchall()]
+
+        # Subjects for the whole page in one query
+        by_id = {t["id"]: t for t in teachers}
+        if by_id:
+            placeholders = ",".join("?" * len(by_id))
+            cur.execute(
+                f"SELECT id, teacher_id, subject_name as name FROM subjects WHERE teacher_id IN ({placeholders}) ORDER BY id",
+                list(by_id))
+            for row in cur.fetchall():
+                by_id[row["teacher_id"]]["subjects"].append({"id": row["id"], "name": row["name"]})
+
         conn.close()
-        return teachers
+        return teachers, total
 
     @staticmethod
     def add_teacher(name, email, password):
@@ -30,6 +39,7 @@ class AdminService:
         try:
             cur.execute("INSERT INTO teachers (name, email, password) VALUES (?, ?, ?)", (name, email, password))
             conn.commit()
+            PageCache.teacher_changed(cur.lastrowid)
             return True, "Teacher added successfully"
         except sqlite3.IntegrityError:
             return False, "Email already exists"
@@ -43,6 +53,7 @@ class AdminService:
         try:
             cur.execute("UPDATE teachers SET name = ?, email = ? WHERE id = ?", (name, email, teacher_id))
             conn.commit()
+            PageCache.teacher_changed(teacher_id)
             return True, "Teacher updated successfully"
         except sqlite3.IntegrityError:
             return False, "Email already exists"
@@ -58,6 +69,7 @@ class AdminService:
         cur.execute("DELETE FROM teachers WHERE id = ?", (teacher_id,))
         conn.commit()
         conn.close()
+        PageCache.teacher_changed(teacher_id)
         return True, "Teacher deleted"
 
     # -----------------------------
@@ -83,13 +95,15 @@ class AdminService:
     # STUDENT MANAGEMENT
     # -----------------------------
     @staticmethod
-    def get_all_students():
+    def get_students_page(limit, offset):
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute("SELECT * FROM students")
-        students = cur.fetchall()
+        cur.execute("SELECT COUNT(*) FROM students")
+        total = cur.fetchone()[0]
+        cur.execute("SELECT id, name, roll_number, email FROM students ORDER BY id LIMIT ? OFFSET ?", (limit, offset))
+        students = [dict(row) for row in cur.fetchall()]
         conn.close()
-        return students
+        return students, total
 
     @staticmethod
     def add_student(name, roll_number, email):
@@ -99,6 +113,7 @@ class AdminService:
             cur.execute("INSERT INTO students (name, roll_number, email) VALUES (?, ?, ?)", 
                         (name, roll_number, email))
             conn.commit()
+            PageCache.students_changed()
             return True, "Student added successfully"
         except sqlite3.IntegrityError:
             return False, "Roll number already exists"
@@ -113,6 +128,7 @@ class AdminService:
             cur.execute("UPDATE students SET name = ?, roll_number = ?, email = ? WHERE id = ?", 
                         (name, roll_number, email, student_id))
             conn.commit()
+            PageCache.students_changed()
             return True, "Student updated successfully"
         except sqlite3.IntegrityError:
             return False, "Roll number already exists"
@@ -126,47 +142,48 @@ class AdminService:
         cur.execute("DELETE FROM students WHERE id = ?", (student_id,))
         conn.commit()
         conn.close()
+        PageCache.students_changed()
         return True, "Student deleted"
 
     # -----------------------------
     # ATTENDANCE MANAGEMENT
     # -----------------------------
     @staticmethod
-    def get_all_attendance():
+    def get_attendance_page(limit, offset):
         conn = get_db_connection()
         cur = conn.cursor()
-        # Joining to get subject names
-        query = """
-            SELECT a.id, a.student_name, a.date, a.time, s.subject_name, t.name as teacher_name
+        # Count over the same joins as the page, so rows orphaned by a deleted
+        # subject/teacher don't inflate the pager
+        joins = """
             FROM attendance a
             JOIN subjects s ON a.subject_id = s.id
             JOIN teachers t ON s.teacher_id = t.id
+        """
+        cur.execute("SELECT COUNT(*)" + joins)
+        total = cur.fetchone()[0]
+        # Joining to get subject names; idx_attendance_date_time serves the ORDER BY + LIMIT
+        query = """
+            SELECT a.id, a.student_name, a.date, a.time, s.subject_name, t.name as teacher_name
+        """ + joins + """
             ORDER BY a.date DESC, a.time DESC
+            LIMIT ? OFFSET ?
         """
-        cur.execute(query)
-        records = cur.fetchall()
+        cur.execute(query, (limit, offset))
+        records = [dict(row) for row in cur.fetchall()]
         conn.close()
-        return records
+        return records, total
 
     @staticmethod
     def update_attendance(record_id, student_name, date, time):
-        conn = get_db_connection()
-        cur = conn.cursor()
         try:
-            cur.execute("UPDATE attendance SET student_name = ?, date = ?, time = ? WHERE id = ?", 
-                        (student_name, date, time, record_id))
-            conn.commit()
-            return True, "Attendance record updated"
+            AttendanceRepository.update_attendance(record_id, student_name, date, time)
         except sqlite3.Error as e:
             return False, f"Error: {e}"
-        finally:
-            conn.close()
+        AttendanceSession.invalidate()
+        return True, "Attendance record updated"
 
     @staticmethod
     def delete_attendance(record_id):
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM attendance WHERE id = ?", (record_id,))
-        conn.commit()
-        conn.close()
+        AttendanceRepository.delete_attendance(record_id)
+        AttendanceSession.invalidate()
         return True, "Attendance record deleted"
@@ -0,0 +1,62 @@
+import os
+from datetime import datetime
+from app.repositories.analytics_repository import AnalyticsRepository
+from app.services.cache_service import TTLCache
+
+ANALYTICS_CACHE_TTL = float(os.environ.get("ANALYTICS_CACHE_TTL", "300"))
+
+# Keys are (kind, subject_id or None, start, end, *extra). A write for (subject, date)
+# only drops entries for that subject (or all-subject entries) whose range covers the date.
+cache = TTLCache("analytics", max_entries=512, ttl=ANALYTICS_CACHE_TTL)
+
+
+def _covers(key, subject_id, date):
+    _, key_subject, start, end = key[:4]
+    if subject_id is not None and key_subject is not None and key_subject != subject_id:
+        return False
+    if date is None:
+        return True
+    return (start is None or start <= date) and (end is None or date <= end)
+
+
+class AnalyticsService:
+    @staticmethod
+    def daily_counts(subject_id, start=None, end=None):
+        return cache.get_or_compute(
+            ("daily", subject_id, start, end),
+            lambda: AnalyticsRepository.daily_counts(subject_id, start, end))
+
+    @staticmethod
+    def student_percentages(start=None, end=None, subject_id=None):
+        return cache.get_or_compute(
+            ("students", subject_id, start, end),
+            lambda: AnalyticsRepository.student_percentages(start, end, subject_id))
+
+    @staticmethod
+    def arrival_distribution(subject_id, start=None, end=None, bucket_minutes=15):
+        return cache.get_or_compute(
+            ("arrivals", subject_id, start, end, bucket_minutes),
+            lambda: AnalyticsRepository.arrival_distribution(subject_id, start, end, bucket_minutes))
+
+    @staticmethod
+    def weekday_hour_heatmap(subject_id=None, start=None, end=None):
+        """7x24 grid of arrivals, rows Monday..Sunday."""
+        def compute():
+            grid = [[0] * 24 for _ in range(7)]
+            for weekday, hour, arrivals in AnalyticsRepository.weekday_hour_counts(subject_id, start, end):
+                if 0 <= hour < 24:
+                    grid[(weekday + 6) % 7][hour] = arrivals  # SQLite weekday 0 = Sunday
+            return {"days": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], "hours": list(range(24)), "counts": grid}
+        return cache.get_or_compute(("heatmap", subject_id, start, end), compute)
+
+    @staticmethod
+    def invalidate(subject_id=None, date=None):
+        """Called after attendance is written; None widens to every subject / date."""
+        cache.invalidate(lambda key: _covers(key, subject_id, date))
+
+    @staticmethod
+    def parse_date(value):
+        """Validate an optional YYYY-MM-DD query parameter; raises ValueError."""
+        if not value:
+            return None
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
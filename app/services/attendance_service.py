@@ -1,39 +1,47 @@
 import cv2
 import os
-import pickle
 import time
-import numpy as np
 from app.repositories.attendance_repository import AttendanceRepository
+from app.services.attendance_session import AttendanceSession
+from app.services.face_tracker import FaceTracker
+from app.services.frame_governor import FrameGovernor
+from app.services.recognition_session import RecognitionSessions
+from app.services.motion_gate import MotionGate
+from app.services.recognition_engines import RecognitionEngines
+from app.services.metrics_service import (
+    FRAMES_PROCESSED, FRAMES_DROPPED, FACES_PER_FRAME, STAGE_SECONDS, MOTION_GATE_FRAMES, CAMERAS_OPEN
+)
 
-# Try to import face_recognition and sklearn
-try:
-    import face_recognition
-except ImportError:
-    face_recognition = None
-    print("[ERROR] 'face_recognition' library not found. Install it via pip.")
+# When INFERENCE_SOCKET is set, recognition runs in the shared inference worker
+# (see inference_server.py) and this process never loads dlib or the recognizer.
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET")
 
-# Load Model Global
-MODEL_PATH = "model/recognizer.pickle"
-LE_PATH = "model/le.pickle"
+# Recognition engine per deployment: auto (bundle, else recognizer.pickle), knn, svm, centroid, lbph
+ENGINE_NAME = os.environ.get("RECOGNITION_ENGINE", "auto")
 
-recognizer = None
-le = None
+# Camera index, or a video file / stream URL (CAMERA_SOURCE=0 is the default webcam)
+CAMERA_SOURCE = os.environ.get("CAMERA_SOURCE", "0")
 
-def load_model():
-    global recognizer, le
-    if not os.path.exists(MODEL_PATH) or not os.path.exists(LE_PATH):
-        print(f"[WARN] SVM Model not found at {MODEL_PATH}. Run 'train_classifier.py' first.")
-        return
+# Skip detection on unchanged frames and re-detect only where something moved (MOTION_GATE=0 disables)
+MOTION_GATE_ENABLED = os.environ.get("MOTION_GATE", "1") != "0"
+
+# Load Model Global
+engine = None
 
+def load_model():
+    global engine
     try:
-        recognizer = pickle.loads(open(MODEL_PATH, "rb").read())
-        le = pickle.loads(open(LE_PATH, "rb").read())
-        print("[INFO] Loaded Transformer-based Face Recognition Model (SVM Classifier).")
+        start = time.perf_counter()
+        engine = RecognitionEngines.create(ENGINE_NAME)
+        print(f"[INFO] Loaded '{engine.name}' face recognition engine in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    except ImportError as e:
+        print(f"[ERROR] {e}. Install the missing library via pip (e.g. 'face_recognition').")
     except Exception as e:
         print(f"[ERROR] Failed to load model: {e}")
 
-# Initialize on import
-load_model()
+# Initialize on import (web workers using the inference worker skip this)
+if not INFERENCE_SOCKET:
+    load_model()
 
 class AttendanceService:
     @staticmethod
@@ -57,115 +65,175 @@ class AttendanceService:
         return records, student_stats
 
     @staticmethod
-    def gen_frames(subject_id):
-        cap = cv2.VideoCapture(0)
-        marked = set()
-        
-        # Hyperparameters for Research/Tuning
-        CONF_THRESHOLD = 0.60  # 60% Confidence required
-        
-        if not cap.isOpened():
-            print("[ERROR] Could not open webcam.")
-            return
+    def recognize_faces(rgb_small_frame, skip=(), scale=1.0):
+        """Detect, embed and classify every face in an RGB frame.
 
-        if face_recognition is None:
-            print("[ERROR] Library missing. Cannot run.")
+        Returns (face_locations, face_data) where face_data holds one
+        (name, confidence) pair per location, or None for faces overlapping
+        a `skip` box (not encoded). `scale` is the resize factor from the
+        camera frame. Runs in-process; the inference worker calls this on
+        behalf of web workers.
+        """
+        return engine.recognize(rgb_small_frame, skip, scale)
+
+    @staticmethod
+    def _gated_recognize(recognize, rgb_small_frame, gate, last_locations, skip=(), scale=1.0):
+        """Like recognize(), but face_data is None for faces not classified this frame."""
+        h, w = rgb_small_frame.shape[:2]
+        regions = gate.regions(rgb_small_frame) if gate else [(0, w, h, 0)]
+
+        if regions is None:
+            # Nothing moved: the previous boxes still describe the scene
+            MOTION_GATE_FRAMES.inc(result="static")
+            return last_locations, [None] * len(last_locations)
+
+        if regions == [(0, w, h, 0)]:
+            MOTION_GATE_FRAMES.inc(result="full")
+            return recognize(rgb_small_frame, skip, scale)
+
+        MOTION_GATE_FRAMES.inc(result="partial")
+        face_locations, face_data = [], []
+        # Faces outside every moving region are carried over unchanged
+        for box in last_locations:
+            if not any(MotionGate.overlaps(box, region) for region in regions):
+                face_locations.append(box)
+                face_data.append(None)
+
+        for (top, right, bottom, left) in regions:
+            crop_skip = [(t - top, r - left, b - top, l - left) for (t, r, b, l) in skip
+                         if MotionGate.overlaps((t, r, b, l), (top, right, bottom, left))]
+            crop_locations, crop_data = recognize(rgb_small_frame[top:bottom, left:right], crop_skip, scale)
+            for (t, r, b, l), data in zip(crop_locations, crop_data):
+                face_locations.append((t + top, r + left, b + top, l + left))
+                face_data.append(data)
+        return face_locations, face_data
+
+    @staticmethod
+    def gen_frames(subject_id, session=None):
+        """MJPEG chunks for a subject's camera until the client leaves or `session` stops.
+
+        The camera, inference connection and governor slot are released on every exit path.
+        """
+        if session is not None and not session.attach():
             return
+        try:
+            yield from AttendanceService._stream(subject_id, session)
+        finally:
+            if session is not None:
+                session.finished.set()
+                RecognitionSessions.stop(session.id, reason="ended")
 
-        while True:
-            success, frame = cap.read()
-            if not success:
-                break
-            
-            # Resize for faster processing (optional, but 0.25 is standard for speed)
-            # However, for accuracy in a major project, we might keep it or use 0.5
-            small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
-            
-            # Convert BGR (OpenCV) to RGB (face_recognition)
-            rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
-
-            # 1. Detect Faces (HOG method)
-            face_locations = face_recognition.face_locations(rgb_small_frame)
-            
-            # 2. Extract Embeddings (128-d vectors)
-            face_encodings = face_recognition.face_encodings(rgb_small_frame, face_locations)
-
-            face_data = []
-            
-            for face_encoding in face_encodings:
-                name = "Unknown"
-                confidence = 0.0
-                
-                if recognizer and le:
-                    # Check for KNN-style distance support
-                    if hasattr(recognizer, "kneighbors"):
-                        # KNN Logic: Use Euclidean distance
-                        # distance 0.0 = perfect match, > 0.6 = likely unknown
-                        dist_list, _ = recognizer.kneighbors([face_encoding], n_neighbors=1, return_distance=True)
-                        distance = dist_list[0][0]
-                        
-                        # Convert to "confidence" for display (1.0 - distance)
-                        confidence = 1.0 - distance
-                        
-                        # Thresholding: 0.50 as requested by user
-                        if distance < 0.50:
-                            # Valid match
-                            pred_idx = recognizer.predict([face_encoding])[0]
-                            name = le.inverse_transform([pred_idx])[0]
-                            
-                            if name not in marked:
-                                AttendanceRepository.mark_attendance(subject_id, name)
-                                marked.add(name)
-                        else:
-                            name = "Unknown"
-                            
-                    else:
-                        # SVM / Probability Logic
-                        # reshape to (1, 128)
-                        preds = recognizer.predict_proba([face_encoding])[0]
-                        j = np.argmax(preds)
-                        confidence = preds[j]
-                        
-                        # 4. Manual Thresholding
-                        if confidence > CONF_THRESHOLD:
-                            name = le.classes_[j]
-                            if name not in marked:
-                                AttendanceRepository.mark_attendance(subject_id, name)
-                                marked.add(name)
-                
-                face_data.append((name, confidence))
+    @staticmethod
+    def _stream(subject_id, session):
+        if INFERENCE_SOCKET:
+            from app.services.inference_service import InferenceClient
+            try:
+                client = InferenceClient(INFERENCE_SOCKET)
+            except Exception as e:  # missing socket, missing/wrong INFERENCE_AUTHKEY
+                print(f"[ERROR] Inference worker unavailable at {INFERENCE_SOCKET}: {e}")
+                return
+            recognize = client.recognize
+        elif engine is None:
+            print("[ERROR] No recognition engine loaded. Cannot run.")
+            return
+        else:
+            client = None
+            recognize = AttendanceService.recognize_faces
+
+        cap = cv2.VideoCapture(int(CAMERA_SOURCE) if CAMERA_SOURCE.isdigit() else CAMERA_SOURCE)
+        CAMERAS_OPEN.inc()
+        governor = None
+        try:
+            if not cap.isOpened():
+                print("[ERROR] Could not open webcam.")
+                return
+
+            # Picks fps, detection interval and resize factor to fit this stream's CPU share
+            governor = FrameGovernor(subject_id)
+            scale = None
+
+            while session is None or not session.stopping.is_set():
+                detect = governor.begin_frame()
+                with STAGE_SECONDS.time(stage="capture"):
+                    success, frame = cap.read()
+                if not success:
+                    FRAMES_DROPPED.inc(reason="capture_failed")
+                    break
+
+                if governor.scale != scale:
+                    # Boxes, tracks and the motion background are in detection-frame coordinates
+                    scale = governor.scale
+                    gate = MotionGate() if MOTION_GATE_ENABLED else None
+                    tracker = FaceTracker()
+                    face_locations = []
+                    detect = True
+
+                recognition_seconds = 0.0
+                if detect:
+                    # Detect on a downscaled RGB copy (face_recognition expects RGB)
+                    small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale)
+                    rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+
+                    # detect/encode/classify are timed inside; "recognize" includes IPC when remote
+                    start = time.perf_counter()
+                    with STAGE_SECONDS.time(stage="recognize"):
+                        face_locations, face_data = AttendanceService._gated_recognize(
+                            recognize, rgb_small_frame, gate, face_locations, tracker.locked_boxes(), scale)
+                    recognition_seconds = time.perf_counter() - start
+                    governor.record_recognition(recognition_seconds)
+                else:
+                    face_data = [None] * len(face_locations)
+                # Fills in faces that were not re-encoded from their track's identity
+                face_data = tracker.update(face_locations, face_data)
+                FACES_PER_FRAME.observe(len(face_locations))
+
+                # Shared with reconnects and other streams of this subject today. Looked up
+                # every frame (a dict hit) so admin edits and midnight start a fresh session.
+                attendance = AttendanceSession.for_subject(subject_id)
+                for name, _ in face_data:
+                    if "Unknown" not in name and name not in attendance.marked:
+                        # Written synchronously, so nothing is pending when the loop exits
+                        with STAGE_SECONDS.time(stage="db_write"):
+                            attendance.mark(name)
 
                 # Display results
-            for (top, right, bottom, left), (name, confidence) in zip(face_locations, face_data):
-                # Scale back up
-                top *= 2
-                right *= 2
-                bottom *= 2
-                left *= 2
-
-                # Calculate "Uncertainty" or "Distance-like" metric
-                # confidence is 0..1 (higher is better)
-                # val is 0..1 (higher is worse)
-                val = 1.0 - confidence
-
-                # Draw box
-                color = (0, 255, 0) if "Unknown" not in name else (0, 0, 255)
-                cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
-                
-                # Draw Name above
-                y_name = top - 15 if top - 15 > 15 else top + 15
-                cv2.putText(frame, name, (left, y_name), cv2.FONT_HERSHEY_SIMPLEX, 0.75, color, 2)
-
-                # Draw Metric below the box
-                # Format: "Diff: 0.25"
-                text_val = f"Diff: {val:.2f}"
-                cv2.putText(frame, text_val, (left, bottom + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.60, color, 2)
-
-            ret, buffer = cv2.imencode(".jpg", frame)
-            if not ret: continue
-
-            yield (b"--frame\r\n"
-                   b"Content-Type: image/jpeg\r\n\r\n" + buffer.tobytes() + b"\r\n")
-            
-            time.sleep(0.01)
-
+                for (top, right, bottom, left), (name, confidence) in zip(face_locations, face_data):
+                    # Scale back up
+                    top, right, bottom, left = (int(v / scale) for v in (top, right, bottom, left))
+
+                    # Calculate "Uncertainty" or "Distance-like" metric
+                    # confidence is 0..1 (higher is better)
+                    # val is 0..1 (higher is worse)
+                    val = 1.0 - confidence
+
+                    # Draw box
+                    color = (0, 255, 0) if "Unknown" not in name else (0, 0, 255)
+                    cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+
+                    # Draw Name above
+                    y_name = top - 15 if top - 15 > 15 else top + 15
+                    cv2.putText(frame, name, (left, y_name), cv2.FONT_HERSHEY_SIMPLEX, 0.75, color, 2)
+
+                    # Draw Metric below the box
+                    # Format: "Diff: 0.25"
+                    text_val = f"Diff: {val:.2f}"
+                    cv2.putText(frame, text_val, (left, bottom + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.60, color, 2)
+
+                with STAGE_SECONDS.time(stage="jpeg_encode"):
+                    ret, buffer = cv2.imencode(".jpg", frame)
+                if not ret:
+                    FRAMES_DROPPED.inc(reason="jpeg_encode_failed")
+                    continue
+                FRAMES_PROCESSED.inc()
+
+                yield (b"--frame\r\n"
+                       b"Content-Type: image/jpeg\r\n\r\n" + buffer.tobytes() + b"\r\n")
+
+                governor.end_frame(recognition_seconds)
+        finally:
+            cap.release()
+            CAMERAS_OPEN.inc(-1)
+            if governor is not None:
+                governor.close()
+            if client is not None:
+                client.close()
@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+from datetime import datetime
+from app.metrics import DB_ERRORS
+from app.repositories.attendance_repository import AttendanceRepository
+from app.services.metrics_service import SESSION_MARKS
+
+# Attendance session per (subject, date)
+# -----------------------------------------------------------------------------------------
+# Preloaded with one query of who is already marked and shared by every stream and
+# reconnect in this process, so repeat recognitions are absorbed in memory with no
+# database round-trip. New students cost a single INSERT OR IGNORE.
+# -----------------------------------------------------------------------------------------
+
+
+class AttendanceSession:
+    _sessions = {}
+    _lock = threading.Lock()
+
+    def __init__(self, subject_id, date):
+        self.subject_id = subject_id
+        self.date = date
+        self.marked = set(AttendanceRepository.get_marked_students(subject_id, date))
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def for_subject(subject_id):
+        today = datetime.now().strftime("%Y-%m-%d")
+        with AttendanceSession._lock:
+            session = AttendanceSession._sessions.get((subject_id, today))
+            if session is None:
+                # Drop sessions from earlier days
+                for key in [k for k in AttendanceSession._sessions if k[1] != today]:
+                    del AttendanceSession._sessions[key]
+                session = AttendanceSession(subject_id, today)
+                AttendanceSession._sessions[(subject_id, today)] = session
+            return session
+
+    @staticmethod
+    def invalidate(subject_id=None):
+        """Forget cached sessions (all, or one subject's) after records are edited."""
+        with AttendanceSession._lock:
+            for key in list(AttendanceSession._sessions):
+                if subject_id is None or key[0] == subject_id:
+                    del AttendanceSession._sessions[key]
+
+    def mark(self, student_name):
+        """True if this call recorded the student; False if already marked or on error."""
+        with self.lock:
+            if student_name in self.marked:
+                SESSION_MARKS.inc(result="duplicate")
+                return False
+            self.marked.add(student_name)
+
+        now_time = datetime.now().strftime("%H:%M:%S")
+        try:
+            inserted = AttendanceRepository.insert_attendance(self.subject_id, student_name, self.date, now_time)
+        except sqlite3.Error as e:
+            # Let the next recognition retry
+            with self.lock:
+                self.marked.discard(student_name)
+            SESSION_MARKS.inc(result="error")
+            DB_ERRORS.inc(query="insert_attendance", error="locked" if "locked" in str(e) else "other")
+            print(f"[ERROR] Database error: {e}")
+            return False
+
+        if inserted:
+            SESSION_MARKS.inc(result="new")
+            print(f"[ATTENDANCE] Marked {student_name} for Subject ID {self.subject_id} at {now_time}")
+        else:
+            SESSION_MARKS.inc(result="duplicate")
+        return inserted
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.metrics import MetricsService, Counter
+
+# In-process LRU cache with a TTL
+# -----------------------------------------------------------------------------------------
+# Writers invalidate the entries they affect; the TTL bounds staleness for writes made by
+# other processes (extra web workers, the admin panel of another instance).
+# -----------------------------------------------------------------------------------------
+
+CACHE_LOOKUPS = MetricsService.register(Counter(
+    "app_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result")))
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, name, max_entries=256, ttl=300.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > now:
+                self._entries.move_to_end(key)
+                CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+                return entry[1]
+            if entry is not _MISSING:
+                del self._entries[key]
+        CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+        return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, predicate=None):
+        """Drop entries whose key matches `predicate` (all entries if None)."""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,123 @@
+import json
+import os
+import numpy as np
+from app.services.matching_service import MatchingService
+
+# Threshold calibration from genuine (same person) and impostor (different people)
+# pair distances. A face is accepted when distance < threshold, as in the live loop.
+# The 'svm' engine accepts on probability instead (p > threshold); its held-out scores
+# are swept as 1 - p with the same functions.
+
+THRESHOLDS_PATH = "model/thresholds.json"
+
+
+class CalibrationService:
+    @staticmethod
+    def pair_distances(embeddings, labels, chunk_size=None):
+        """Euclidean distances of every unordered pair, split into (genuine, impostor)."""
+        labels = np.asarray(labels)
+        genuine, impostor = [], []
+        for start, d2 in MatchingService.iter_distance_blocks(embeddings, embeddings, chunk_size):
+            rows = np.arange(start, start + len(d2))
+            upper = np.arange(len(labels))[None, :] > rows[:, None]  # each pair once
+            same = labels[rows][:, None] == labels[None, :]
+            dist = np.sqrt(d2)
+            genuine.append(dist[upper & same].astype(np.float32))
+            impostor.append(dist[upper & ~same].astype(np.float32))
+        return np.sort(np.concatenate(genuine)), np.sort(np.concatenate(impostor))
+
+    @staticmethod
+    def sweep(genuine, impostor, thresholds):
+        """FAR/FRR at each threshold, from sorted distance arrays (one searchsorted each)."""
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        accepted_genuine = np.searchsorted(genuine, thresholds, side="left")
+        accepted_impostor = np.searchsorted(impostor, thresholds, side="left")
+        far = accepted_impostor / max(len(impostor), 1)
+        frr = 1.0 - accepted_genuine / max(len(genuine), 1)
+        return far, frr
+
+    @staticmethod
+    def recommend(thresholds, far, frr, target_far):
+        """Largest threshold whose FAR stays within target_far, plus the equal-error point."""
+        eer_idx = int(np.argmin(np.abs(far - frr)))
+        within = np.nonzero(far <= target_far)[0]
+        idx = int(within[-1]) if len(within) else 0
+        return {
+            "distance_threshold": round(float(thresholds[idx]), 4),
+            "far": float(far[idx]),
+            "frr": float(frr[idx]),
+            "target_far": target_far,
+            "eer": float((far[eer_idx] + frr[eer_idx]) / 2),
+            "eer_threshold": round(float(thresholds[eer_idx]), 4),
+        }
+
+    @staticmethod
+    def probability_scores(recognizer, embeddings, labels, folds=5, seed=0):
+        """Held-out top-class probabilities of a predict_proba classifier: (genuine, impostor).
+
+        genuine:  each sample scored by a copy trained on the other folds; the probability
+                  of its own identity, or 0 when another identity wins (always an error).
+        impostor: identities are held out in groups, so these are the best probabilities
+                  a copy trained without that person gives to someone else.
+        """
+        from sklearn.base import clone
+        from sklearn.model_selection import GroupKFold, KFold
+
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        labels = np.asarray(labels)
+        genuine, impostor = [], []
+
+        def fitted(train):
+            if len(np.unique(labels[train])) < 2:
+                return None
+            return clone(recognizer).fit(embeddings[train], labels[train])
+
+        for train, test in KFold(n_splits=min(folds, len(labels)), shuffle=True, random_state=seed).split(embeddings):
+            model = fitted(train)
+            if model is None:
+                continue
+            probs = model.predict_proba(embeddings[test])
+            best = model.classes_[np.argmax(probs, axis=1)]
+            column = {c: i for i, c in enumerate(model.classes_)}
+            for row, label, winner in zip(probs, labels[test], best):
+                genuine.append(row[column[label]] if winner == label else 0.0)
+
+        groups = min(folds, len(np.unique(labels)))
+        for train, test in GroupKFold(n_splits=groups).split(embeddings, labels, labels):
+            model = fitted(train)
+            if model is not None:
+                impostor.extend(model.predict_proba(embeddings[test]).max(axis=1))
+        return np.sort(np.asarray(genuine, dtype=np.float64)), np.sort(np.asarray(impostor, dtype=np.float64))
+
+    @staticmethod
+    def recommend_probability(genuine, impostor, target_far, steps=1001):
+        """Smallest probability threshold keeping FAR within target_far (accept p > threshold)."""
+        # p > t  <=>  1 - p < 1 - t, so reuse the distance sweep on 1 - p
+        thresholds = np.linspace(0.0, 1.0, steps)
+        far, frr = CalibrationService.sweep(np.sort(1.0 - genuine), np.sort(1.0 - impostor), thresholds)
+        result = CalibrationService.recommend(thresholds, far, frr, target_far)
+        return {
+            "probability_threshold": round(1.0 - result["distance_threshold"], 4),
+            "probability_far": result["far"],
+            "probability_frr": result["frr"],
+            "probability_eer": result["eer"],
+        }
+
+    @staticmethod
+    def save_thresholds(values, path=THRESHOLDS_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(values, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_thresholds(path=THRESHOLDS_PATH):
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable thresholds file {path}: {e}")
+            return {}
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+from app.services.matching_service import MatchingService
+
+# Near-duplicate pruning for the training set.
+#   Before extraction: perceptual difference hash (dHash) of each image; an image within
+#   a few bits of one already kept for the same person is skipped.
+#   After extraction: an embedding closer than eps to one already kept for the same
+#   person adds nothing to the 1-NN gallery and is dropped.
+
+
+class DedupService:
+    @staticmethod
+    def dhash(image, hash_size=8):
+        """64-bit difference hash: sign of horizontal gradients on a tiny grayscale."""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    @staticmethod
+    def is_near_duplicate(image_hash, kept_hashes, max_distance):
+        return any((image_hash ^ h).bit_count() <= max_distance for h in kept_hashes)
+
+    @staticmethod
+    def prune_embeddings(embeddings, names, eps):
+        """Boolean keep-mask: greedily keep samples at least eps from every kept one."""
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        names = np.asarray(names)
+        keep = np.zeros(len(names), dtype=bool)
+        for name in np.unique(names):
+            idx = np.nonzero(names == name)[0]
+            close = MatchingService.squared_distances(embeddings[idx], embeddings[idx]) < eps ** 2
+            kept = []
+            for j in range(len(idx)):
+                if not any(close[j, k] for k in kept):
+                    kept.append(j)
+            keep[idx[kept]] = True
+        return keep
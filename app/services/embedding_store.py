@@ -0,0 +1,99 @@
+import os
+import pickle
+import numpy as np
+
+# Embedding store: the {"embeddings": [...], "names": [...]} pickle written by
+# extract_embeddings.py, exposed as a dense (N, 128) matrix plus a names array.
+#
+# Galleries can also be kept in reduced precision:
+#   float32 / float16 - plain casts
+#   int8              - symmetric scalar quantization with one scale per dimension
+
+DEFAULT_EMBEDDINGS_PATH = "model/embeddings.pickle"
+STORAGE_FORMATS = ("float64", "float32", "float16", "int8")
+
+# Gallery rows converted back to float32 at a time while matching (keeps the
+# temporary small enough to stay in cache).
+DEQUANTIZE_ROWS = 4096
+
+
+class QuantizedEmbeddings:
+    def __init__(self, data, fmt, scale=None):
+        self.data = data
+        self.format = fmt
+        self.scale = scale
+        self.sq_norms = np.concatenate([
+            np.einsum("ij,ij->i", block, block) for block in self._blocks()
+        ]) if len(data) else np.zeros(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def _blocks(self):
+        for start in range(0, len(self.data), DEQUANTIZE_ROWS):
+            block = self.data[start:start + DEQUANTIZE_ROWS].astype(np.float32)
+            yield block * self.scale if self.scale is not None else block
+
+    def dequantize(self):
+        return np.concatenate(list(self._blocks())) if len(self.data) else np.zeros((0, 128), np.float32)
+
+    def dot(self, queries):
+        """queries @ gallery.T without materialising the whole float gallery."""
+        queries = np.asarray(queries, dtype=np.float32)
+        if self.scale is not None:
+            # (q * s) . c == q . (s * c): fold the scale into the (small) query block
+            queries = queries * self.scale
+        out = np.empty((len(queries), len(self.data)), dtype=np.float32)
+        for start in range(0, len(self.data), DEQUANTIZE_ROWS):
+            codes = self.data[start:start + DEQUANTIZE_ROWS].astype(np.float32)
+            out[:, start:start + len(codes)] = queries @ codes.T
+        return out
+
+
+class EmbeddingStore:
+    @staticmethod
+    def load(path=DEFAULT_EMBEDDINGS_PATH):
+        with open(path, "rb") as f:
+            data = pickle.loads(f.read())
+        embeddings = data["embeddings"]
+        if data.get("format") in ("float16", "int8"):
+            embeddings = QuantizedEmbeddings(embeddings, data["format"], data.get("scale")).dequantize()
+        embeddings = np.asarray(embeddings, dtype=np.float64).reshape(-1, 128)
+        names = np.asarray(data["names"])
+        return embeddings, names
+
+    @staticmethod
+    def save(embeddings, names, path=DEFAULT_EMBEDDINGS_PATH, fmt="float64"):
+        """Write the store; float64 keeps the original list-of-vectors layout."""
+        if fmt == "float64":
+            data = {"embeddings": [np.asarray(e, dtype=np.float64) for e in embeddings]}
+        else:
+            q = EmbeddingStore.quantize(embeddings, fmt)
+            data = {"embeddings": q.data, "format": q.format, "scale": q.scale}
+        data["names"] = [str(n) for n in names]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pickle.dumps(data))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def quantize(embeddings, fmt):
+        """Return embeddings in a storage format; float64/float32 stay plain arrays."""
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        if fmt not in STORAGE_FORMATS:
+            raise ValueError(f"Unknown embedding format '{fmt}'. Choose from: {', '.join(STORAGE_FORMATS)}")
+        if fmt in ("float64", "float32"):
+            return embeddings.astype(fmt, copy=False)  # float64 stays a view (e.g. of a mapped bundle)
+        if fmt == "float16":
+            return QuantizedEmbeddings(embeddings.astype(np.float16), fmt)
+
+        # int8: map [-max|x_d|, +max|x_d|] of each dimension onto [-127, 127]
+        scale = (np.abs(embeddings).max(axis=0) / 127.0).astype(np.float32)
+        scale[scale == 0] = 1.0
+        codes = np.clip(np.rint(embeddings / scale), -127, 127).astype(np.int8)
+        return QuantizedEmbeddings(codes, fmt, scale)
@@ -0,0 +1,136 @@
+import itertools
+import os
+from app.services.metrics_service import TRACKED_FACES
+
+# Face tracks with identity locking
+# -----------------------------------------------------------------------------------------
+# Detections are linked frame to frame by box overlap (IoU). A track that gets
+# TRACK_LOCK_FRAMES consecutive confident matches for the same student is locked to that
+# identity: the engine is told to skip its box, so it is detected but never re-encoded.
+# A locked track is re-verified every TRACK_REVERIFY_FRAMES frames and unlocked if the
+# engine then disagrees (drift); it is dropped after TRACK_MAX_MISSES frames unseen.
+# Steady-state encoding cost follows new arrivals rather than class size.
+#
+# Data passed to update() may hold None for a box that was not (re)classified this frame:
+# skipped because its track is locked, or carried over by the motion gate. Those boxes
+# take their track's current identity.
+# -----------------------------------------------------------------------------------------
+
+TRACK_LOCK_FRAMES = int(os.environ.get("TRACK_LOCK_FRAMES", "3"))  # 0 disables locking
+TRACK_MIN_CONFIDENCE = float(os.environ.get("TRACK_MIN_CONFIDENCE", "0.5"))
+TRACK_IOU = float(os.environ.get("TRACK_IOU", "0.3"))
+TRACK_MAX_MISSES = int(os.environ.get("TRACK_MAX_MISSES", "5"))
+TRACK_REVERIFY_FRAMES = int(os.environ.get("TRACK_REVERIFY_FRAMES", "150"))
+
+UNKNOWN = ("Unknown", 0.0)
+
+
+def iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes."""
+    inter_h = min(a[2], b[2]) - max(a[0], b[0])
+    inter_w = min(a[1], b[1]) - max(a[3], b[3])
+    if inter_h <= 0 or inter_w <= 0:
+        return 0.0
+    inter = inter_h * inter_w
+    union = (a[2] - a[0]) * (a[1] - a[3]) + (b[2] - b[0]) * (b[1] - b[3]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def overlaps_any(box, boxes, threshold=TRACK_IOU):
+    return any(iou(box, other) >= threshold for other in boxes)
+
+
+class Track:
+    _ids = itertools.count(1)
+
+    def __init__(self, box, name, confidence):
+        self.id = next(Track._ids)
+        self.box = box
+        self.name = name
+        self.confidence = confidence
+        self.streak = 0
+        self.locked = False
+        self.misses = 0
+        self.since_verify = 0
+
+
+class FaceTracker:
+    def __init__(self, lock_frames=TRACK_LOCK_FRAMES, min_confidence=TRACK_MIN_CONFIDENCE,
+                 iou_threshold=TRACK_IOU, max_misses=TRACK_MAX_MISSES, reverify_frames=TRACK_REVERIFY_FRAMES):
+        self.lock_frames = lock_frames
+        self.min_confidence = min_confidence
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.reverify_frames = reverify_frames
+        self.tracks = []
+
+    def locked_boxes(self):
+        """Boxes the engine may skip this frame (locked and not due for re-verification)."""
+        return [t.box for t in self.tracks
+                if t.locked and (not self.reverify_frames or t.since_verify < self.reverify_frames)]
+
+    def _confident(self, name, confidence):
+        return "Unknown" not in name and confidence >= self.min_confidence
+
+    def _observe(self, track, name, confidence):
+        if track.locked:
+            if name == track.name:
+                track.since_verify = 0
+                return
+            # Re-verification disagreed: start over from this observation
+            TRACKED_FACES.inc(result="unlocked")
+            track.locked = False
+            track.streak = 0
+        if name == track.name and self._confident(name, confidence):
+            track.streak += 1
+        else:
+            track.streak = 1 if self._confident(name, confidence) else 0
+        track.name, track.confidence = name, confidence
+        if self.lock_frames and track.streak >= self.lock_frames:
+            track.locked = True
+            track.since_verify = 0
+            TRACKED_FACES.inc(result="locked")
+
+    def _assign(self, boxes):
+        """Greedy IoU matching: {detection index: track}."""
+        pairs = sorted(
+            ((iou(track.box, box), d, t) for t, track in enumerate(self.tracks) for d, box in enumerate(boxes)),
+            reverse=True)
+        assigned, used = {}, set()
+        for overlap, d, t in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if d in assigned or t in used:
+                continue
+            assigned[d] = self.tracks[t]
+            used.add(t)
+        return assigned
+
+    def update(self, boxes, data):
+        """Link this frame's detections to tracks; returns one (name, confidence) per box."""
+        assigned = self._assign(boxes)
+        resolved = []
+        for d, (box, observation) in enumerate(zip(boxes, data)):
+            track = assigned.get(d)
+            if track is None:
+                track = Track(box, *(observation or UNKNOWN))
+                self.tracks.append(track)
+                if observation is not None:
+                    self._observe(track, *observation)
+                assigned[d] = track
+            else:
+                track.box = box
+                track.misses = 0
+                if observation is not None:
+                    self._observe(track, *observation)
+                elif track.locked:
+                    track.since_verify += 1
+                    TRACKED_FACES.inc(result="skipped")
+            resolved.append((track.name, track.confidence))
+
+        seen = set(id(t) for t in assigned.values())
+        for track in self.tracks:
+            if id(track) not in seen:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        return resolved
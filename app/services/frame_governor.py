@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from app.services.metrics_service import STREAM_SETTINGS, GOVERNOR_ADJUSTMENTS
+
+# Frame governor
+# -----------------------------------------------------------------------------------------
+# Replaces the live loop's fixed sleep with a per-stream controller. Each stream measures
+# (EWMA) what a plain frame costs (capture, drawing, JPEG) and what a recognition pass
+# costs, and estimates its load as busy seconds per second:
+#       load = fps * frame_cost + fps / detect_interval * recognize_cost
+# GOVERNOR_CPU_BUDGET (cores, default 80% of the host) is split evenly between the
+# active streams. Over its share a stream steps down, in order: detect less often,
+# shrink the detection frame, lower the fps. Well under its share it steps back up in
+# reverse. A recognition pass slower than GOVERNOR_MAX_LATENCY shrinks the frame first.
+# Costs are wall-clock time, so work done by the shared inference worker counts too.
+# -----------------------------------------------------------------------------------------
+
+GOVERNOR_CPU_BUDGET = float(os.environ.get("GOVERNOR_CPU_BUDGET", str(0.8 * (os.cpu_count() or 1))))
+GOVERNOR_MAX_LATENCY = float(os.environ.get("GOVERNOR_MAX_LATENCY", "0.5"))
+GOVERNOR_MAX_FPS = float(os.environ.get("GOVERNOR_MAX_FPS", "15"))
+GOVERNOR_MIN_FPS = float(os.environ.get("GOVERNOR_MIN_FPS", "2"))
+
+DETECT_INTERVALS = (1, 2, 3, 5, 8)
+SCALES = (0.5, 0.4, 0.33, 0.25)  # 0.5 is what the loop always used
+FPS_STEP = 0.75
+
+
+class FrameGovernor:
+    _streams = set()
+    _lock = threading.Lock()
+
+    def __init__(self, name, budget=GOVERNOR_CPU_BUDGET, max_latency=GOVERNOR_MAX_LATENCY,
+                 max_fps=GOVERNOR_MAX_FPS, min_fps=GOVERNOR_MIN_FPS, adjust_every=1.0, smoothing=0.2):
+        self.name = str(name)
+        self.budget = budget
+        self.max_latency = max_latency
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.adjust_every = adjust_every
+        self.smoothing = smoothing
+
+        self.fps = max_fps
+        self.interval_index = 0
+        self.scale_index = 0
+        self.frame_cost = None
+        self.recognize_cost = None
+        self.frame_number = 0
+        self.frame_start = None
+        self.last_adjust = time.monotonic()
+        with FrameGovernor._lock:
+            FrameGovernor._streams.add(self)
+        self._publish()
+
+    @property
+    def detect_interval(self):
+        return DETECT_INTERVALS[self.interval_index]
+
+    @property
+    def scale(self):
+        return SCALES[self.scale_index]
+
+    def share(self):
+        """This stream's slice of the budget: an even split between active streams."""
+        with FrameGovernor._lock:
+            active = len(FrameGovernor._streams) or 1
+        return self.budget / active
+
+    def load(self):
+        if self.frame_cost is None:
+            return 0.0
+        return self.fps * self.frame_cost + self.fps / self.detect_interval * (self.recognize_cost or 0.0)
+
+    def begin_frame(self):
+        """Call at the top of each frame; True if this frame should run recognition."""
+        self.frame_start = time.perf_counter()
+        detect = self.frame_number % self.detect_interval == 0
+        self.frame_number += 1
+        return detect
+
+    def record_recognition(self, seconds):
+        self.recognize_cost = self._ewma(self.recognize_cost, seconds)
+
+    def end_frame(self, recognition_seconds=0.0):
+        """Sleep out the rest of the frame period and adjust the settings when due.
+
+        `recognition_seconds` is excluded from the per-frame cost (it is tracked
+        separately by record_recognition)."""
+        elapsed = time.perf_counter() - self.frame_start
+        self.frame_cost = self._ewma(self.frame_cost, max(0.0, elapsed - recognition_seconds))
+
+        now = time.monotonic()
+        if now - self.last_adjust >= self.adjust_every:
+            self.last_adjust = now
+            self._adjust()
+
+        remaining = 1.0 / self.fps - elapsed
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def close(self):
+        with FrameGovernor._lock:
+            FrameGovernor._streams.discard(self)
+        STREAM_SETTINGS.remove(stream=self.name)
+
+    def _ewma(self, current, sample):
+        return sample if current is None else current + self.smoothing * (sample - current)
+
+    def _adjust(self):
+        if self.frame_cost is None or self.recognize_cost is None:
+            return  # wait until both costs have been measured at the current settings
+        share = self.share()
+        load = self.load()
+        direction = None
+
+        if self.recognize_cost and self.recognize_cost > self.max_latency and self.scale_index < len(SCALES) - 1:
+            self._shrink()
+            direction = "down"
+        elif load > share:
+            direction = "down"
+            if self.interval_index < len(DETECT_INTERVALS) - 1:
+                self.interval_index += 1
+            elif self.scale_index < len(SCALES) - 1:
+                self._shrink()
+            elif self.fps > self.min_fps:
+                self.fps = max(self.min_fps, self.fps * FPS_STEP)
+            else:
+                direction = None
+        elif load < 0.6 * share:
+            direction = "up"
+            if self.fps < self.max_fps:
+                self.fps = min(self.max_fps, self.fps / FPS_STEP)
+            elif self.scale_index > 0 and self.recognize_cost * 2 < self.max_latency:
+                self.scale_index -= 1
+                self.recognize_cost = None
+            elif self.interval_index > 0:
+                self.interval_index -= 1
+            else:
+                direction = None
+
+        if direction:
+            GOVERNOR_ADJUSTMENTS.inc(direction=direction)
+            self._publish()
+
+    def _shrink(self):
+        self.scale_index += 1
+        # A new frame size changes the cost; measure it afresh
+        self.recognize_cost = None
+
+    def _publish(self):
+        STREAM_SETTINGS.set(self.fps, stream=self.name, setting="fps")
+        STREAM_SETTINGS.set(self.detect_interval, stream=self.name, setting="detect_interval")
+        STREAM_SETTINGS.set(self.scale, stream=self.name, setting="scale")
@@ -0,0 +1,77 @@
+import numpy as np
+from app.services.matching_service import MatchingService
+
+# Gallery compaction: reduce each identity's embeddings to a few prototypes so the
+# live 1-NN compares against k per student instead of every stored image.
+# Enrollment keyframes: farthest-point sampling keeps the most diverse embeddings of a video.
+
+
+class GalleryService:
+    @staticmethod
+    def kmeans(points, k, iterations=25, seed=0):
+        """Plain Lloyd's k-means with k-means++ seeding; returns (centers, assignment)."""
+        points = np.asarray(points, dtype=np.float64)
+        rng = np.random.default_rng(seed)
+        k = min(k, len(points))
+
+        centers = [points[rng.integers(len(points))]]
+        for _ in range(1, k):
+            d2 = MatchingService.squared_distances(points, np.array(centers)).min(axis=1)
+            if d2.sum() == 0:
+                break  # remaining points duplicate existing centers
+            centers.append(points[rng.choice(len(points), p=d2 / d2.sum())])
+        centers = np.array(centers)
+
+        for _ in range(iterations):
+            assignment = np.argmin(MatchingService.squared_distances(points, centers), axis=1)
+            updated = np.array([
+                points[assignment == c].mean(axis=0) if np.any(assignment == c) else centers[c]
+                for c in range(len(centers))
+            ])
+            if np.allclose(updated, centers):
+                break
+            centers = updated
+        assignment = np.argmin(MatchingService.squared_distances(points, centers), axis=1)
+        return centers, assignment
+
+    @staticmethod
+    def compact(embeddings, names, prototypes_per_identity=3, method="kmeans", seed=0):
+        """Return (prototypes, prototype_names).
+
+        method='kmeans' keeps cluster means; method='medoids' keeps, for each cluster,
+        the real sample with the smallest total distance to the rest of its cluster.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        names = np.asarray(names)
+        protos, proto_names = [], []
+        for name in np.unique(names):
+            points = embeddings[names == name]
+            centers, assignment = GalleryService.kmeans(points, prototypes_per_identity, seed=seed)
+            for c in range(len(centers)):
+                members = points[assignment == c]
+                if len(members) == 0:
+                    continue
+                if method == "medoids":
+                    cost = np.sqrt(MatchingService.squared_distances(members, members)).sum(axis=1)
+                    protos.append(members[np.argmin(cost)])
+                else:
+                    protos.append(centers[c])
+                proto_names.append(name)
+        return np.array(protos), np.array(proto_names)
+
+    @staticmethod
+    def farthest_point_sample(points, k):
+        """Indices of k mutually distant points: start from the one nearest the mean, then
+        repeatedly add the point farthest from everything chosen so far."""
+        points = np.asarray(points, dtype=np.float64)
+        if len(points) <= k:
+            return np.arange(len(points))
+        chosen = [int(np.argmin(MatchingService.squared_distances(points.mean(axis=0, keepdims=True), points)[0]))]
+        d2 = MatchingService.squared_distances(points, points[chosen])[:, 0]
+        while len(chosen) < k:
+            nxt = int(np.argmax(d2))
+            if d2[nxt] == 0:
+                break  # the rest duplicate points already chosen
+            chosen.append(nxt)
+            d2 = np.minimum(d2, MatchingService.squared_distances(points, points[nxt:nxt + 1])[:, 0])
+        return np.array(chosen)
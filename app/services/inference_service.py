@@ -0,0 +1,188 @@
+import os
+import tempfile
+import threading
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+from app.metrics import MetricsService
+from app.services.message_framing import send_message, recv_message
+
+# Shared inference worker
+# -----------------------------------------------------------------------------------------
+# One process (inference_server.py) owns dlib and the recognizer. Web workers copy each
+# frame into a shared-memory buffer they own and send only its name/shape over a local
+# Unix socket, so adding web workers does not add another copy of the models.
+# The detect/encode/classify stage metrics are recorded here; web workers fetch them
+# with fetch_metrics() and merge them into their /metrics (label process="inference").
+#
+# Requests and replies are message_framing JSON frames, never pickles. Both sides need the
+# same INFERENCE_AUTHKEY (there is no default), and by default the socket lives in a
+# private 0700 directory created with mkdtemp rather than directly under /tmp.
+# -----------------------------------------------------------------------------------------
+
+MAX_MESSAGE_BYTES = 1024 * 1024  # headers only; frames travel through shared memory
+
+
+def _authkey():
+    """INFERENCE_AUTHKEY as bytes; refuses to run without one."""
+    authkey = os.environ.get("INFERENCE_AUTHKEY")
+    if not authkey:
+        raise ValueError("The inference worker needs a shared secret: set INFERENCE_AUTHKEY "
+                         "on the worker and on every web worker.")
+    return authkey.encode()
+
+
+def private_socket_path():
+    """A socket path inside a fresh directory only this user can enter."""
+    return os.path.join(tempfile.mkdtemp(prefix="face_attendance_"), "inference.sock")
+
+
+def _attach(name):
+    shm = shared_memory.SharedMemory(name=name)
+    # The client owns the segment. Stop this process's resource tracker from
+    # unlinking it when we exit (Python < 3.13 registers on attach as well).
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+class InferenceClient:
+    """Used by a web worker: one client (and one frame buffer) per stream."""
+
+    def __init__(self, address):
+        self.conn = Client(address, family="AF_UNIX", authkey=_authkey())
+        self.shm = None
+
+    def recognize(self, rgb_frame, skip=(), scale=1.0):
+        frame = np.ascontiguousarray(rgb_frame, dtype=np.uint8)
+        if self.shm is None or self.shm.size < frame.nbytes:
+            self._release_buffer()
+            self.shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.shm.buf)[...] = frame
+        send_message(self.conn, {"op": "recognize", "buffer": self.shm.name, "frame_shape": list(frame.shape),
+                                 "skip": [[int(v) for v in box] for box in skip], "scale": float(scale)})
+
+        reply, _ = recv_message(self.conn)
+        if reply.get("status") != "ok":
+            raise RuntimeError(f"Inference worker error: {reply.get('error')}")
+        face_locations = [tuple(box) for box in reply["face_locations"]]
+        face_data = [None if data is None else tuple(data) for data in reply["face_data"]]
+        return face_locations, face_data
+
+    @staticmethod
+    def fetch_metrics(address):
+        """The worker's MetricsService.export(), or None when it cannot be reached."""
+        try:
+            client = InferenceClient(address)
+        except Exception as e:
+            print(f"[WARN] Inference worker metrics unavailable at {address}: {e}")
+            return None
+        try:
+            send_message(client.conn, {"op": "metrics"})
+            reply, _ = recv_message(client.conn)
+            return reply.get("metrics") if reply.get("status") == "ok" else None
+        except (EOFError, OSError, ValueError) as e:
+            print(f"[WARN] Inference worker metrics unavailable at {address}: {e}")
+            return None
+        finally:
+            client.close()
+
+    def _release_buffer(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        try:
+            send_message(self.conn, {"op": "close"})
+        except OSError:
+            pass
+        self.conn.close()
+        self._release_buffer()
+
+
+class InferenceServer:
+    """Owns the models and serves recognition requests from web workers."""
+
+    def __init__(self, address):
+        self.address = address
+        self.authkey = _authkey()
+        # dlib is not guaranteed to be thread-safe; run one frame at a time.
+        self.lock = threading.Lock()
+
+    def serve_forever(self):
+        from app.services.attendance_service import AttendanceService
+
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+        with Listener(self.address, family="AF_UNIX", authkey=self.authkey) as listener:
+            os.chmod(self.address, 0o600)
+            print(f"[INFO] Inference worker listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"[WARN] Rejected inference connection: {e}")
+                    continue
+                threading.Thread(
+                    target=self._handle, args=(conn, AttendanceService.recognize_faces), daemon=True
+                ).start()
+
+    def _handle(self, conn, recognize):
+        buffers = {}
+        try:
+            while True:
+                try:
+                    message, _ = recv_message(conn, MAX_MESSAGE_BYTES)
+                except (EOFError, OSError):
+                    break
+                except ValueError as e:
+                    send_message(conn, {"status": "error", "error": str(e)})
+                    continue
+
+                op = message.get("op")
+                if op == "close":
+                    break
+                try:
+                    if op == "metrics":
+                        send_message(conn, {"status": "ok", "metrics": MetricsService.export(process="inference")})
+                    elif op == "recognize":
+                        name = str(message["buffer"])
+                        shape = tuple(int(n) for n in message["frame_shape"])
+                        if len(shape) != 3 or shape[2] != 3:
+                            raise ValueError(f"expected an (h, w, 3) frame, got {shape}")
+                        skip = [tuple(int(v) for v in box) for box in message.get("skip", [])]
+                        scale = float(message.get("scale", 1.0))
+                        if not 0.0 < scale <= 1.0:
+                            raise ValueError(f"scale must be in (0, 1], got {scale}")
+                        if name not in buffers:
+                            # A client only grows its buffer, so drop any older segment.
+                            for shm in buffers.values():
+                                shm.close()
+                            buffers = {name: _attach(name)}
+                        frame = np.ndarray(shape, dtype=np.uint8, buffer=buffers[name].buf)
+                        with self.lock:
+                            face_locations, face_data = recognize(frame, skip, scale)
+                        # Drop the view before the buffer can be closed.
+                        del frame
+                        send_message(conn, {
+                            "status": "ok",
+                            "face_locations": [[int(v) for v in box] for box in face_locations],
+                            "face_data": [None if data is None else [str(data[0]), float(data[1])]
+                                          for data in face_data],
+                        })
+                    else:
+                        send_message(conn, {"status": "error", "error": f"unknown request {op!r}"})
+                except Exception as e:
+                    send_message(conn, {"status": "error", "error": str(e)})
+        except (EOFError, OSError):
+            pass
+        finally:
+            for shm in buffers.values():
+                shm.close()
+            conn.close()
@@ -0,0 +1,101 @@
+import numpy as np
+from app.services.embedding_store import QuantizedEmbeddings
+
+# Blocked nearest-neighbour search over 128-d face embeddings.
+# Distances use ||q||^2 - 2 q.g + ||g||^2 so each block is a single matrix product;
+# the block size bounds memory at chunk_size x len(gallery) floats.
+# A gallery may be a plain array or a reduced-precision one from EmbeddingStore.quantize.
+
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def _auto_chunk(n_gallery, itemsize=8):
+    return max(1, DEFAULT_BLOCK_BYTES // max(1, n_gallery * itemsize))
+
+
+class MatchingService:
+    @staticmethod
+    def squared_distances(queries, gallery, gallery_sq_norms=None):
+        """(len(queries), len(gallery)) matrix of squared Euclidean distances."""
+        queries = np.asarray(queries)
+        if isinstance(gallery, QuantizedEmbeddings):
+            queries = queries.astype(np.float32)
+            products = gallery.dot(queries)
+            if gallery_sq_norms is None:
+                gallery_sq_norms = gallery.sq_norms
+        else:
+            gallery = np.asarray(gallery)
+            if gallery.dtype == np.float32:
+                queries = queries.astype(np.float32)
+            products = queries @ gallery.T
+            if gallery_sq_norms is None:
+                gallery_sq_norms = np.einsum("ij,ij->i", gallery, gallery)
+        q_sq = np.einsum("ij,ij->i", queries, queries)
+        d2 = q_sq[:, None] - 2.0 * products + gallery_sq_norms[None, :]
+        np.maximum(d2, 0.0, out=d2)
+        return d2
+
+    @staticmethod
+    def iter_distance_blocks(queries, gallery, chunk_size=None):
+        """Yield (start, squared-distance block) for consecutive rows of `queries`."""
+        queries = np.asarray(queries)
+        chunk_size = chunk_size or _auto_chunk(len(gallery))
+        if isinstance(gallery, QuantizedEmbeddings):
+            gallery_sq_norms = gallery.sq_norms
+        else:
+            gallery = np.asarray(gallery)
+            gallery_sq_norms = np.einsum("ij,ij->i", gallery, gallery)
+        for start in range(0, len(queries), chunk_size):
+            yield start, MatchingService.squared_distances(
+                queries[start:start + chunk_size], gallery, gallery_sq_norms)
+
+    @staticmethod
+    def nearest_neighbors(queries, gallery, chunk_size=None):
+        """Index of and Euclidean distance to the closest gallery row for each query."""
+        queries = np.asarray(queries)
+        indices = np.empty(len(queries), dtype=np.int64)
+        distances = np.empty(len(queries), dtype=np.float64)
+        for start, d2 in MatchingService.iter_distance_blocks(queries, gallery, chunk_size):
+            stop = start + len(d2)
+            indices[start:stop] = np.argmin(d2, axis=1)
+            distances[start:stop] = np.sqrt(d2[np.arange(len(d2)), indices[start:stop]])
+        return indices, distances
+
+    @staticmethod
+    def top_k(queries, gallery, k, chunk_size=None):
+        """Indices of and Euclidean distances to the k closest gallery rows, nearest first."""
+        queries = np.asarray(queries)
+        k = min(k, len(gallery))
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        distances = np.empty((len(queries), k), dtype=np.float64)
+        if k == 0:
+            return indices, distances
+        for start, d2 in MatchingService.iter_distance_blocks(queries, gallery, chunk_size):
+            stop = start + len(d2)
+            part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            part_d2 = np.take_along_axis(d2, part, axis=1)
+            order = np.argsort(part_d2, axis=1)
+            indices[start:stop] = np.take_along_axis(part, order, axis=1)
+            distances[start:stop] = np.sqrt(np.take_along_axis(part_d2, order, axis=1))
+        return indices, distances
+
+    @staticmethod
+    def leave_one_out_nearest(embeddings, chunk_size=None, gallery=None):
+        """1-NN of every sample against all *other* samples, in blocked passes.
+
+        Equivalent to LeaveOneOut + KNeighborsClassifier(n_neighbors=1) without
+        refitting N times. Exact distance ties resolve to the lowest index.
+        `gallery` may hold the same rows in another storage format.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        gallery = embeddings if gallery is None else gallery
+        n = len(embeddings)
+        indices = np.empty(n, dtype=np.int64)
+        distances = np.empty(n, dtype=np.float64)
+        for start, d2 in MatchingService.iter_distance_blocks(embeddings, gallery, chunk_size):
+            rows = np.arange(len(d2))
+            d2[rows, start + rows] = np.inf  # leave the sample itself out
+            stop = start + len(d2)
+            indices[start:stop] = np.argmin(d2, axis=1)
+            distances[start:stop] = np.sqrt(d2[rows, indices[start:stop]])
+        return indices, distances
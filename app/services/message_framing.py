@@ -0,0 +1,37 @@
+import json
+import numpy as np
+
+# Pickle-free messages for multiprocessing.connection
+# -----------------------------------------------------------------------------------------
+# Connection.send()/recv() pickle, so any peer that gets past the authkey can run code in
+# the receiver. The worker protocols (inference worker, gallery shards) use send_bytes()
+# instead: one length-prefixed frame of a JSON header followed by the raw little-endian
+# float64 bytes of at most one array. A hostile peer can at worst send a malformed frame.
+# -----------------------------------------------------------------------------------------
+
+
+def send_message(conn, header, array=None):
+    """One frame: 4-byte header length, JSON header, then the array's raw float64 bytes."""
+    payload = b""
+    if array is not None:
+        array = np.ascontiguousarray(array, dtype="<f8")
+        header = {**header, "shape": list(array.shape)}
+        payload = array.tobytes()
+    head = json.dumps(header).encode("utf-8")
+    conn.send_bytes(len(head).to_bytes(4, "big") + head + payload)
+
+
+def recv_message(conn, maxlength=None):
+    """(header, array or None) from one frame. Raises ValueError on a malformed frame."""
+    data = conn.recv_bytes(maxlength)
+    size = int.from_bytes(data[:4], "big")
+    try:
+        header = json.loads(data[4:4 + size].decode("utf-8"))
+        if not isinstance(header, dict):
+            raise ValueError("header is not an object")
+        array = None
+        if "shape" in header:
+            array = np.frombuffer(data[4 + size:], dtype="<f8").reshape([int(n) for n in header["shape"]])
+    except (UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"malformed message: {e}") from e
+    return header, array
@@ -0,0 +1,45 @@
+from app.metrics import MetricsService, Counter, Gauge, Histogram, COUNT_BUCKETS
+
+# Service-level metrics. The primitives and the repository (DATABASE) metrics are in
+# app.metrics, which has no app dependencies. (Repositories still call the page and
+# analytics cache invalidation hooks on writes, so every writer refreshes both caches.)
+# With INFERENCE_SOCKET set, detect/encode/classify/quality are recorded in the
+# inference worker; /metrics merges them in with a process="inference" label.
+
+# -----------------------------
+# RECOGNITION LOOP
+# -----------------------------
+FRAMES_PROCESSED = MetricsService.register(Counter(
+    "attendance_frames_processed_total", "Frames that went through the recognition loop"))
+FRAMES_DROPPED = MetricsService.register(Counter(
+    "attendance_frames_dropped_total", "Frames dropped by the recognition loop", ("reason",)))
+FACES_PER_FRAME = MetricsService.register(Histogram(
+    "attendance_faces_per_frame", "Faces detected per processed frame", COUNT_BUCKETS))
+STAGE_SECONDS = MetricsService.register(Histogram(
+    "attendance_stage_seconds", "Time spent in each recognition loop stage", label_names=("stage",)))
+MOTION_GATE_FRAMES = MetricsService.register(Counter(
+    "attendance_motion_gate_frames_total", "Frames by motion gate outcome (static frames skip detection)",
+    ("result",)))
+
+STREAM_SETTINGS = MetricsService.register(Gauge(
+    "attendance_stream_settings", "Current frame governor settings per stream (fps, detect_interval, scale)",
+    ("stream", "setting")))
+GOVERNOR_ADJUSTMENTS = MetricsService.register(Counter(
+    "attendance_governor_adjustments_total", "Frame governor setting changes by direction", ("direction",)))
+
+FACE_QUALITY = MetricsService.register(Counter(
+    "attendance_face_quality_total", "Detected faces by quality gate outcome; anything but 'encoded' skipped the embedding pass",
+    ("result",)))
+
+TRACKED_FACES = MetricsService.register(Counter(
+    "attendance_tracked_faces_total", "Face track events: locked/unlocked identities and faces skipped because their track is locked",
+    ("result",)))
+
+RECOGNITION_SESSIONS = MetricsService.register(Counter(
+    "attendance_recognition_sessions_total", "Live recognition sessions by lifecycle event", ("result",)))
+CAMERAS_OPEN = MetricsService.register(Gauge(
+    "attendance_cameras_open", "Video captures currently held by recognition streams"))
+
+SESSION_MARKS = MetricsService.register(Counter(
+    "attendance_session_marks_total", "Recognized students by outcome (duplicates cost no DB round-trip)",
+    ("result",)))
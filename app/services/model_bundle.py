@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import zipfile
+from datetime import datetime
+import numpy as np
+
+# Model bundle
+# -----------------------------------------------------------------------------------------
+# One uncompressed .npz holding everything the embedding engines need:
+#   embeddings  (N, 128) gallery           labels      (N,) int32 index into class_names
+#   class_names (C,) unicode               meta        JSON: version, thresholds, metadata,
+#                                                            sha256 of the arrays above
+# Written to a temp file and renamed into place, so readers never see half a bundle.
+# Loading maps each member straight out of the zip (members are stored, not deflated),
+# so there is no unpickling and the gallery is paged in by the OS on first use.
+# -----------------------------------------------------------------------------------------
+
+BUNDLE_PATH = "model/recognizer_bundle.npz"
+BUNDLE_VERSION = 1
+_ARRAYS = ("embeddings", "labels", "class_names")
+
+
+def _checksum(arrays):
+    digest = hashlib.sha256()
+    for name in _ARRAYS:
+        a = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}:{a.dtype.str}:{a.shape}".encode())
+        if a.size:  # memoryview can't cast a zero-size view; shape above covers it
+            digest.update(memoryview(a).cast("B"))
+    return digest.hexdigest()
+
+
+def _map_member(path, zf, info):
+    """memmap an uncompressed .npy member in place; None if it can't be mapped."""
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, "rb") as f:
+        # The local header's extra field may differ from the central directory's
+        f.seek(info.header_offset + 26)
+        name_len, extra_len = np.frombuffer(f.read(4), dtype="<u2")
+        f.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        if dtype.hasobject:
+            return None
+        offset = f.tell()
+    if int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran else "C")
+
+
+class ModelBundle:
+    def __init__(self, embeddings, labels, class_names, thresholds=None, metadata=None, sha256=None):
+        self.embeddings = embeddings
+        self.labels = labels
+        self.class_names = class_names
+        self.thresholds = thresholds or {}
+        self.metadata = metadata or {}
+        # Checksum recorded when the bundle was saved (set by load(), even with verify=False)
+        self.sha256 = sha256
+
+    @property
+    def names(self):
+        """Per-row identity names."""
+        return self.class_names[self.labels]
+
+    @staticmethod
+    def exists(path=BUNDLE_PATH):
+        return os.path.exists(path)
+
+    def save(self, path=BUNDLE_PATH):
+        arrays = {
+            "embeddings": np.ascontiguousarray(self.embeddings, dtype=np.float64),
+            "labels": np.ascontiguousarray(self.labels, dtype=np.int32),
+            "class_names": np.asarray([str(c) for c in self.class_names], dtype=np.str_),
+        }
+        meta = {
+            "version": BUNDLE_VERSION,
+            "thresholds": self.thresholds,
+            "metadata": {**self.metadata, "saved_at": datetime.now().isoformat(timespec="seconds")},
+            "sha256": _checksum(arrays),
+        }
+        arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)  # uncompressed so members can be memory-mapped
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path=BUNDLE_PATH, mmap=True, verify=True):
+        """Load and validate a bundle. Raises FileNotFoundError / ValueError."""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model bundle not found at {path}. Run 'train_classifier.py' first.")
+        arrays = {}
+        try:
+            with zipfile.ZipFile(path) as zf:
+                members = {info.filename[:-4]: info for info in zf.infolist() if info.filename.endswith(".npy")}
+                missing = [n for n in _ARRAYS + ("meta",) if n not in members]
+                if missing:
+                    raise ValueError(f"missing {', '.join(missing)}")
+                for name in _ARRAYS:
+                    arrays[name] = _map_member(path, zf, members[name]) if mmap else None
+                with zf.open(members["meta"]) as f:
+                    meta = json.loads(np.lib.format.read_array(f).tobytes().decode("utf-8"))
+            if any(a is None for a in arrays.values()):
+                with np.load(path, allow_pickle=False) as npz:
+                    for name in _ARRAYS:
+                        if arrays[name] is None:
+                            arrays[name] = npz[name]
+        except (zipfile.BadZipFile, OSError, ValueError) as e:
+            raise ValueError(f"Corrupt model bundle {path}: {e}") from e
+
+        if meta.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"Model bundle {path} has version {meta.get('version')}, expected {BUNDLE_VERSION}. "
+                             "Re-run 'train_classifier.py'.")
+        embeddings, labels, class_names = (arrays[n] for n in _ARRAYS)
+        if embeddings.ndim != 2 or len(labels) != len(embeddings) or \
+                (len(labels) and (labels.min() < 0 or labels.max() >= len(class_names))):
+            raise ValueError(f"Model bundle {path} has inconsistent shapes.")
+        if verify and _checksum(arrays) != meta.get("sha256"):
+            raise ValueError(f"Model bundle {path} failed its checksum; re-run 'train_classifier.py'.")
+        return ModelBundle(embeddings, labels, class_names, meta.get("thresholds"), meta.get("metadata"),
+                           meta.get("sha256"))
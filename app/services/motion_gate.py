@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+
+# Motion gate for the recognition loop
+# -----------------------------------------------------------------------------------------
+# A running-average background on a tiny, blurred grayscale copy of the frame tells us
+# which parts of the scene changed. The loop then:
+#   - skips detection entirely when nothing moved (reusing the last results),
+#   - re-detects only inside the moving regions otherwise,
+#   - still runs a full pass every `refresh_frames` frames as a safety net.
+# -----------------------------------------------------------------------------------------
+
+
+class MotionGate:
+    def __init__(self, scale=0.25, pixel_threshold=25, min_area_ratio=0.002,
+                 learning_rate=0.05, padding=0.25, refresh_frames=150, full_frame_ratio=0.5):
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.min_area_ratio = min_area_ratio
+        self.learning_rate = learning_rate
+        self.padding = padding
+        self.refresh_frames = refresh_frames
+        self.full_frame_ratio = full_frame_ratio
+        self.background = None
+        self.frames_since_full = 0
+
+    def regions(self, frame):
+        """None if the scene is static, else a list of (top, right, bottom, left) regions
+        in `frame` coordinates to re-detect (the whole frame for a full pass)."""
+        h, w = frame.shape[:2]
+        full = [(0, w, h, 0)]
+
+        small = cv2.resize(frame, (0, 0), fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_RGB2GRAY), (5, 5), 0).astype(np.float32)
+
+        if self.background is None or self.frames_since_full >= self.refresh_frames:
+            if self.background is None:
+                self.background = gray
+            cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+            self.frames_since_full = 0
+            return full
+        self.frames_since_full += 1
+
+        diff = cv2.absdiff(gray, self.background)
+        cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+        _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        mask = cv2.dilate(mask.astype(np.uint8), None, iterations=2)
+
+        moving = cv2.countNonZero(mask) / mask.size
+        if moving < self.min_area_ratio:
+            return None
+        if moving > self.full_frame_ratio:
+            self.frames_since_full = 0
+            return full
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = []
+        min_area = self.min_area_ratio * mask.size
+        for contour in contours:
+            if cv2.contourArea(contour) < min_area:
+                continue
+            x, y, bw, bh = cv2.boundingRect(contour)
+            # Back to frame coordinates, padded so a face at the edge of motion is whole
+            pad_x, pad_y = bw * self.padding, bh * self.padding
+            boxes.append((
+                max(0, int((y - pad_y) / self.scale)),
+                min(w, int((x + bw + pad_x) / self.scale)),
+                min(h, int((y + bh + pad_y) / self.scale)),
+                max(0, int((x - pad_x) / self.scale)),
+            ))
+        return MotionGate._merge(boxes) or None
+
+    @staticmethod
+    def _merge(boxes):
+        merged = list(boxes)
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(merged)):
+                for j in range(i + 1, len(merged)):
+                    a, b = merged[i], merged[j]
+                    if MotionGate.overlaps(a, b):
+                        merged[i] = (min(a[0], b[0]), max(a[1], b[1]), max(a[2], b[2]), min(a[3], b[3]))
+                        del merged[j]
+                        changed = True
+                        break
+                if changed:
+                    break
+        return merged
+
+    @staticmethod
+    def overlaps(a, b):
+        """True if two (top, right, bottom, left) boxes intersect."""
+        return a[3] < b[1] and b[3] < a[1] and a[0] < b[2] and b[0] < a[2]
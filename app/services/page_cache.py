@@ -0,0 +1,63 @@
+import hashlib
+import os
+from flask import Response, request, session
+from app.services.cache_service import TTLCache, CACHE_LOOKUPS
+
+# Rendered-page cache for /dashboard, /view_records/<id> and /admin/dashboard
+# -----------------------------------------------------------------------------------------
+# Keys are (page, scope, user, extra). Write paths call the *_changed helpers, which drop
+# just the pages that show the written data. Every response carries an ETag, so a browser
+# refresh of an unchanged page costs a dictionary lookup and a 304.
+# PAGE_CACHE_SIZE bounds the entries (LRU); PAGE_CACHE_TTL bounds staleness from writes
+# made in other processes.
+# -----------------------------------------------------------------------------------------
+
+PAGE_CACHE_SIZE = int(os.environ.get("PAGE_CACHE_SIZE", "128"))
+PAGE_CACHE_TTL = float(os.environ.get("PAGE_CACHE_TTL", "60"))
+
+cache = TTLCache("pages", max_entries=PAGE_CACHE_SIZE, ttl=PAGE_CACHE_TTL)
+
+
+class PageCache:
+    @staticmethod
+    def respond(page, scope, user, build, extra=None):
+        """Serve `build()` (a rendered HTML string) through the cache with ETag/304."""
+        if session.get("_flashes"):
+            # Pending flash messages render into the page and are consumed by it
+            return build()
+
+        key = (page, scope, user, extra)
+        entry = cache.get(key)
+        if entry is None:
+            body = build().encode("utf-8")
+            entry = (body, hashlib.sha1(body).hexdigest())
+            cache.set(key, entry)
+        body, etag = entry
+
+        response = Response(body, mimetype="text/html")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.vary.add("Cookie")
+        response.make_conditional(request)
+        if response.status_code == 304:
+            CACHE_LOOKUPS.inc(cache="pages", result="not_modified")
+        return response
+
+    @staticmethod
+    def invalidate(page, scope=None):
+        cache.invalidate(lambda key: key[0] == page and (scope is None or key[1] == scope))
+
+    @staticmethod
+    def attendance_changed(subject_id=None):
+        PageCache.invalidate("view_records", subject_id)
+        PageCache.invalidate("admin_dashboard")
+
+    @staticmethod
+    def teacher_changed(teacher_id=None):
+        """A teacher record or one of their subjects was written."""
+        PageCache.invalidate("dashboard", teacher_id)
+        PageCache.invalidate("admin_dashboard")
+
+    @staticmethod
+    def students_changed():
+        PageCache.invalidate("admin_dashboard")
@@ -0,0 +1,309 @@
+import os
+import pickle
+import cv2
+import numpy as np
+from app.services.calibration_service import CalibrationService
+from app.services.face_tracker import overlaps_any
+from app.services.face_quality import FaceQualityGate, FACE_QUALITY_MIN_SCORE, LOW_QUALITY_LABEL
+from app.services.embedding_store import EmbeddingStore, DEFAULT_EMBEDDINGS_PATH, STORAGE_FORMATS
+from app.services.matching_service import MatchingService
+from app.services.model_bundle import ModelBundle, BUNDLE_PATH
+from app.services.metrics_service import STAGE_SECONDS, FACE_QUALITY
+
+# Recognition engines
+# -----------------------------------------------------------------------------------------
+# Every engine exposes the same batch API so deployments can pick one per room:
+#   detect(frames)        -> per frame, a list of (top, right, bottom, left) boxes
+#   embed(frames, boxes)  -> per frame, one feature per box
+#   match(features)       -> one (name, confidence) per feature, name "Unknown" if rejected
+# recognize() runs a FaceQualityGate between detect and embed; faces it rejects are never
+# encoded and come back as "Unknown (low quality)". Boxes overlapping a `skip` box (locked
+# face tracks) are detected but not encoded either; their data is None.
+# Frames are RGB numpy arrays. Select with RECOGNITION_ENGINE=auto|knn|svm|centroid|lbph|sharded
+# ('sharded' is knn against gallery shard processes listed in GALLERY_SHARDS).
+# The embedding engines read model/recognizer_bundle.npz when present (memory-mapped, no
+# unpickling) and fall back to the recognizer/label-encoder pickles.
+# Embedding galleries are held in EMBEDDING_FORMAT=float64|float32|float16|int8.
+# -----------------------------------------------------------------------------------------
+
+MODEL_PATH = "model/recognizer.pickle"
+LE_PATH = "model/le.pickle"
+LBPH_MODEL_PATH = "model/lbph_model.yml"
+LBPH_LABELS_PATH = "model/lbph_labels.pkl"
+
+# Hyperparameters for Research/Tuning
+CONF_THRESHOLD = 0.60  # SVM: 60% Confidence required (default until calibrated)
+DISTANCE_THRESHOLD = 0.50  # KNN: distance 0.0 = perfect match, > 0.6 = likely unknown
+LBPH_THRESHOLD = 95.0  # LBPH confidence; lower = better
+
+EMBEDDING_FORMAT = os.environ.get("EMBEDDING_FORMAT", "float64")
+if EMBEDDING_FORMAT not in STORAGE_FORMATS:
+    print(f"[WARN] Unknown EMBEDDING_FORMAT '{EMBEDDING_FORMAT}', using float64.")
+    EMBEDDING_FORMAT = "float64"
+
+face_recognition = None
+
+
+def _import_face_recognition():
+    # Imported lazily: loading dlib's models is what the LBPH engine avoids.
+    global face_recognition
+    if face_recognition is None:
+        import face_recognition as fr
+        face_recognition = fr
+    return face_recognition
+
+
+def _load_pickles():
+    if not os.path.exists(MODEL_PATH) or not os.path.exists(LE_PATH):
+        raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Run 'train_classifier.py' first.")
+    recognizer = pickle.loads(open(MODEL_PATH, "rb").read())
+    le = pickle.loads(open(LE_PATH, "rb").read())
+    return recognizer, le
+
+
+def _thresholds(bundle=None):
+    """Calibrated thresholds: the bundle's, else model/thresholds.json."""
+    return (bundle.thresholds if bundle is not None and bundle.thresholds else None) or \
+        CalibrationService.load_thresholds()
+
+
+class RecognitionEngine:
+    name = None
+    quality_gate = None
+
+    def load(self):
+        raise NotImplementedError
+
+    def detect(self, frames):
+        raise NotImplementedError
+
+    def embed(self, frames, boxes):
+        raise NotImplementedError
+
+    def match(self, features):
+        raise NotImplementedError
+
+    def landmarks(self, frame, boxes):
+        """5-point landmarks per box for the pose check; None when the engine has none."""
+        return None
+
+    def recognize(self, rgb_frame, skip=(), scale=1.0):
+        """Single-frame convenience used by the live loop: (face_locations, face_data).
+
+        `scale` is how much rgb_frame was shrunk from the camera frame (for the quality gate).
+        """
+        with STAGE_SECONDS.time(stage="detect"):
+            face_locations = self.detect([rgb_frame])[0]
+
+        candidates = [i for i, box in enumerate(face_locations) if not (skip and overlaps_any(box, skip))]
+        keep = candidates
+        if self.quality_gate is not None and candidates:
+            with STAGE_SECONDS.time(stage="quality"):
+                verdicts = self.quality_gate.assess(rgb_frame, [face_locations[i] for i in candidates],
+                                                    self.landmarks, scale)
+            for _, reason in verdicts:
+                FACE_QUALITY.inc(result=reason)
+            keep = [i for i, (passed, _) in zip(candidates, verdicts) if passed]
+
+        with STAGE_SECONDS.time(stage="encode"):
+            features = self.embed([rgb_frame], [[face_locations[i] for i in keep]])[0]
+        with STAGE_SECONDS.time(stage="classify"):
+            matched = self.match(features)
+
+        face_data = [None] * len(face_locations)
+        for i in candidates:
+            face_data[i] = (LOW_QUALITY_LABEL, 0.0)
+        for i, data in zip(keep, matched):
+            face_data[i] = data
+        return face_locations, face_data
+
+
+# -----------------------------
+# DLIB EMBEDDING ENGINES
+# -----------------------------
+class DlibEmbeddingEngine(RecognitionEngine):
+    detection_model = "hog"
+
+    def load(self):
+        _import_face_recognition()
+
+    def detect(self, frames):
+        return [face_recognition.face_locations(f, model=self.detection_model) for f in frames]
+
+    def embed(self, frames, boxes):
+        return [face_recognition.face_encodings(f, b) if b else [] for f, b in zip(frames, boxes)]
+
+    def landmarks(self, frame, boxes):
+        return face_recognition.face_landmarks(frame, boxes, model="small")
+
+
+class KnnEmbeddingEngine(DlibEmbeddingEngine):
+    """1-NN over the stored gallery with a distance-based "Unknown" threshold."""
+    name = "knn"
+
+    def load(self):
+        super().load()
+        bundle = None
+        if ModelBundle.exists(BUNDLE_PATH):
+            bundle = ModelBundle.load(BUNDLE_PATH)
+            embeddings, self.gallery_names = bundle.embeddings, bundle.names
+        else:
+            recognizer, le = _load_pickles()
+            if not hasattr(recognizer, "kneighbors"):
+                raise ValueError(f"{MODEL_PATH} is not a KNN model; use RECOGNITION_ENGINE=svm.")
+            # The fitted KNN keeps its training matrix; match against it directly in batches.
+            embeddings = recognizer._fit_X
+            self.gallery_names = np.asarray(le.inverse_transform(recognizer._y))
+        self.gallery = EmbeddingStore.quantize(embeddings, EMBEDDING_FORMAT)
+        self.threshold = float(_thresholds(bundle).get("distance_threshold", DISTANCE_THRESHOLD))
+
+    def match(self, features):
+        if len(features) == 0:
+            return []
+        idx, dist = MatchingService.nearest_neighbors(np.asarray(features), self.gallery)
+        return [
+            (str(self.gallery_names[i]) if d < self.threshold else "Unknown", float(1.0 - d))
+            for i, d in zip(idx, dist)
+        ]
+
+
+class ShardedKnnEngine(DlibEmbeddingEngine):
+    """1-NN like 'knn', but the gallery lives in shard processes (see shard_service)."""
+    name = "sharded"
+
+    def load(self):
+        from app.services.shard_service import ShardedMatcher
+        super().load()
+        addresses = [a for a in os.environ.get("GALLERY_SHARDS", "").split(",") if a]
+        if not addresses:
+            raise ValueError("RECOGNITION_ENGINE=sharded needs GALLERY_SHARDS=addr1,addr2,...")
+        self.matcher = ShardedMatcher(addresses)
+        bundle = ModelBundle.load(BUNDLE_PATH, verify=False) if ModelBundle.exists(BUNDLE_PATH) else None
+        self.threshold = float(_thresholds(bundle).get("distance_threshold", DISTANCE_THRESHOLD))
+
+    def match(self, features):
+        if len(features) == 0:
+            return []
+        names, dist = self.matcher.top_k(np.asarray(features), k=1)
+        return [
+            (str(n) if d < self.threshold else "Unknown", float(1.0 - d))
+            for n, d in zip(names[:, 0], dist[:, 0])
+        ]
+
+
+class SvmProbabilityEngine(DlibEmbeddingEngine):
+    """Probabilistic classifier with a confidence-based "Unknown" threshold."""
+    name = "svm"
+
+    def load(self):
+        super().load()
+        self.recognizer, self.le = _load_pickles()
+        bundle = ModelBundle.load(BUNDLE_PATH, verify=False) if ModelBundle.exists(BUNDLE_PATH) else None
+        self.threshold = float(_thresholds(bundle).get("probability_threshold", CONF_THRESHOLD))
+
+    def match(self, features):
+        if len(features) == 0:
+            return []
+        probs = self.recognizer.predict_proba(np.asarray(features))
+        best = np.argmax(probs, axis=1)
+        results = []
+        for j, p in zip(best, probs[np.arange(len(best)), best]):
+            name = str(self.le.classes_[j]) if p > self.threshold else "Unknown"
+            results.append((name, float(p)))
+        return results
+
+
+class NearestCentroidEngine(KnnEmbeddingEngine):
+    """One mean embedding per student: comparisons scale with students, not images."""
+    name = "centroid"
+
+    def load(self):
+        DlibEmbeddingEngine.load(self)
+        bundle = None
+        if ModelBundle.exists(BUNDLE_PATH):
+            bundle = ModelBundle.load(BUNDLE_PATH)
+            embeddings, names = bundle.embeddings, bundle.names
+        else:
+            embeddings, names = EmbeddingStore.load(DEFAULT_EMBEDDINGS_PATH)
+        self.gallery_names = np.unique(names)
+        self.gallery = EmbeddingStore.quantize(
+            np.stack([embeddings[names == n].mean(axis=0) for n in self.gallery_names]), EMBEDDING_FORMAT)
+        self.threshold = float(_thresholds(bundle).get("distance_threshold", DISTANCE_THRESHOLD))
+
+
+# -----------------------------
+# LBPH ENGINE (Haar + LBPH, no dlib)
+# -----------------------------
+class LbphEngine(RecognitionEngine):
+    """Cheap engine for low-power rooms; model from train_lbph.py."""
+    name = "lbph"
+    face_size = (200, 200)
+
+    def load(self):
+        if not os.path.exists(LBPH_MODEL_PATH) or not os.path.exists(LBPH_LABELS_PATH):
+            raise FileNotFoundError("Run train_lbph.py first to train the LBPH model.")
+        self.recognizer = cv2.face.LBPHFaceRecognizer_create()
+        self.recognizer.read(LBPH_MODEL_PATH)
+        with open(LBPH_LABELS_PATH, "rb") as f:
+            self.label_names = pickle.load(f)  # index -> name
+        self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_alt2.xml")
+        self.threshold = LBPH_THRESHOLD
+
+    def _gray(self, frame):
+        return cv2.equalizeHist(cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY))
+
+    def detect(self, frames):
+        boxes = []
+        for frame in frames:
+            faces = self.cascade.detectMultiScale(self._gray(frame), scaleFactor=1.1, minNeighbors=3, minSize=(40, 40))
+            boxes.append([(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in faces])
+        return boxes
+
+    def embed(self, frames, boxes):
+        crops = []
+        for frame, frame_boxes in zip(frames, boxes):
+            gray = self._gray(frame) if frame_boxes else None
+            crops.append([
+                cv2.resize(gray[top:bottom, left:right], self.face_size)
+                for (top, right, bottom, left) in frame_boxes
+            ])
+        return crops
+
+    def match(self, features):
+        results = []
+        for crop in features:
+            label_id, distance = self.recognizer.predict(crop)
+            if distance < self.threshold and 0 <= label_id < len(self.label_names):
+                name = self.label_names[label_id]
+            else:
+                name = "Unknown"
+            # Map LBPH distance onto the 0..1 confidence shown as "Diff" in the stream
+            results.append((name, max(0.0, 1.0 - distance / 100.0)))
+        return results
+
+
+class RecognitionEngines:
+    registry = {
+        KnnEmbeddingEngine.name: KnnEmbeddingEngine,
+        SvmProbabilityEngine.name: SvmProbabilityEngine,
+        NearestCentroidEngine.name: NearestCentroidEngine,
+        LbphEngine.name: LbphEngine,
+        ShardedKnnEngine.name: ShardedKnnEngine,
+    }
+
+    @staticmethod
+    def create(name="auto"):
+        """Instantiate and load an engine. 'auto' picks knn for a bundle, else follows recognizer.pickle."""
+        if name == "auto" and ModelBundle.exists(BUNDLE_PATH):
+            name = "knn"
+        elif name == "auto":
+            recognizer, _ = _load_pickles()
+            name = "knn" if hasattr(recognizer, "kneighbors") else "svm"
+        if name not in RecognitionEngines.registry:
+            raise ValueError(f"Unknown recognition engine '{name}'. "
+                             f"Choose from: auto, {', '.join(RecognitionEngines.registry)}")
+        engine = RecognitionEngines.registry[name]()
+        engine.load()
+        if FACE_QUALITY_MIN_SCORE > 0:
+            engine.quality_gate = FaceQualityGate()
+        return engine
@@ -0,0 +1,115 @@
+import os
+import secrets
+import threading
+import time
+from app.services.metrics_service import RECOGNITION_SESSIONS
+
+# Live recognition sessions
+# -----------------------------------------------------------------------------------------
+# A session is started by the camera page, kept alive by its heartbeats and stopped
+# explicitly (Stop button, page unload) or by the idle reaper after SESSION_IDLE_TIMEOUT
+# seconds without a heartbeat. The video stream for a session polls `stopping` every
+# frame; its `finally` releases the camera and sets `finished`, which stop() waits on,
+# so a stop request returns only once the camera is free. One session per subject:
+# starting a new one stops the previous one.
+# -----------------------------------------------------------------------------------------
+
+SESSION_IDLE_TIMEOUT = float(os.environ.get("SESSION_IDLE_TIMEOUT", "30"))
+SESSION_STOP_WAIT = 5.0
+
+
+class RecognitionSession:
+    def __init__(self, subject_id, teacher_id):
+        self.id = secrets.token_urlsafe(16)
+        self.subject_id = subject_id
+        self.teacher_id = teacher_id
+        self.created = self.last_seen = time.monotonic()
+        self.streaming = False
+        self.stopping = threading.Event()
+        self.finished = threading.Event()
+        self.lock = threading.Lock()
+
+    def heartbeat(self):
+        self.last_seen = time.monotonic()
+
+    def attach(self):
+        """Called by the stream when it starts; False if the session already ended."""
+        with self.lock:
+            if self.stopping.is_set() or self.streaming:
+                return False
+            self.streaming = True
+        self.heartbeat()
+        return True
+
+    def stop(self, wait=SESSION_STOP_WAIT):
+        """Ask the stream to end; True once its camera and worker are released."""
+        with self.lock:
+            self.stopping.set()
+            if not self.streaming:
+                self.finished.set()
+        return self.finished.wait(wait) if wait else self.finished.is_set()
+
+
+class RecognitionSessions:
+    _sessions = {}
+    _lock = threading.Lock()
+    _reaper = None
+    idle_timeout = SESSION_IDLE_TIMEOUT
+
+    @staticmethod
+    def start(subject_id, teacher_id):
+        with RecognitionSessions._lock:
+            previous = [s for s in RecognitionSessions._sessions.values() if s.subject_id == subject_id]
+            for s in previous:
+                del RecognitionSessions._sessions[s.id]
+            session = RecognitionSession(subject_id, teacher_id)
+            RecognitionSessions._sessions[session.id] = session
+            RecognitionSessions._ensure_reaper()
+        for s in previous:
+            # The camera is exclusive: free it before the new stream opens it
+            RECOGNITION_SESSIONS.inc(result="replaced")
+            s.stop()
+        RECOGNITION_SESSIONS.inc(result="started")
+        return session
+
+    @staticmethod
+    def get(session_id):
+        return RecognitionSessions._sessions.get(session_id)
+
+    @staticmethod
+    def stop(session_id, reason="stopped"):
+        with RecognitionSessions._lock:
+            session = RecognitionSessions._sessions.pop(session_id, None)
+        if session is None:
+            return None
+        RECOGNITION_SESSIONS.inc(result=reason)
+        return session.stop(wait=SESSION_STOP_WAIT if reason == "stopped" else 0)
+
+    @staticmethod
+    def stop_all():
+        for session_id in list(RecognitionSessions._sessions):
+            RecognitionSessions.stop(session_id, reason="shutdown")
+
+    @staticmethod
+    def reap_idle(now=None):
+        """Stop sessions with no heartbeat for idle_timeout seconds; returns how many."""
+        now = time.monotonic() if now is None else now
+        idle = [s.id for s in list(RecognitionSessions._sessions.values())
+                if now - s.last_seen > RecognitionSessions.idle_timeout]
+        for session_id in idle:
+            print(f"[INFO] Stopping idle recognition session {session_id}")
+            RecognitionSessions.stop(session_id, reason="idle")
+        return len(idle)
+
+    @staticmethod
+    def _ensure_reaper():
+        if RecognitionSessions._reaper is not None and RecognitionSessions._reaper.is_alive():
+            return
+
+        def run():
+            while True:
+                time.sleep(max(1.0, RecognitionSessions.idle_timeout / 3))
+                RecognitionSessions.reap_idle()
+
+        RecognitionSessions._reaper = threading.Thread(target=run, name="session-reaper", daemon=True)
+        RecognitionSessions._reaper.start()
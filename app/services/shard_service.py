@@ -0,0 +1,268 @@
+import multiprocessing
+import os
+import secrets
+import tempfile
+import threading
+import time
+import numpy as np
+from multiprocessing.connection import Client, Listener
+from app.services.embedding_store import EmbeddingStore
+from app.services.matching_service import MatchingService
+from app.services.message_framing import send_message, recv_message
+from app.services.model_bundle import ModelBundle, BUNDLE_PATH
+
+# Sharded gallery search
+# -----------------------------------------------------------------------------------------
+# The gallery is split into contiguous row ranges, one per shard process. A shard listens
+# on a Unix socket (same host) or host:port (other hosts) and answers a batch of queries
+# with its local top-k names and distances. The coordinator
+# (ShardedMatcher) scatters each query batch to every shard before reading any reply, so
+# shards search in parallel, then merges the per-shard lists into the global top-k.
+# Shards map only their slice of the bundle, so N shards together hold one copy of it.
+# On connect the coordinator asks every shard for its index, count and bundle sha256 and
+# refuses a set that is not partitions 0..N-1 of one bundle (a missing, duplicated or
+# stale shard would otherwise silently drop or double students). A shard that restarts is
+# reconnected on the next query.
+#
+# Messages use message_framing (JSON header plus raw queries/distances, never pickles).
+# Connections are authenticated with SHARD_AUTHKEY; there is no default key, and shards
+# refuse to start without one (spawn_local() generates a random key for its children).
+#
+#   SHARD_AUTHKEY=$(openssl rand -hex 32)   # same value on every shard and the app
+#   python3 shard_server.py --index 0 --count 4 --listen 0.0.0.0:7100   # one per shard
+#   GALLERY_SHARDS=hostA:7100,hostA:7101,hostB:7100,hostB:7101 RECOGNITION_ENGINE=sharded ...
+# -----------------------------------------------------------------------------------------
+
+EMBEDDING_FORMAT = os.environ.get("EMBEDDING_FORMAT", "float64")
+MAX_MESSAGE_BYTES = int(os.environ.get("SHARD_MAX_MESSAGE_MB", "64")) * 1024 * 1024
+
+
+def _authkey(authkey=None):
+    """The shared connection key as bytes; refuses to run without one."""
+    authkey = authkey or os.environ.get("SHARD_AUTHKEY")
+    if not authkey:
+        raise ValueError("Gallery shards need a shared secret: set SHARD_AUTHKEY on every shard and the app.")
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+def parse_address(address):
+    """'host:port' -> (host, port) over TCP; anything else is a Unix socket path."""
+    if isinstance(address, tuple):
+        return address
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def _family(address):
+    return "AF_INET" if isinstance(address, tuple) else "AF_UNIX"
+
+
+class ShardServer:
+    """Holds one partition of the gallery and answers top-k queries for it."""
+
+    def __init__(self, embeddings, names, address, authkey=None, index=0, count=1, bundle_sha256=None):
+        self.gallery = EmbeddingStore.quantize(embeddings, EMBEDDING_FORMAT)
+        self.names = np.asarray(names)
+        self.address = parse_address(address)
+        self.authkey = _authkey(authkey)
+        self.index, self.count, self.bundle_sha256 = index, count, bundle_sha256
+
+    @staticmethod
+    def partition(rows, count, index):
+        """(start, stop) rows of shard `index` out of `count`; sizes differ by at most one."""
+        bounds = np.linspace(0, rows, count + 1).round().astype(int)
+        return int(bounds[index]), int(bounds[index + 1])
+
+    @staticmethod
+    def from_bundle(index, count, address, bundle_path=BUNDLE_PATH, authkey=None):
+        bundle = ModelBundle.load(bundle_path, verify=False)
+        start, stop = ShardServer.partition(len(bundle.labels), count, index)
+        # Slicing the memory-mapped arrays pages in only this shard's rows
+        return ShardServer(bundle.embeddings[start:stop], bundle.names[start:stop], address, authkey,
+                           index=index, count=count, bundle_sha256=bundle.sha256)
+
+    def match(self, queries, k):
+        if queries.ndim != 2 or queries.shape[1] != self.gallery.shape[1]:
+            raise ValueError(f"expected (n, {self.gallery.shape[1]}) queries, got {queries.shape}")
+        indices, distances = MatchingService.top_k(queries, self.gallery, k)
+        return self.names[indices], distances
+
+    def serve_forever(self):
+        if _family(self.address) == "AF_UNIX" and os.path.exists(self.address):
+            os.unlink(self.address)
+        with Listener(self.address, family=_family(self.address), authkey=self.authkey) as listener:
+            print(f"[INFO] Gallery shard with {len(self.names)} rows listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"[WARN] Rejected shard connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        try:
+            while True:
+                try:
+                    header, array = recv_message(conn, MAX_MESSAGE_BYTES)
+                except (EOFError, OSError):
+                    break
+                except ValueError as e:
+                    send_message(conn, {"status": "error", "error": str(e)})
+                    continue
+                op = header.get("op")
+                if op == "close":
+                    break
+                try:
+                    if op == "match":
+                        if array is None:
+                            raise ValueError("match request without queries")
+                        names, distances = self.match(array, int(header.get("k", 1)))
+                        send_message(conn, {"status": "ok", "names": names.astype(str).tolist()}, distances)
+                    elif op == "info":
+                        send_message(conn, {"status": "ok", "rows": len(self.names), "index": self.index,
+                                     "count": self.count, "sha256": self.bundle_sha256})
+                    else:
+                        send_message(conn, {"status": "error", "error": f"unknown request {op!r}"})
+                except Exception as e:
+                    send_message(conn, {"status": "error", "error": str(e)})
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+
+def _serve_local(index, count, address, bundle_path, authkey):
+    ShardServer.from_bundle(index, count, address, bundle_path, authkey).serve_forever()
+
+
+class ShardedMatcher:
+    """Scatter-gather client over every shard of the gallery."""
+
+    def __init__(self, addresses, connect_timeout=10.0, authkey=None):
+        self.addresses = [parse_address(a) for a in addresses]
+        self.authkey = _authkey(authkey)
+        self.connect_timeout = connect_timeout
+        self.processes = []
+        self.conns = self._connect_all()
+        # One request in flight per connection; callers may share the matcher across threads
+        self.lock = threading.Lock()
+
+    def _connect_all(self):
+        conns = []
+        try:
+            for address in self.addresses:
+                conns.append(self._connect(address, self.connect_timeout))
+            self._validate(conns)
+        except Exception:
+            self._close_conns(conns)
+            raise
+        return conns
+
+    def _validate(self, conns):
+        """Require the shards to be partitions 0..N-1, each exactly once, of one bundle."""
+        infos = []
+        for address, conn in zip(self.addresses, conns):
+            send_message(conn, {"op": "info"})
+            header, _ = recv_message(conn)
+            if header.get("status") != "ok":
+                raise ValueError(f"Gallery shard {address} error: {header.get('error')}")
+            infos.append(header)
+        count = len(conns)
+        problems = []
+        counts = {info.get("count") for info in infos}
+        if counts != {count}:
+            problems.append(f"shards were started with --count {sorted(counts, key=str)} "
+                            f"but {count} addresses are configured")
+        indices = [info.get("index") for info in infos]
+        if set(indices) != set(range(count)):
+            problems.append(f"shard indices are {indices}, expected each of 0..{count - 1} once")
+        digests = {info.get("sha256") for info in infos}
+        if len(digests) != 1:
+            problems.append(f"shards serve different bundles (sha256 {', '.join(sorted(map(str, digests)))})")
+        if problems:
+            raise ValueError("Gallery shards do not cover one model bundle: " + "; ".join(problems))
+
+    def _reconnect(self):
+        # Fresh connections: replies still in flight on the old ones are dropped with them
+        self._close_conns(self.conns)
+        self.conns = []
+        self.conns = self._connect_all()
+
+    def _connect(self, address, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return Client(address, family=_family(address), authkey=self.authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    @staticmethod
+    def spawn_local(count, bundle_path=BUNDLE_PATH, socket_dir=None):
+        """Start `count` shard processes on this host and connect to them."""
+        socket_dir = socket_dir or tempfile.mkdtemp(prefix="gallery_shards_")
+        # Private children: a fresh random key unless SHARD_AUTHKEY is set
+        authkey = os.environ.get("SHARD_AUTHKEY") or secrets.token_hex(32)
+        addresses = [os.path.join(socket_dir, f"shard{i}.sock") for i in range(count)]
+        processes = []
+        for i, address in enumerate(addresses):
+            process = multiprocessing.Process(target=_serve_local, args=(i, count, address, bundle_path, authkey),
+                                              name=f"gallery-shard-{i}", daemon=True)
+            process.start()
+            processes.append(process)
+        try:
+            matcher = ShardedMatcher(addresses, connect_timeout=60.0, authkey=authkey)
+        except Exception:
+            for process in processes:
+                process.terminate()
+            raise
+        matcher.processes = processes
+        return matcher
+
+    def top_k(self, queries, k=1):
+        """(names, distances), each (len(queries), k), nearest first across all shards."""
+        queries = np.ascontiguousarray(queries, dtype=np.float64)
+        with self.lock:
+            try:
+                replies = self._scatter_gather(queries, k)
+            except (EOFError, OSError) as e:
+                print(f"[WARN] Lost a gallery shard connection ({e!r}); reconnecting")
+                self._reconnect()
+                replies = self._scatter_gather(queries, k)
+        names, distances = [], []
+        for address, (header, array) in zip(self.addresses, replies):
+            if header.get("status") != "ok":
+                raise RuntimeError(f"Gallery shard {address} error: {header.get('error')}")
+            names.append(np.asarray(header["names"], dtype=str).reshape(array.shape))
+            distances.append(array)
+        names = np.concatenate(names, axis=1)
+        distances = np.concatenate(distances, axis=1)
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(names, order, axis=1), np.take_along_axis(distances, order, axis=1)
+
+    def _scatter_gather(self, queries, k):
+        if len(self.conns) != len(self.addresses):
+            raise OSError("not connected to every gallery shard")
+        # Scatter to every shard before gathering, so they search concurrently
+        for conn in self.conns:
+            send_message(conn, {"op": "match", "k": int(k)}, queries)
+        return [recv_message(conn) for conn in self.conns]
+
+    @staticmethod
+    def _close_conns(conns):
+        for conn in conns:
+            try:
+                send_message(conn, {"op": "close"})
+            except OSError:
+                pass
+            conn.close()
+
+    def close(self):
+        self._close_conns(self.conns)
+        for process in self.processes:
+            process.terminate()
+            process.join(timeout=5)
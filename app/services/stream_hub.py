@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Async MJPEG fan-out
+# -----------------------------------------------------------------------------------------
+# One producer per subject runs the (blocking) recognition generator on an executor
+# thread and publishes the latest JPEG chunk. Viewers are coroutines awaiting the next
+# frame, so an idle viewer holds no thread; a slow viewer simply skips frames.
+# The producer stops when its last viewer leaves, or when its recognition session
+# (if any) is stopped; a broadcast whose session is stopping is never handed to new
+# viewers, they get a fresh producer for their own session instead.
+# -----------------------------------------------------------------------------------------
+
+
+class FrameBroadcast:
+    def __init__(self, subject_id, loop, frame_source, live=None):
+        self.subject_id = subject_id
+        self.live = live
+        self.loop = loop
+        self.frame_source = frame_source
+        self.latest = None
+        self.seq = 0
+        self.viewers = 0
+        self.done = False
+        self.stopping = threading.Event()
+        self._event = asyncio.Event()
+
+    def produce(self):
+        """Runs on an executor thread: drives the blocking generator."""
+        frames = self.frame_source(self.subject_id, self.live)
+        try:
+            for chunk in frames:
+                if self.stopping.is_set():
+                    break
+                self.loop.call_soon_threadsafe(self._publish, chunk)
+        finally:
+            frames.close()
+            self.loop.call_soon_threadsafe(self._finish)
+
+    def _publish(self, chunk):
+        self.latest = chunk
+        self.seq += 1
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    def _finish(self):
+        self.done = True
+        self._event.set()
+
+    async def frames(self):
+        """Async iterator over the newest frames for one viewer."""
+        seen = 0
+        while True:
+            event = self._event
+            if self.seq == seen:
+                if self.done:
+                    return
+                await event.wait()
+                continue
+            seen = self.seq
+            yield self.latest
+
+
+class StreamHub:
+    def __init__(self, frame_source, max_streams=8):
+        self.frame_source = frame_source
+        self.max_streams = max_streams
+        self.executor = ThreadPoolExecutor(max_workers=max_streams, thread_name_prefix="stream")
+        self.broadcasts = {}
+        # Producers whose produce() has not returned yet, including stopped ones still
+        # waiting on a camera read: each holds an executor thread until it does
+        self.producers = set()
+        self._producers_lock = threading.Lock()
+
+    def subscribe(self, subject_id, live=None):
+        """The subject's broadcast, started if needed; None when every producer slot is taken."""
+        broadcast = self.broadcasts.get(subject_id)
+        if broadcast is None or broadcast.done or broadcast.stopping.is_set() or \
+                (broadcast.live is not None and broadcast.live.stopping.is_set()):
+            # Every producer needs its own executor thread; never queue one behind another
+            with self._producers_lock:
+                if len(self.producers) >= self.max_streams:
+                    return None
+                broadcast = FrameBroadcast(subject_id, asyncio.get_running_loop(), self.frame_source, live)
+                self.producers.add(broadcast)
+            self.broadcasts[subject_id] = broadcast
+            broadcast.loop.run_in_executor(self.executor, self._produce, broadcast)
+        broadcast.viewers += 1
+        return broadcast
+
+    def _produce(self, broadcast):
+        try:
+            broadcast.produce()
+        finally:
+            with self._producers_lock:
+                self.producers.discard(broadcast)
+
+    def unsubscribe(self, broadcast):
+        broadcast.viewers -= 1
+        if broadcast.viewers <= 0:
+            broadcast.stopping.set()
+            if self.broadcasts.get(broadcast.subject_id) is broadcast:
+                del self.broadcasts[broadcast.subject_id]
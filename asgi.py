@@ -0,0 +1,4 @@
+from app.asgi import application
+
+# ASGI entry point: uvicorn asgi:application --port 5000
+# (run.py keeps the threaded Flask development server)
@@ -0,0 +1,89 @@
+# benchmarks/bench_engines.py
+# -----------------------------------------------------------------------------------------
+# Same-harness comparison of the recognition engines (knn, svm, centroid, lbph).
+# Every engine sees the same decoded frames at the live-loop scale and is timed per stage.
+#
+# Usage (from the project root):
+#   python3 -m benchmarks.bench_engines --dataset model/student_images --engines knn lbph
+#
+# Note: scoring on the training images is optimistic; point --dataset at held-out photos
+# (same <Name>/ folder layout) for a fair accuracy comparison.
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import os
+import time
+import cv2
+import numpy as np
+from app.services.recognition_engines import RecognitionEngines
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-i", "--dataset", default="model/student_images",
+                help="directory of <Name>/<image> files")
+ap.add_argument("--engines", nargs="+", default=list(RecognitionEngines.registry),
+                help="engines to benchmark")
+ap.add_argument("--scale", type=float, default=0.5,
+                help="resize factor applied before recognition (live loop uses 0.5)")
+ap.add_argument("--limit", type=int, default=0,
+                help="maximum number of images (0 = all)")
+args = vars(ap.parse_args())
+
+frames, truths = [], []
+for root, _, files in os.walk(args["dataset"]):
+    for file in sorted(files):
+        if not file.lower().endswith((".png", ".jpg", ".jpeg")):
+            continue
+        image = cv2.imread(os.path.join(root, file))
+        if image is None:
+            continue
+        if args["scale"] != 1.0:
+            image = cv2.resize(image, (0, 0), fx=args["scale"], fy=args["scale"])
+        frames.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        truths.append(os.path.basename(root))
+        if args["limit"] and len(frames) >= args["limit"]:
+            break
+    if args["limit"] and len(frames) >= args["limit"]:
+        break
+
+print(f"[INFO] benchmarking on {len(frames)} images (scale {args['scale']})")
+
+rows = []
+for name in args["engines"]:
+    start = time.perf_counter()
+    try:
+        engine = RecognitionEngines.create(name)
+    except Exception as e:
+        print(f"[WARN] skipping '{name}': {e}")
+        continue
+    load_s = time.perf_counter() - start
+
+    stage = {"detect": [], "embed": [], "match": []}
+    correct = unknown = faces = 0
+    for frame, truth in zip(frames, truths):
+        t0 = time.perf_counter()
+        boxes = engine.detect([frame])
+        t1 = time.perf_counter()
+        features = engine.embed([frame], boxes)
+        t2 = time.perf_counter()
+        results = engine.match(features[0])
+        t3 = time.perf_counter()
+        stage["detect"].append(t1 - t0)
+        stage["embed"].append(t2 - t1)
+        stage["match"].append(t3 - t2)
+
+        faces += len(results)
+        predicted = [n for n, _ in results]
+        correct += truth in predicted
+        unknown += bool(predicted) and all(n == "Unknown" for n in predicted)
+
+    n = max(len(frames), 1)
+    rows.append((name, load_s, *(np.mean(stage[k]) * 1000 for k in ("detect", "embed", "match")),
+                 faces / n, correct / n, unknown / n))
+
+print("\n" + "="*96)
+print(f"{'engine':<10}{'load s':>8}{'detect ms':>11}{'embed ms':>10}{'match ms':>10}"
+      f"{'total ms':>10}{'faces/img':>11}{'correct':>10}{'unknown':>10}")
+print("="*96)
+for name, load_s, d, e, m, fpi, acc, unk in rows:
+    print(f"{name:<10}{load_s:>8.2f}{d:>11.2f}{e:>10.2f}{m:>10.3f}{d + e + m:>10.2f}"
+          f"{fpi:>11.2f}{acc*100:>9.1f}%{unk*100:>9.1f}%")
@@ -0,0 +1,110 @@
+# benchmarks/bench_model_load.py
+# -----------------------------------------------------------------------------------------
+# Load time of the recognizer/label-encoder pickles vs. the .npz model bundle, measured
+# the way the KNN engine loads them (gallery matrix + per-row names ready to match).
+# "fresh" runs each loader once in a new interpreter, which includes importing sklearn
+# for the pickles; "warm" is the median of repeated loads in this process.
+#
+# Usage (from the project root):
+#   python3 -m benchmarks.bench_model_load                       # current model/ files
+#   python3 -m benchmarks.bench_model_load --synthetic 50000     # generated gallery
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import os
+import pickle
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-m", "--model", default="model/recognizer.pickle")
+ap.add_argument("-l", "--le", default="model/le.pickle")
+ap.add_argument("-b", "--bundle", default="model/recognizer_bundle.npz")
+ap.add_argument("--synthetic", type=int, default=0,
+                help="generate a gallery of this many embeddings instead of using model/")
+ap.add_argument("--classes", type=int, default=500,
+                help="identities in the synthetic gallery")
+ap.add_argument("--repeats", type=int, default=20)
+args = vars(ap.parse_args())
+
+if args["synthetic"]:
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.preprocessing import LabelEncoder
+    from app.services.model_bundle import ModelBundle
+
+    workdir = tempfile.mkdtemp(prefix="bench_model_load_")
+    args.update(model=os.path.join(workdir, "recognizer.pickle"), le=os.path.join(workdir, "le.pickle"),
+                bundle=os.path.join(workdir, "bundle.npz"))
+    rng = np.random.default_rng(0)
+    names = np.array([f"student_{i:05d}" for i in rng.integers(0, args["classes"], args["synthetic"])])
+    embeddings = rng.normal(0, 0.1, (args["synthetic"], 128))
+    le = LabelEncoder()
+    labels = le.fit_transform(names)
+    recognizer = KNeighborsClassifier(n_neighbors=1).fit(embeddings, labels)
+    with open(args["model"], "wb") as f:
+        f.write(pickle.dumps(recognizer))
+    with open(args["le"], "wb") as f:
+        f.write(pickle.dumps(le))
+    ModelBundle(embeddings, labels, le.classes_).save(args["bundle"])
+    print(f"[INFO] synthetic gallery: {args['synthetic']} x 128, {args['classes']} classes in {workdir}")
+
+LOADERS = {
+    "pickles": f"""
+import pickle, numpy as np
+recognizer = pickle.loads(open({args['model']!r}, "rb").read())
+le = pickle.loads(open({args['le']!r}, "rb").read())
+gallery, names = recognizer._fit_X, np.asarray(le.inverse_transform(recognizer._y))
+""",
+    "bundle (mmap, verified)": f"""
+from app.services.model_bundle import ModelBundle
+b = ModelBundle.load({args['bundle']!r}); gallery, names = b.embeddings, b.names
+""",
+    "bundle (mmap, no checksum)": f"""
+from app.services.model_bundle import ModelBundle
+b = ModelBundle.load({args['bundle']!r}, verify=False); gallery, names = b.embeddings, b.names
+""",
+    "bundle (read into memory)": f"""
+from app.services.model_bundle import ModelBundle
+b = ModelBundle.load({args['bundle']!r}, mmap=False); gallery, names = b.embeddings, b.names
+""",
+}
+
+missing = [p for p in (args["model"], args["le"], args["bundle"]) if not os.path.exists(p)]
+if missing:
+    print(f"[ERROR] missing {', '.join(missing)}; run train_classifier.py or use --synthetic N.")
+    sys.exit(1)
+
+
+def fresh(code):
+    """Milliseconds for one load in a new interpreter (imports included)."""
+    timer = "import time; _t = time.perf_counter()\n" + code + "\nprint((time.perf_counter() - _t) * 1000)"
+    out = subprocess.run([sys.executable, "-c", timer], capture_output=True, text=True, check=True,
+                         cwd=os.getcwd())
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def warm(code):
+    namespace = {}
+    exec(code, namespace)  # first run pays the imports
+    samples = []
+    for _ in range(args["repeats"]):
+        start = time.perf_counter()
+        exec(code, namespace)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+pickle_bytes = os.path.getsize(args["model"]) + os.path.getsize(args["le"])
+print(f"[INFO] pickles: {pickle_bytes / 1024:.0f} KB | bundle: {os.path.getsize(args['bundle']) / 1024:.0f} KB")
+print("\n" + "="*62)
+print(f"{'loader':<28} {'fresh ms':>10} {'warm ms':>10} {'vs pickles':>10}")
+print("="*62)
+baseline = None
+for name, code in LOADERS.items():
+    f, w = fresh(code), warm(code)
+    baseline = baseline or w
+    print(f"{name:<28} {f:>10.1f} {w:>10.2f} {baseline / w:>9.1f}x")
@@ -0,0 +1,68 @@
+# benchmarks/bench_quantization.py
+# -----------------------------------------------------------------------------------------
+# Accuracy and throughput of reduced-precision embedding galleries.
+#   - Accuracy: the vectorized leave-one-out 1-NN evaluation from train_classifier.py,
+#     with float64 queries against a gallery stored in each format.
+#   - Throughput: batched 1-NN queries per second against a gallery grown to
+#     --gallery-size rows (jittered copies of the real embeddings).
+#
+# Usage (from the project root):
+#   python3 -m benchmarks.bench_quantization --embeddings model/embeddings.pickle
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import time
+import numpy as np
+from app.services.embedding_store import EmbeddingStore, STORAGE_FORMATS
+from app.services.matching_service import MatchingService
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-e", "--embeddings", default="model/embeddings.pickle",
+                help="path to serialized facial embeddings")
+ap.add_argument("--threshold", type=float, default=0.50,
+                help="distance threshold used for the 'accepted' rate")
+ap.add_argument("--gallery-size", type=int, default=100000,
+                help="gallery rows for the throughput test")
+ap.add_argument("--queries", type=int, default=256,
+                help="query batch size for the throughput test")
+ap.add_argument("--repeats", type=int, default=5,
+                help="timed repetitions per format")
+args = vars(ap.parse_args())
+
+embeddings, names = EmbeddingStore.load(args["embeddings"])
+rng = np.random.default_rng(0)
+
+reps = -(-args["gallery_size"] // len(embeddings))
+big = np.tile(embeddings, (reps, 1))[:args["gallery_size"]]
+big = big + rng.normal(scale=0.01, size=big.shape)
+queries = embeddings[rng.integers(len(embeddings), size=args["queries"])]
+
+print(f"[INFO] {len(embeddings)} embeddings; throughput gallery {len(big)} rows, batch {len(queries)}")
+print("\n" + "="*86)
+print(f"{'format':<9}{'bytes/vec':>10}{'LOO acc':>10}{'accepted':>10}{'pred. changed':>15}"
+      f"{'max |dd|':>10}{'queries/s':>12}{'speedup':>10}")
+print("="*86)
+
+baseline_pred = baseline_qps = baseline_dist = None
+for fmt in STORAGE_FORMATS:
+    gallery = EmbeddingStore.quantize(embeddings, fmt)
+    idx, dist = MatchingService.leave_one_out_nearest(embeddings, gallery=gallery)
+    pred = names[idx]
+    acc = np.mean(pred == names)
+    accepted = np.mean((pred == names) & (dist < args["threshold"]))
+    if baseline_pred is None:
+        baseline_pred, baseline_dist = pred, dist
+    changed = np.sum(pred != baseline_pred)
+    max_dd = np.max(np.abs(dist - baseline_dist))
+
+    big_gallery = EmbeddingStore.quantize(big, fmt)
+    q = queries.astype(np.float32) if fmt != "float64" else queries
+    MatchingService.nearest_neighbors(q, big_gallery)  # warm-up
+    start = time.perf_counter()
+    for _ in range(args["repeats"]):
+        MatchingService.nearest_neighbors(q, big_gallery)
+    qps = args["repeats"] * len(q) / (time.perf_counter() - start)
+    baseline_qps = baseline_qps or qps
+
+    print(f"{fmt:<9}{big_gallery.nbytes / len(big):>10.0f}{acc*100:>9.2f}%{accepted*100:>9.2f}%"
+          f"{changed:>15d}{max_dd:>10.4f}{qps:>12.0f}{qps / baseline_qps:>9.2f}x")
@@ -0,0 +1,81 @@
+# benchmarks/bench_shards.py
+# -----------------------------------------------------------------------------------------
+# Query throughput of the sharded gallery matcher vs. shard count. Shards run as local
+# processes over Unix sockets; each batch is scattered to all shards and merged.
+# Results are checked against a single in-process 1-NN search.
+#
+# Usage (from the project root):
+#   python3 -m benchmarks.bench_shards --gallery 200000 --shards 1,2,4,8
+#   python3 -m benchmarks.bench_shards --bundle model/recognizer_bundle.npz --shards 1,2
+#
+# Scaling is bounded by physical cores: with fewer cores than shards, shards time-share.
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from app.services.matching_service import MatchingService
+from app.services.model_bundle import ModelBundle
+from app.services.shard_service import ShardedMatcher
+
+ap = argparse.ArgumentParser()
+ap.add_argument("--bundle", default=None,
+                help="existing model bundle (default: a synthetic one)")
+ap.add_argument("--gallery", type=int, default=200000,
+                help="rows in the synthetic gallery")
+ap.add_argument("--classes", type=int, default=5000,
+                help="identities in the synthetic gallery")
+ap.add_argument("--shards", default="1,2,4",
+                help="comma-separated shard counts to compare")
+ap.add_argument("--batch", type=int, default=256,
+                help="queries per scatter-gather round")
+ap.add_argument("--rounds", type=int, default=20,
+                help="timed rounds per shard count")
+ap.add_argument("-k", type=int, default=1,
+                help="neighbours returned per query")
+args = vars(ap.parse_args())
+
+rng = np.random.default_rng(0)
+bundle_path = args["bundle"]
+if bundle_path is None:
+    workdir = tempfile.mkdtemp(prefix="bench_shards_")
+    bundle_path = os.path.join(workdir, "bundle.npz")
+    labels = rng.integers(0, args["classes"], args["gallery"])
+    ModelBundle(rng.normal(0, 0.1, (args["gallery"], 128)), labels,
+                np.array([f"student_{i:05d}" for i in range(args["classes"])])).save(bundle_path)
+    print(f"[INFO] synthetic gallery: {args['gallery']} x 128, {args['classes']} classes in {workdir}")
+
+bundle = ModelBundle.load(bundle_path, verify=False)
+gallery, names = np.asarray(bundle.embeddings), bundle.names
+# Queries near real gallery rows, like faces of enrolled students
+batches = [gallery[rng.integers(0, len(gallery), args["batch"])] + rng.normal(0, 0.02, (args["batch"], 128))
+           for _ in range(args["rounds"])]
+
+start = time.perf_counter()
+expected_idx, expected_dist = MatchingService.nearest_neighbors(batches[0], gallery)
+single = (time.perf_counter() - start) / len(batches[0])
+print(f"[INFO] {len(gallery)} rows, batch {args['batch']}, {os.cpu_count()} CPUs; "
+      f"in-process 1-NN: {1 / single:.0f} queries/s")
+
+print("\n" + "="*66)
+print(f"{'shards':>6} {'queries/s':>12} {'ms/batch':>10} {'speedup':>9} {'efficiency':>11} {'exact':>8}")
+print("="*66)
+baseline = None
+for count in [int(c) for c in args["shards"].split(",")]:
+    matcher = ShardedMatcher.spawn_local(count, bundle_path)
+    try:
+        found_names, found_dist = matcher.top_k(batches[0], args["k"])  # warm-up + correctness
+        exact = np.mean(found_names[:, 0] == names[expected_idx]) * 100
+        start = time.perf_counter()
+        for batch in batches:
+            matcher.top_k(batch, args["k"])
+        elapsed = time.perf_counter() - start
+    finally:
+        matcher.close()
+    qps = args["rounds"] * args["batch"] / elapsed
+    baseline = baseline or qps / count  # per-shard throughput of the first row
+    speedup = qps / baseline
+    print(f"{count:>6} {qps:>12.0f} {elapsed / args['rounds'] * 1000:>10.1f} {speedup:>8.2f}x "
+          f"{speedup / count * 100:>10.0f}% {exact:>7.1f}%")
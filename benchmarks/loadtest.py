@@ -0,0 +1,246 @@
+# benchmarks/loadtest.py
+# -----------------------------------------------------------------------------------------
+# Simulates many classrooms at once against a scratch copy of the database. Each room is a
+# thread looping over a weighted mix of operations:
+#   mark       AttendanceRepository.mark_attendance for a random enrolled student
+#   records    GET /view_records/<subject> as the room's teacher
+#   admin      GET /admin/dashboard and its first data page as an admin
+#   recognize  one recorded frame through the recognition engine (needs --frames)
+# and reports throughput, tail latency and SQLite "database is locked" errors per operation.
+#
+# Usage (from the project root):
+#   python3 -m benchmarks.loadtest --rooms 40 --duration 30 --mix mark:8,records:1,admin:1
+#   python3 -m benchmarks.loadtest --rooms 8 --mix recognize:1,mark:1 --frames recorded.mp4
+#
+# The app's own database is never touched unless --db points at it.
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import cv2
+import numpy as np
+
+ap = argparse.ArgumentParser()
+ap.add_argument("--rooms", type=int, default=20,
+                help="concurrent classrooms (threads)")
+ap.add_argument("--duration", type=float, default=20.0,
+                help="seconds to run")
+ap.add_argument("--mix", default="mark:8,records:1,admin:1",
+                help="weighted operations, e.g. mark:8,records:1,admin:1,recognize:2")
+ap.add_argument("--think", type=float, default=0.0,
+                help="seconds each room waits between operations")
+ap.add_argument("--students", type=int, default=300,
+                help="enrolled students to seed (each can be marked once per subject per day)")
+ap.add_argument("--history-days", type=int, default=30,
+                help="days of past attendance seeded per subject (sizes the records pages)")
+ap.add_argument("--db", default=None,
+                help="existing database to run against (default: a seeded scratch database)")
+ap.add_argument("--frames", default=None,
+                help="video file or image directory of recorded frames for 'recognize'")
+ap.add_argument("--engine", default=os.environ.get("RECOGNITION_ENGINE", "auto"),
+                help="recognition engine for 'recognize' (one instance per room)")
+ap.add_argument("--verbose", action="store_true",
+                help="keep the app's per-call log output")
+args = vars(ap.parse_args())
+
+OPERATIONS = ("mark", "records", "admin", "recognize")
+mix = {}
+for part in args["mix"].split(","):
+    op, _, weight = part.partition(":")
+    if op not in OPERATIONS:
+        ap.error(f"unknown operation '{op}' (choose from {', '.join(OPERATIONS)})")
+    mix[op] = float(weight or 1)
+if "recognize" in mix and not args["frames"]:
+    ap.error("'recognize' needs --frames")
+
+
+# -----------------------------
+# DATABASE
+# -----------------------------
+def seed(db_path, rooms, students, history_days):
+    from database_setup import init_db
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    cur.execute("INSERT INTO admins (name, email, password) VALUES ('Load Admin', 'admin@load.test', 'x')")
+    names = [f"Student_{i:04d}" for i in range(students)]
+    cur.executemany("INSERT INTO students (name, roll_number, email) VALUES (?, ?, ?)",
+                    [(n, f"R{i:05d}", f"{n.lower()}@load.test") for i, n in enumerate(names)])
+    rng = random.Random(0)
+    today = np.datetime64("today")
+    for room in range(rooms):
+        cur.execute("INSERT INTO teachers (name, email, password) VALUES (?, ?, 'x')",
+                    (f"Teacher {room}", f"teacher{room}@load.test"))
+        cur.execute("INSERT INTO subjects (teacher_id, subject_name) VALUES (?, ?)",
+                    (cur.lastrowid, f"Subject {room}"))
+        subject_id = cur.lastrowid
+        rows = []
+        for day in range(1, history_days + 1):
+            date = str(today - day)
+            for n in rng.sample(names, k=int(len(names) * 0.8)):
+                rows.append((subject_id, n, date, f"09:{rng.randrange(60):02d}:{rng.randrange(60):02d}"))
+        cur.executemany("INSERT INTO attendance (subject_id, student_name, date, time) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return names
+
+
+def load_frames(path, limit=200):
+    frames = []
+    if os.path.isdir(path):
+        for file in sorted(os.listdir(path))[:limit]:
+            image = cv2.imread(os.path.join(path, file))
+            if image is not None:
+                frames.append(image)
+    else:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < limit:
+            ok, image = cap.read()
+            if not ok:
+                break
+            frames.append(image)
+        cap.release()
+    # Same preprocessing as the live loop
+    return [cv2.cvtColor(cv2.resize(f, (0, 0), fx=0.5, fy=0.5), cv2.COLOR_BGR2RGB) for f in frames]
+
+
+workdir = None
+if args["db"]:
+    db_path = args["db"]
+    conn = sqlite3.connect(db_path)
+    students = [r[0] for r in conn.execute("SELECT name FROM students")] or [f"Student_{i:04d}" for i in range(args["students"])]
+    subjects = [r for r in conn.execute("SELECT id, teacher_id FROM subjects")]
+    admin = conn.execute("SELECT id, name FROM admins LIMIT 1").fetchone() or (1, "Load Admin")
+    conn.close()
+    if not subjects:
+        raise SystemExit(f"[ERROR] {db_path} has no subjects to load-test against.")
+else:
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    db_path = os.path.join(workdir, "attendance.db")
+    print(f"[INFO] seeding {args['rooms']} subjects, {args['students']} students, "
+          f"{args['history_days']} days of history...")
+    students = seed(db_path, args["rooms"], args["students"], args["history_days"])
+    subjects = [(i + 1, i + 1) for i in range(args["rooms"])]
+    admin = (1, "Load Admin")
+
+import app as app_module
+app_module.DB_PATH = db_path
+from app import create_app
+from app.repositories.attendance_repository import AttendanceRepository
+from app.metrics import DB_ERRORS
+
+flask_app = create_app()
+flask_app.config["PROPAGATE_EXCEPTIONS"] = True  # surface sqlite errors instead of a 500 page
+
+frames = load_frames(args["frames"]) if "recognize" in mix else []
+if "recognize" in mix and not frames:
+    raise SystemExit(f"[ERROR] no frames read from {args['frames']}")
+
+
+# -----------------------------
+# ROOMS
+# -----------------------------
+class Room(threading.Thread):
+    def __init__(self, index, results):
+        super().__init__(name=f"room-{index}", daemon=True)
+        self.subject_id, self.teacher_id = subjects[index % len(subjects)]
+        self.deadline = None
+        self.results = results
+        self.rng = random.Random(index)
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.frame_index = index
+        self.engine = None
+        if "recognize" in mix:
+            # One engine per room, like one process per camera; load failures abort up front
+            from app.services.recognition_engines import RecognitionEngines
+            self.engine = RecognitionEngines.create(args["engine"])
+
+    def setup(self):
+        self.teacher = flask_app.test_client()
+        with self.teacher.session_transaction() as s:
+            s["teacher_id"], s["teacher_name"] = self.teacher_id, f"Teacher {self.teacher_id}"
+        self.admin = flask_app.test_client()
+        with self.admin.session_transaction() as s:
+            s["admin_id"], s["admin_name"] = admin
+
+    def run_op(self, op):
+        if op == "mark":
+            AttendanceRepository.mark_attendance(self.subject_id, self.rng.choice(students))
+        elif op == "records":
+            response = self.teacher.get(f"/view_records/{self.subject_id}")
+            response.get_data()
+            if response.status_code != 200:
+                raise RuntimeError(f"/view_records returned {response.status_code}")
+        elif op == "admin":
+            # What a browser fetches on load: the shell plus the first page of the default tab
+            for url in ("/admin/dashboard", "/admin/api/teachers"):
+                response = self.admin.get(url)
+                response.get_data()
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url} returned {response.status_code}")
+        elif op == "recognize":
+            self.engine.recognize(frames[self.frame_index % len(frames)])
+            self.frame_index += 1
+
+    def run(self):
+        self.setup()
+        while time.monotonic() < self.deadline:
+            op = self.rng.choices(self.ops, self.weights)[0]
+            start = time.perf_counter()
+            error = None
+            try:
+                self.run_op(op)
+            except sqlite3.OperationalError as e:
+                error = "locked" if "locked" in str(e) else "other"
+            except Exception:
+                error = "other"
+            self.results.append((op, time.perf_counter() - start, error))
+            if args["think"]:
+                time.sleep(args["think"])
+
+
+def mark_lock_errors():
+    return DB_ERRORS.value(query="mark_attendance", error="locked")
+
+
+results = []
+locked_before = mark_lock_errors()
+print(f"[INFO] {args['rooms']} rooms for {args['duration']:.0f}s, mix {args['mix']}")
+log = contextlib.nullcontext() if args["verbose"] else contextlib.redirect_stdout(io.StringIO())
+rooms = [Room(i, results) for i in range(args["rooms"])]
+with log:
+    start = time.monotonic()
+    for room in rooms:
+        room.deadline = start + args["duration"]
+        room.start()
+    for room in rooms:
+        room.join()
+    elapsed = time.monotonic() - start
+# mark_attendance reports failures through the metrics counter rather than raising
+mark_locked = mark_lock_errors() - locked_before
+
+print("\n" + "="*78)
+print("       CLASSROOM LOAD TEST REPORT")
+print("="*78)
+print(f"{'operation':<10} {'ops':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'locked':>7} {'errors':>7}")
+for op in mix:
+    rows = [r for r in results if r[0] == op]
+    if not rows:
+        continue
+    lat = np.array([r[1] for r in rows]) * 1000
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    locked = sum(r[2] == "locked" for r in rows) + (mark_locked if op == "mark" else 0)
+    errors = sum(r[2] == "other" for r in rows)
+    print(f"{op:<10} {len(rows):>7} {len(rows) / elapsed:>8.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} "
+          f"{lat.max():>8.1f} {locked:>7} {errors:>7}")
+print(f"[METRIC] total: {len(results)} ops in {elapsed:.1f}s ({len(results) / elapsed:.1f} ops/s)")
+if workdir:
+    print(f"[INFO] scratch database: {db_path}")
@@ -0,0 +1,104 @@
+# benchmarks/loadtest_streams.py
+# -----------------------------------------------------------------------------------------
+# Opens many concurrent MJPEG viewers against a running server and reports delivered
+# frame rates. Given the server PID (Linux), it also samples the server's CPU time and
+# thread count, so the result reads as "concurrent streams per core".
+#
+# Usage:
+#   uvicorn asgi:application --port 5000 &
+#   python3 -m benchmarks.loadtest_streams --url http://127.0.0.1:5000/video_feed/1 \
+#       --viewers 200 --duration 30 --server-pid $!
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from urllib.parse import urlparse
+
+ap = argparse.ArgumentParser()
+ap.add_argument("--url", default="http://127.0.0.1:5000/video_feed/1",
+                help="stream URL")
+ap.add_argument("--viewers", type=int, default=100,
+                help="concurrent stream connections")
+ap.add_argument("--duration", type=float, default=20.0,
+                help="seconds to keep the streams open")
+ap.add_argument("--ramp", type=float, default=2.0,
+                help="seconds over which viewers connect")
+ap.add_argument("--server-pid", type=int, default=None,
+                help="server PID for CPU/thread sampling (reads /proc)")
+args = vars(ap.parse_args())
+
+
+def proc_stats(pid):
+    """(cpu seconds, threads) of a process and its children threads, from /proc."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/status") as f:
+        threads = next(int(line.split()[1]) for line in f if line.startswith("Threads:"))
+    return cpu, threads
+
+
+async def viewer(url, deadline, frames, errors, delay):
+    await asyncio.sleep(delay)
+    count = 0
+    writer = None
+    try:
+        reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+        path = url.path + (f"?{url.query}" if url.query else "")
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: keep-alive\r\n\r\n".encode())
+        await writer.drain()
+        tail = b""
+        while time.monotonic() < deadline:
+            data = await asyncio.wait_for(reader.read(65536), timeout=max(0.1, deadline - time.monotonic()))
+            if not data:
+                break
+            buf = tail + data
+            count += buf.count(b"--frame")
+            tail = buf[-8:]
+    except asyncio.TimeoutError:
+        pass
+    except OSError as e:
+        errors.append(str(e))
+    finally:
+        if writer is not None:
+            writer.close()
+    frames.append(count)
+
+
+async def main():
+    url = urlparse(args["url"])
+    start = time.monotonic()
+    deadline = start + args["ramp"] + args["duration"]
+    frames, errors = [], []
+
+    before = proc_stats(args["server_pid"]) if args["server_pid"] else None
+    tasks = [
+        asyncio.create_task(viewer(url, deadline, frames, errors, args["ramp"] * i / args["viewers"]))
+        for i in range(args["viewers"])
+    ]
+    await asyncio.sleep(args["ramp"] + args["duration"] / 2)
+    mid = proc_stats(args["server_pid"]) if args["server_pid"] else None
+    await asyncio.gather(*tasks)
+    after = proc_stats(args["server_pid"]) if args["server_pid"] else None
+    elapsed = time.monotonic() - start
+
+    fps = sorted(c / args["duration"] for c in frames)
+    print("\n" + "="*40)
+    print("       STREAM LOAD TEST REPORT")
+    print("="*40)
+    print(f"[METRIC] viewers: {args['viewers']} ({len(errors)} connection errors)")
+    print(f"[METRIC] per-viewer fps: min {fps[0]:.1f} | median {statistics.median(fps):.1f} | max {fps[-1]:.1f}")
+    print(f"[METRIC] aggregate delivered frames/s: {sum(frames) / args['duration']:.1f}")
+    if before:
+        cores = (after[0] - before[0]) / elapsed
+        print(f"[METRIC] server CPU: {cores:.2f} cores | threads at peak: {mid[1]}")
+        if cores > 0:
+            print(f"[RESULT] ~{args['viewers'] / cores:.0f} concurrent streams per core")
+    for e in sorted(set(errors))[:5]:
+        print(f"[WARN] {e}")
+
+
+asyncio.run(main())
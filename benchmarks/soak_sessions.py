@@ -0,0 +1,189 @@
+# benchmarks/soak_sessions.py
+# -----------------------------------------------------------------------------------------
+# Opens and closes live recognition sessions over and over, the way teachers start and
+# leave the camera page, and checks that nothing accumulates: open file descriptors,
+# threads, traced Python memory, RSS, held cameras and registered sessions.
+# Each cycle starts a session, streams a few frames from a recorded video instead of the
+# webcam, then ends it in one of three ways (rotating):
+#   stop        POST .../stop while the stream is being read (the Stop button)
+#   disconnect  the client drops the stream (closing the tab)
+#   idle        no heartbeats until the idle reaper stops it
+# Exits non-zero when a leak is detected.
+#
+# Usage (from the project root):
+#   python3 -m benchmarks.soak_sessions --cycles 300 --engine lbph
+#   python3 -m benchmarks.soak_sessions --video recorded.mp4 --cycles 1000
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+ap = argparse.ArgumentParser()
+ap.add_argument("--cycles", type=int, default=200,
+                help="sessions to open and close")
+ap.add_argument("--frames", type=int, default=5,
+                help="frames read from each stream before ending it")
+ap.add_argument("--video", default=None,
+                help="recorded video used as the camera (default: a generated clip)")
+ap.add_argument("--engine", default=os.environ.get("RECOGNITION_ENGINE", "auto"),
+                help="recognition engine for the streams")
+ap.add_argument("--modes", default="stop,disconnect,idle",
+                help="ways of ending a session, used in rotation")
+ap.add_argument("--warmup", type=int, default=20,
+                help="cycles before the baseline is taken (imports, caches, pools)")
+ap.add_argument("--max-fd-growth", type=int, default=2)
+ap.add_argument("--max-memory-growth-mb", type=float, default=5.0)
+ap.add_argument("--verbose", action="store_true",
+                help="keep the app's per-call log output")
+args = vars(ap.parse_args())
+
+MODES = ("stop", "disconnect", "idle")
+modes = args["modes"].split(",")
+for mode in modes:
+    if mode not in MODES:
+        ap.error(f"unknown mode '{mode}' (choose from {', '.join(MODES)})")
+
+workdir = tempfile.mkdtemp(prefix="soak_sessions_")
+db_path = os.path.join(workdir, "attendance.db")
+from database_setup import init_db
+init_db(db_path)
+import sqlite3
+conn = sqlite3.connect(db_path)
+conn.execute("INSERT INTO teachers (name, email, password) VALUES ('Soak Teacher', 'soak@load.test', 'x')")
+conn.execute("INSERT INTO subjects (teacher_id, subject_name) VALUES (1, 'Soak Subject')")
+conn.commit()
+conn.close()
+
+video = args["video"]
+if video is None:
+    # A moving square; the stream ends with the clip, so make it outlast a cycle
+    video = os.path.join(workdir, "camera.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 15, (640, 480))
+    for i in range(300):
+        frame = np.full((480, 640, 3), 40, dtype=np.uint8)
+        cv2.rectangle(frame, (100 + i % 300, 120), (260 + i % 300, 320), (200, 200, 200), -1)
+        writer.write(frame)
+    writer.release()
+
+import app as app_module
+app_module.DB_PATH = db_path
+from app import create_app
+from app.services import attendance_service
+from app.services.metrics_service import CAMERAS_OPEN
+from app.services.recognition_engines import RecognitionEngines
+from app.services.recognition_session import RecognitionSessions
+
+attendance_service.CAMERA_SOURCE = video
+if attendance_service.engine is None or args["engine"] != "auto":
+    attendance_service.engine = RecognitionEngines.create(args["engine"])
+
+flask_app = create_app()
+client = flask_app.test_client()
+with client.session_transaction() as s:
+    s["teacher_id"], s["teacher_name"] = 1, "Soak Teacher"
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+
+
+def snapshot():
+    gc.collect()
+    return {
+        "fds": open_fds(),
+        "threads": threading.active_count(),
+        "traced_mb": tracemalloc.get_traced_memory()[0] / 1e6,
+        "rss_mb": rss_mb(),
+        "cameras": CAMERAS_OPEN.value(),
+        "sessions": len(RecognitionSessions._sessions),
+    }
+
+
+def read_frames(response, count):
+    seen = 0
+    for chunk in response.response:
+        seen += chunk.count(b"--frame")
+        if seen >= count:
+            break
+    return seen
+
+
+def cycle(mode):
+    started = client.post("/attendance/session/1/start").get_json()
+    response = client.get(started["video_url"], buffered=False)
+    if response.status_code != 200:
+        raise RuntimeError(f"video feed returned {response.status_code}")
+    read_frames(response, args["frames"])
+
+    if mode == "stop":
+        # The stream only notices the stop between frames, so keep reading meanwhile
+        reader = threading.Thread(target=lambda: sum(1 for _ in response.response))
+        reader.start()
+        stopped = client.post(started["stop_url"]).get_json()
+        reader.join(timeout=10)
+        response.close()
+        if not stopped["released"]:
+            raise RuntimeError("stop returned before the camera was released")
+    elif mode == "disconnect":
+        response.close()
+    else:
+        # What the background reaper does once idle_timeout passes without a heartbeat
+        live = RecognitionSessions.get(started["session_id"])
+        RecognitionSessions.reap_idle(now=time.monotonic() + RecognitionSessions.idle_timeout + 1)
+        reader = threading.Thread(target=lambda: sum(1 for _ in response.response))
+        reader.start()
+        reader.join(timeout=10)
+        response.close()
+        if not live.finished.is_set():
+            raise RuntimeError("idle session was not reaped")
+
+
+tracemalloc.start()
+log = contextlib.nullcontext() if args["verbose"] else contextlib.redirect_stdout(io.StringIO())
+print(f"[INFO] {args['cycles']} cycles ({', '.join(modes)}), {args['frames']} frames each, camera {video}")
+start = time.perf_counter()
+baseline = None
+with log:
+    for i in range(args["cycles"]):
+        if i == args["warmup"]:
+            baseline = snapshot()
+        cycle(modes[i % len(modes)])
+elapsed = time.perf_counter() - start
+baseline = baseline or snapshot()
+final = snapshot()
+
+print("\n" + "="*58)
+print("       SESSION SOAK REPORT")
+print("="*58)
+print(f"{'':<12} {'baseline':>12} {'final':>12} {'growth':>12}")
+for key in ("fds", "threads", "traced_mb", "rss_mb", "cameras", "sessions"):
+    print(f"{key:<12} {baseline[key]:>12.2f} {final[key]:>12.2f} {final[key] - baseline[key]:>12.2f}")
+print(f"[METRIC] {args['cycles']} cycles in {elapsed:.1f}s ({elapsed / args['cycles'] * 1000:.0f} ms/cycle)")
+
+problems = []
+if final["fds"] - baseline["fds"] > args["max_fd_growth"]:
+    problems.append(f"file descriptors grew by {final['fds'] - baseline['fds']}")
+if final["traced_mb"] - baseline["traced_mb"] > args["max_memory_growth_mb"]:
+    problems.append(f"Python memory grew by {final['traced_mb'] - baseline['traced_mb']:.1f} MB")
+if final["threads"] > baseline["threads"]:
+    problems.append(f"{final['threads'] - baseline['threads']} threads left running")
+if final["cameras"] or final["sessions"]:
+    problems.append(f"{final['cameras']} cameras / {final['sessions']} sessions still open")
+for problem in problems:
+    print(f"[ERROR] leak: {problem}")
+sys.exit(1 if problems else 0)
@@ -0,0 +1,115 @@
+# calibrate_thresholds.py
+# -----------------------------------------------------------------------------------------
+# RESEARCH EXPLANATION: THRESHOLD CALIBRATION
+# The "Unknown" rejection threshold decides the trade-off between:
+#   - FAR (False Accept Rate): two different people closer than the threshold.
+#   - FRR (False Reject Rate): two photos of the same person farther than the threshold.
+#
+# Instead of tuning it live on the camera, we compute every genuine/impostor pair
+# distance from the embedding store once, sweep all thresholds vectorially and pick
+# the largest threshold that keeps FAR under a target.
+# The 'svm' engine rejects on classifier probability instead of distance, so the same
+# pass also scores model/recognizer.pickle on held-out folds (identities held out for
+# impostors) and picks the smallest probability threshold that meets the target FAR.
+# The result is written to model/thresholds.json and into the model bundle, which the
+# live service reads on load.
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import csv
+import os
+import pickle
+import time
+from datetime import datetime
+import numpy as np
+from app.services.embedding_store import EmbeddingStore
+from app.services.calibration_service import CalibrationService, THRESHOLDS_PATH
+from app.services.model_bundle import ModelBundle, BUNDLE_PATH
+
+# Argument Parsing
+ap = argparse.ArgumentParser()
+ap.add_argument("-e", "--embeddings", default="model/embeddings.pickle",
+                help="path to serialized facial embeddings")
+ap.add_argument("-o", "--output", default=THRESHOLDS_PATH,
+                help="path to output thresholds file read by the live service")
+ap.add_argument("-r", "--roc", default="model/threshold_roc.csv",
+                help="path to output ROC/FAR/FRR table")
+ap.add_argument("-b", "--bundle", default=BUNDLE_PATH,
+                help="model bundle to store the thresholds in (if it exists)")
+ap.add_argument("--target-far", type=float, default=0.001,
+                help="maximum acceptable false accept rate for the recommended threshold")
+ap.add_argument("--steps", type=int, default=1001,
+                help="number of thresholds to sweep between 0 and the max distance")
+ap.add_argument("-m", "--model", default="model/recognizer.pickle",
+                help="classifier whose predict_proba threshold is calibrated for the 'svm' engine")
+ap.add_argument("--folds", type=int, default=5,
+                help="cross-validation folds for the held-out probability scores")
+args = vars(ap.parse_args())
+
+print("[INFO] loading face embeddings...")
+embeddings, names = EmbeddingStore.load(args["embeddings"])
+
+start = time.perf_counter()
+genuine, impostor = CalibrationService.pair_distances(embeddings, names)
+print(f"[INFO] {len(genuine)} genuine / {len(impostor)} impostor pairs "
+      f"computed in {time.perf_counter() - start:.3f}s")
+
+if len(genuine) == 0 or len(impostor) == 0:
+    print("[ERROR] Need at least two people and two images of one person to calibrate.")
+    exit(1)
+
+max_dist = float(max(genuine[-1], impostor[-1]))
+thresholds = np.linspace(0.0, max_dist, args["steps"])
+far, frr = CalibrationService.sweep(genuine, impostor, thresholds)
+result = CalibrationService.recommend(thresholds, far, frr, args["target_far"])
+
+with open(args["roc"], "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(["threshold", "far", "frr", "tar"])
+    for t, a, r in zip(thresholds, far, frr):
+        writer.writerow([f"{t:.4f}", f"{a:.6f}", f"{r:.6f}", f"{1 - r:.6f}"])
+
+# Probability threshold for the 'svm' engine
+probability = None
+if os.path.exists(args["model"]):
+    start = time.perf_counter()
+    recognizer = pickle.loads(open(args["model"], "rb").read())
+    p_genuine, p_impostor = CalibrationService.probability_scores(recognizer, embeddings, names, args["folds"])
+    if len(p_genuine) and len(p_impostor):
+        probability = CalibrationService.recommend_probability(p_genuine, p_impostor, args["target_far"])
+        print(f"[INFO] {len(p_genuine)} held-out genuine / {len(p_impostor)} impostor probabilities "
+              f"in {time.perf_counter() - start:.3f}s")
+        if probability["probability_frr"] >= 1.0:
+            # e.g. a 1-NN model, whose probabilities are all 0 or 1
+            print(f"[WARN] {args['model']} cannot reach the target FAR without rejecting everyone; "
+                  "keeping the default probability threshold.")
+            probability = None
+if probability:
+    result.update(probability)
+
+result.update({
+    "n_genuine": int(len(genuine)),
+    "n_impostor": int(len(impostor)),
+    "calibrated_at": datetime.now().isoformat(timespec="seconds"),
+})
+CalibrationService.save_thresholds(result, args["output"])
+if ModelBundle.exists(args["bundle"]):
+    bundle = ModelBundle.load(args["bundle"], mmap=False)
+    bundle.thresholds = result
+    bundle.save(args["bundle"])
+
+print("\n" + "="*40)
+print("       THRESHOLD CALIBRATION REPORT")
+print("="*40)
+for probe in (0.4, 0.45, 0.5, 0.55, 0.6):
+    a, r = CalibrationService.sweep(genuine, impostor, [probe])
+    print(f"  distance < {probe:.2f}: FAR {a[0]*100:6.3f}%  FRR {r[0]*100:6.2f}%")
+print(f"[METRIC] Equal Error Rate: {result['eer']*100:.2f}% at {result['eer_threshold']:.3f}")
+print(f"[RESULT] Recommended distance threshold: {result['distance_threshold']:.3f} "
+      f"(FAR {result['far']*100:.3f}%, FRR {result['frr']*100:.2f}%, target FAR {args['target_far']*100:.3f}%)")
+if probability:
+    print(f"[RESULT] Recommended probability threshold ('svm' engine): {probability['probability_threshold']:.3f} "
+          f"(FAR {probability['probability_far']*100:.3f}%, FRR {probability['probability_frr']*100:.2f}%)")
+print(f"[INFO] ROC data saved to {args['roc']}")
+print(f"[INFO] Thresholds saved to {args['output']}"
+      f"{' and ' + args['bundle'] if ModelBundle.exists(args['bundle']) else ''} (restart the app to apply)")
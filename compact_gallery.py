@@ -0,0 +1,113 @@
+# compact_gallery.py
+# -----------------------------------------------------------------------------------------
+# RESEARCH EXPLANATION: PROTOTYPE GALLERY
+# The 1-NN recognizer compares every face against every stored embedding. Most of those
+# embeddings are near-copies of each other, so each student can be summarised by a few
+# prototypes (k-means centers or medoids in the 128-d space) with little accuracy loss.
+#
+# Evaluation: K-fold. Each held-out embedding is matched against (a) the full training
+# gallery and (b) prototypes built from the same training folds, so the two accuracies
+# are directly comparable.
+#
+# Output: a KNN recognizer fitted on the prototypes, which the live 'knn' engine loads.
+# Re-run train_classifier.py to go back to the full gallery.
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import os
+import pickle
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+from sklearn.neighbors import KNeighborsClassifier
+from app.services.calibration_service import CalibrationService
+from app.services.embedding_store import EmbeddingStore
+from app.services.gallery_service import GalleryService
+from app.services.matching_service import MatchingService
+from app.services.model_bundle import ModelBundle, BUNDLE_PATH
+
+# Argument Parsing
+ap = argparse.ArgumentParser()
+ap.add_argument("-e", "--embeddings", default="model/embeddings.pickle",
+                help="path to serialized facial embeddings")
+ap.add_argument("-m", "--model", default="model/recognizer.pickle",
+                help="path to output prototype KNN model")
+ap.add_argument("-l", "--le", default="model/le.pickle",
+                help="path to output label encoder")
+ap.add_argument("-b", "--bundle", default=BUNDLE_PATH,
+                help="path to output model bundle")
+ap.add_argument("-k", "--prototypes", type=int, default=3,
+                help="prototypes kept per student")
+ap.add_argument("--method", choices=["kmeans", "medoids"], default="kmeans",
+                help="cluster means or real representative samples")
+ap.add_argument("--folds", type=int, default=5,
+                help="folds for the accuracy comparison")
+ap.add_argument("--threshold", type=float, default=0.50,
+                help="distance threshold used for the 'accepted' rate")
+ap.add_argument("--dry-run", action="store_true",
+                help="only print the report, do not write the model")
+args = vars(ap.parse_args())
+
+print("[INFO] loading face embeddings...")
+embeddings, names = EmbeddingStore.load(args["embeddings"])
+
+# K-FOLD COMPARISON
+rng = np.random.default_rng(42)
+fold_of = rng.permutation(len(names)) % args["folds"]
+full_hits = proto_hits = full_accepted = proto_accepted = 0
+full_size = proto_size = 0
+
+for fold in range(args["folds"]):
+    test, train = fold_of == fold, fold_of != fold
+    if not test.any() or not train.any():
+        continue
+    protos, proto_names = GalleryService.compact(
+        embeddings[train], names[train], args["prototypes"], args["method"])
+
+    idx, dist = MatchingService.nearest_neighbors(embeddings[test], embeddings[train])
+    full_hits += np.sum(names[train][idx] == names[test])
+    full_accepted += np.sum((names[train][idx] == names[test]) & (dist < args["threshold"]))
+
+    idx, dist = MatchingService.nearest_neighbors(embeddings[test], protos)
+    proto_hits += np.sum(proto_names[idx] == names[test])
+    proto_accepted += np.sum((proto_names[idx] == names[test]) & (dist < args["threshold"]))
+
+    full_size += train.sum()
+    proto_size += len(protos)
+
+# FINAL PROTOTYPES ON ALL DATA
+protos, proto_names = GalleryService.compact(embeddings, names, args["prototypes"], args["method"])
+
+n = len(names)
+print("\n" + "="*40)
+print("       GALLERY COMPACTION REPORT")
+print("="*40)
+print(f"[METRIC] Identities: {len(np.unique(names))}")
+print(f"[METRIC] Gallery size: {n} -> {len(protos)} vectors "
+      f"({len(protos) / n * 100:.1f}%, {embeddings.nbytes / 1024:.0f} KB -> {protos.nbytes / 1024:.0f} KB)")
+print(f"[METRIC] Comparisons per face (avg over folds): {full_size / args['folds']:.0f} -> {proto_size / args['folds']:.0f}")
+print(f"[METRIC] {args['folds']}-fold 1-NN accuracy: full {full_hits / n * 100:.2f}% | "
+      f"prototypes ({args['method']}, k={args['prototypes']}) {proto_hits / n * 100:.2f}%")
+print(f"[METRIC] Correct and within {args['threshold']:.2f}: full {full_accepted / n * 100:.2f}% | "
+      f"prototypes {proto_accepted / n * 100:.2f}%")
+
+if args["dry_run"]:
+    exit(0)
+
+le = LabelEncoder()
+labels = le.fit_transform(proto_names)
+recognizer = KNeighborsClassifier(n_neighbors=1, metric="euclidean")
+recognizer.fit(protos, labels)
+
+print("\n[INFO] saving prototype bundle, model and label encoder...")
+ModelBundle(protos, labels, le.classes_,
+            thresholds=CalibrationService.load_thresholds(),
+            metadata={"classifier": "knn", "prototypes": args["prototypes"], "method": args["method"],
+                      "samples": int(len(labels)), "classes": int(len(le.classes_)),
+                      "source": args["embeddings"]}).save(args["bundle"])
+# Replace the pickles atomically, like train_classifier.py: a crash mid-write must not
+# leave a truncated model for the app to load
+for path, obj in ((args["model"], recognizer), (args["le"], le)):
+    with open(path + ".tmp", "wb") as f:
+        f.write(pickle.dumps(obj))
+    os.replace(path + ".tmp", path)
+print(f"[INFO] Model saved to {args['model']} (restart the app to apply)")
@@ -2,76 +2,87 @@ import sqlite3
 
 DB_PATH = "attendance.db"
 
-conn = sqlite3.connect(DB_PATH)
-cur = conn.cursor()
+def init_db(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
 
-# -------------------------
-# CREATE TEACHERS TABLE
-# -------------------------
-cur.execute("""
-CREATE TABLE IF NOT EXISTS teachers (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    email TEXT UNIQUE NOT NULL,
-    password TEXT NOT NULL
-);
-""")
+    # -------------------------
+    # CREATE TEACHERS TABLE
+    # -------------------------
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS teachers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    );
+    """)
 
-# -------------------------
-# CREATE SUBJECTS TABLE
-# -------------------------
-cur.execute("""
-CREATE TABLE IF NOT EXISTS subjects (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    teacher_id INTEGER NOT NULL,
-    subject_name TEXT NOT NULL,
-    FOREIGN KEY (teacher_id) REFERENCES teachers(id)
-);
-""")
+    # -------------------------
+    # CREATE SUBJECTS TABLE
+    # -------------------------
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS subjects (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        teacher_id INTEGER NOT NULL,
+        subject_name TEXT NOT NULL,
+        FOREIGN KEY (teacher_id) REFERENCES teachers(id)
+    );
+    """)
 
-# -------------------------
-# CREATE ATTENDANCE TABLE
-# -------------------------
-cur.execute("""
-CREATE TABLE IF NOT EXISTS attendance (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    subject_id INTEGER NOT NULL,
-    student_name TEXT NOT NULL,
-    date TEXT NOT NULL,
-    time TEXT NOT NULL,
+    # -------------------------
+    # CREATE ATTENDANCE TABLE
+    # -------------------------
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS attendance (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        subject_id INTEGER NOT NULL,
+        student_name TEXT NOT NULL,
+        date TEXT NOT NULL,
+        time TEXT NOT NULL,
 
-    -- ensures 1 student = 1 attendance per subject per day
-    UNIQUE(subject_id, student_name, date),
+        -- ensures 1 student = 1 attendance per subject per day
+        UNIQUE(subject_id, student_name, date),
 
-    FOREIGN KEY (subject_id) REFERENCES subjects(id)
-);
-""")
+        FOREIGN KEY (subject_id) REFERENCES subjects(id)
+    );
+    """)
 
-# -------------------------
-# CREATE ADMINS TABLE
-# -------------------------
-cur.execute("""
-CREATE TABLE IF NOT EXISTS admins (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    email TEXT UNIQUE NOT NULL,
-    password TEXT NOT NULL
-);
-""")
+    # -------------------------
+    # CREATE ADMINS TABLE
+    # -------------------------
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS admins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    );
+    """)
 
-# -------------------------
-# CREATE STUDENTS TABLE
-# -------------------------
-cur.execute("""
-CREATE TABLE IF NOT EXISTS students (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    roll_number TEXT UNIQUE,
-    email TEXT
-);
-""")
+    # -------------------------
+    # CREATE STUDENTS TABLE
+    # -------------------------
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS students (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        roll_number TEXT UNIQUE,
+        email TEXT
+    );
+    """)
 
-conn.commit()
-conn.close()
+    # -------------------------
+    # INDEXES (analytics range scans, admin paging; safe to re-run on an existing database)
+    # -------------------------
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_subject_date_time ON attendance (subject_id, date, time);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_date_student ON attendance (date, student_name);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_date_time ON attendance (date, time);")
 
-print("Database initialized successfully!")
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    init_db()
+    print("Database initialized successfully!")
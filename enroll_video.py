@@ -0,0 +1,198 @@
+# enroll_video.py
+# -----------------------------------------------------------------------------------------
+# RESEARCH EXPLANATION: VIDEO ENROLLMENT
+# Instead of collecting photos into model/student_images/<name>/, record a short clip of
+# each student (turning the head slowly, a few expressions) and enroll from it.
+#
+# Steps:
+# 1. Sampling: decode only --sample-fps frames per second (the rest are grabbed, not decoded).
+# 2. Single-face check: frames with no face or with several faces are skipped, so a
+#    passer-by can never be enrolled under the student's name.
+# 3. Quality gate: small, blurry or strongly turned faces are skipped (FaceQualityGate).
+# 4. Embedding: the same 128-d dlib ResNet encoding used everywhere else.
+# 5. Keyframe selection: farthest-point sampling in embedding space keeps the --keep most
+#    mutually distant embeddings. Consecutive frames are near-duplicates; FPS keeps the
+#    poses/expressions that actually add coverage.
+# 6. Output: appended to model/embeddings.pickle and to the model bundle, which the live
+#    'knn' engine loads on its next start. No retraining needed for knn/centroid.
+#
+#   python3 enroll_video.py -v clips/alice.mp4 -n "Alice"
+#   python3 enroll_video.py -v clips/            # one clip per student, named after the file
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from app.services.calibration_service import CalibrationService
+from app.services.embedding_store import EmbeddingStore, DEFAULT_EMBEDDINGS_PATH
+from app.services.face_quality import FaceQualityGate
+from app.services.gallery_service import GalleryService
+from app.services.matching_service import MatchingService
+from app.services.model_bundle import ModelBundle, BUNDLE_PATH
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm")
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-v", "--video", nargs="+", required=True,
+                help="video file(s), or a directory of <student name>.<ext> clips")
+ap.add_argument("-n", "--name", default=None,
+                help="student name (single video only; default: the file name)")
+ap.add_argument("-e", "--embeddings", default=DEFAULT_EMBEDDINGS_PATH,
+                help="embedding store to append to")
+ap.add_argument("-b", "--bundle", default=BUNDLE_PATH,
+                help="model bundle to append to (created from the store if missing)")
+ap.add_argument("-d", "--detection-method", type=str, default="hog",
+                help="face detection model to use: either 'hog' or 'cnn'")
+ap.add_argument("--sample-fps", type=float, default=4.0,
+                help="frames per second of video to run detection on")
+ap.add_argument("--max-seconds", type=float, default=60.0,
+                help="ignore anything after this point of each clip")
+ap.add_argument("--scale", type=float, default=0.5,
+                help="resize factor before detection/encoding")
+ap.add_argument("--keep", type=int, default=12,
+                help="embeddings kept per student (farthest-point sampling)")
+ap.add_argument("--replace", action="store_true",
+                help="drop the student's existing embeddings instead of adding to them")
+ap.add_argument("--dry-run", action="store_true",
+                help="report what would be enrolled without writing anything")
+args = vars(ap.parse_args())
+
+import face_recognition
+
+# Collect (video, name) jobs
+jobs = []
+for item in args["video"]:
+    if os.path.isdir(item):
+        for file in sorted(os.listdir(item)):
+            if file.lower().endswith(VIDEO_EXTENSIONS):
+                jobs.append((os.path.join(item, file), os.path.splitext(file)[0]))
+    else:
+        jobs.append((item, os.path.splitext(os.path.basename(item))[0]))
+if args["name"]:
+    if len(jobs) != 1:
+        ap.error("--name needs exactly one video")
+    jobs = [(jobs[0][0], args["name"])]
+if not jobs:
+    print("[ERROR] no videos found.")
+    sys.exit(1)
+
+gate = FaceQualityGate()
+
+
+def landmarks(frame, boxes):
+    return face_recognition.face_landmarks(frame, boxes, model="small")
+
+
+def sample_embeddings(path):
+    """Embeddings of the single good-quality face in each sampled frame, plus a tally."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return None, None
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    step = max(1, int(round(fps / args["sample_fps"])))
+    last_frame = int(fps * args["max_seconds"])
+    tally = {"sampled": 0, "no_face": 0, "multiple_faces": 0, "low_quality": 0, "encoded": 0}
+    embeddings = []
+    try:
+        index = 0
+        while index < last_frame:
+            # grab() skips decoding; only sampled frames are retrieved
+            if not cap.grab():
+                break
+            index += 1
+            if (index - 1) % step:
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                break
+            tally["sampled"] += 1
+            small = cv2.resize(frame, (0, 0), fx=args["scale"], fy=args["scale"]) if args["scale"] != 1.0 else frame
+            rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+            boxes = face_recognition.face_locations(rgb, model=args["detection_method"])
+            if not boxes:
+                tally["no_face"] += 1
+                continue
+            if len(boxes) > 1:
+                tally["multiple_faces"] += 1
+                continue
+            passed, _ = gate.assess(rgb, boxes, landmarks, args["scale"])[0]
+            if not passed:
+                tally["low_quality"] += 1
+                continue
+            embeddings.extend(face_recognition.face_encodings(rgb, boxes))
+            tally["encoded"] += 1
+    finally:
+        cap.release()
+    return np.array(embeddings).reshape(-1, 128), tally
+
+
+enrolled = {}
+for path, name in jobs:
+    start = time.perf_counter()
+    print(f"[INFO] enrolling {name} from {path}...")
+    candidates, tally = sample_embeddings(path)
+    if candidates is None:
+        print(f"[WARN] could not open {path}. Skipping.")
+        continue
+    if not len(candidates):
+        print(f"[WARN] no usable face in {path} ({tally}). Skipping {name}.")
+        continue
+
+    keep = GalleryService.farthest_point_sample(candidates, args["keep"])
+    kept = candidates[keep]
+    # Coverage: how far the worst-served frame is from its nearest kept embedding
+    _, coverage = MatchingService.nearest_neighbors(candidates, kept)
+    pairwise = np.sqrt(MatchingService.squared_distances(kept, kept))
+    spread = pairwise[np.triu_indices(len(kept), k=1)].mean() if len(kept) > 1 else 0.0
+    print(f"[METRIC] {name}: {tally['sampled']} frames sampled, {tally['no_face']} no face, "
+          f"{tally['multiple_faces']} multiple faces, {tally['low_quality']} low quality, "
+          f"{tally['encoded']} encoded -> kept {len(kept)} "
+          f"(max distance to a kept vector {coverage.max():.3f}, mean spread {spread:.3f}) "
+          f"in {time.perf_counter() - start:.1f}s")
+    enrolled[name] = kept
+
+if not enrolled:
+    print("[ERROR] nothing to enroll.")
+    sys.exit(1)
+if args["dry_run"]:
+    sys.exit(0)
+
+# Embedding store (source of truth for train_classifier.py / compact_gallery.py)
+if os.path.exists(args["embeddings"]):
+    embeddings, names = EmbeddingStore.load(args["embeddings"])
+else:
+    embeddings, names = np.zeros((0, 128)), np.array([], dtype=str)
+
+
+def merged(embeddings, names):
+    names = np.asarray(names).astype(str)
+    if args["replace"]:
+        keep_rows = ~np.isin(names, list(enrolled))
+        embeddings, names = embeddings[keep_rows], names[keep_rows]
+    new_names = np.concatenate([[n] * len(e) for n, e in enrolled.items()])
+    return (np.concatenate([embeddings, *enrolled.values()]),
+            np.concatenate([names, new_names]))
+
+
+embeddings, names = merged(embeddings, names)
+EmbeddingStore.save(embeddings, names, args["embeddings"])
+print(f"[INFO] {args['embeddings']}: {len(names)} vectors, {len(np.unique(names))} students")
+
+# Model bundle (what the live knn/centroid engines load)
+if ModelBundle.exists(args["bundle"]):
+    bundle = ModelBundle.load(args["bundle"], mmap=False)
+    gallery, gallery_names = merged(np.asarray(bundle.embeddings), bundle.names)
+    thresholds, metadata = bundle.thresholds, bundle.metadata
+else:
+    gallery, gallery_names = embeddings, names
+    thresholds, metadata = CalibrationService.load_thresholds(), {"classifier": "knn"}
+class_names, labels = np.unique(gallery_names, return_inverse=True)
+metadata = {**metadata, "samples": int(len(labels)), "classes": int(len(class_names)),
+            "enrolled_from_video": sorted(set(metadata.get("enrolled_from_video", [])) | set(enrolled))}
+ModelBundle(gallery, labels, class_names, thresholds, metadata).save(args["bundle"])
+print(f"[INFO] {args['bundle']}: {len(labels)} vectors, {len(class_names)} students (restart the app to apply)")
+print("[INFO] The 'svm' engine and recognizer.pickle are unchanged; re-run train_classifier.py for those.")
@@ -16,8 +16,11 @@
 import face_recognition
 import argparse
 import pickle
+import time
 import cv2
 import os
+from collections import defaultdict
+from app.services.dedup_service import DedupService
 
 # Argument Parsing
 ap = argparse.ArgumentParser()
@@ -27,6 +30,12 @@ ap.add_argument("-e", "--embeddings", default="model/embeddings.pickle",
                 help="path to output serialized db of facial embeddings")
 ap.add_argument("-d", "--detection-method", type=str, default="hog",
                 help="face detection model to use: either 'hog' or 'cnn'")
+ap.add_argument("--dedup", action="store_true",
+                help="skip near-duplicate images and drop redundant embeddings")
+ap.add_argument("--dedup-hash-distance", type=int, default=5,
+                help="max differing dHash bits (of 64) for two images to count as duplicates")
+ap.add_argument("--dedup-embedding-distance", type=float, default=0.10,
+                help="embeddings of the same person closer than this are redundant")
 args = vars(ap.parse_args())
 
 print("[INFO] quantifying faces...")
@@ -41,6 +50,10 @@ knownEmbeddings = []
 knownNames = []
 
 total = 0
+keptHashes = defaultdict(list)   # name -> dHashes of images already processed
+skippedImages = 0
+extractSeconds = 0.0
+extractedImages = 0
 
 for (i, imagePath) in enumerate(imagePaths):
     # Extract the person name from the image path
@@ -54,6 +67,16 @@ for (i, imagePath) in enumerate(imagePaths):
         print(f"[WARN] Failed to load {imagePath}. Skipping.")
         continue
         
+    # NEAR-DUPLICATE CHECK (cheap): burst photos cost a full HOG+ResNet pass each
+    if args["dedup"]:
+        image_hash = DedupService.dhash(image)
+        if DedupService.is_near_duplicate(image_hash, keptHashes[name], args["dedup_hash_distance"]):
+            print(f"[INFO] skipping near-duplicate {imagePath}")
+            skippedImages += 1
+            continue
+        keptHashes[name].append(image_hash)
+
+    start = time.perf_counter()
     rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
     # DETECT FACES
@@ -72,6 +95,19 @@ for (i, imagePath) in enumerate(imagePaths):
             knownNames.append(name)
     except Exception as e:
         print(f"[ERROR] Could not process image {imagePath}: {e}")
+    extractSeconds += time.perf_counter() - start
+    extractedImages += 1
+
+if args["dedup"] and knownEmbeddings:
+    keep = DedupService.prune_embeddings(knownEmbeddings, knownNames, args["dedup_embedding_distance"])
+    before = len(knownEmbeddings)
+    knownEmbeddings = [e for e, k in zip(knownEmbeddings, keep) if k]
+    knownNames = [n for n, k in zip(knownNames, keep) if k]
+    perImage = extractSeconds / max(extractedImages, 1)
+    print(f"[DEDUP] skipped {skippedImages}/{len(imagePaths)} images before extraction "
+          f"(~{skippedImages * perImage:.1f}s of extraction saved at {perImage:.2f}s/image)")
+    print(f"[DEDUP] gallery {before} -> {len(knownEmbeddings)} vectors after embedding pruning "
+          f"({skippedImages + before - len(knownEmbeddings)} redundant samples removed in total)")
 
 # Save to disk
 print(f"[INFO] gathered {len(knownEmbeddings)} feature vectors")
@@ -0,0 +1,37 @@
+# inference_server.py
+# -----------------------------------------------------------------------------------------
+# Standalone inference worker shared by every web worker.
+#
+# Usage:
+#   export INFERENCE_AUTHKEY=$(openssl rand -hex 32)   # same value for the web workers
+#   python3 inference_server.py                        # prints the socket path to use
+#   INFERENCE_SOCKET=<printed path> python3 run.py
+#
+# Web workers started with INFERENCE_SOCKET set never import dlib or load the
+# recognizer; they send frames here through shared memory instead. Without --socket the
+# socket is created in a private mkdtemp directory; an explicit --socket should also be
+# in a directory only this user can write to. INFERENCE_AUTHKEY is required.
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import os
+
+from app.services.inference_service import private_socket_path
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-s", "--socket", default=os.environ.get("INFERENCE_SOCKET"),
+                help="path of the Unix socket to listen on (default: a new private directory)")
+args = vars(ap.parse_args())
+
+if not os.environ.get("INFERENCE_AUTHKEY"):
+    ap.error("set INFERENCE_AUTHKEY (the same secret on the web workers) before starting the worker")
+if not args["socket"]:
+    args["socket"] = private_socket_path()
+    print(f"[INFO] Start the web workers with INFERENCE_SOCKET={args['socket']}")
+
+# This process is the one that must load the models.
+os.environ.pop("INFERENCE_SOCKET", None)
+
+from app.services.inference_service import InferenceServer
+
+InferenceServer(args["socket"]).serve_forever()
@@ -1,80 +1,197 @@
 # predict_face.py
 # -----------------------------------------------------------------------------------------
 # RESEARCH EXPLANATION: INFERENCE
-# This script demonstrates the recognition pipeline on a new image.
+# This script demonstrates the recognition pipeline on new images.
 #
 # Steps:
 # 1. Pipeline Re-use: Detect Face -> Compute Embedding.
-# 2. Classification: Feed embedding to SVM.
+# 2. Classification: the same engines the live app uses (RECOGNITION_ENGINE / --engine).
 # 3. Thresholding:
-#    - Since SVM is a "closed-set" classifier (it always picks a class), we must
-#      manually implement "Unknown" rejection.
-#    - If max(probability) < THRESHOLD (e.g., 0.6), we label it "Unknown".
+#    - Closed-set classifiers always pick a class, so "Unknown" rejection is applied by
+#      the engine (SVM: max(probability) < 0.6, KNN: distance above the calibrated threshold).
+#
+# Batch mode: pass any mix of files, directories and globs. Models are loaded once per
+# worker process; decoding, detection and encoding run in parallel across the pool.
+# One JSON line per image goes to stdout (or --output), logs go to stderr.
+#
+#   python3 predict_face.py -i photo.jpg --annotate out/
+#   python3 predict_face.py -i audit_photos/ "extra/*.png" --workers 8 -o results.jsonl
 # -----------------------------------------------------------------------------------------
 
-import face_recognition
 import argparse
-import pickle
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 import cv2
-import numpy as np
-
-# Argument Parsing
-ap = argparse.ArgumentParser()
-ap.add_argument("-i", "--image", required=True,
-                help="path to input image")
-ap.add_argument("-m", "--model", default="model/recognizer.pickle",
-                help="path to trained model")
-ap.add_argument("-l", "--le", default="model/le.pickle",
-                help="path to label encoder")
-args = vars(ap.parse_args())
-
-# Load artifacts
-print("[INFO] loading model and label encoder...")
-recognizer = pickle.loads(open(args["model"], "rb").read())
-le = pickle.loads(open(args["le"], "rb").read())
-
-# Load Image
-print("[INFO] processing image...")
-image = cv2.imread(args["image"])
-rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-# Detect Faces
-print("[INFO] detecting faces...")
-boxes = face_recognition.face_locations(rgb, model="hog")
-encodings = face_recognition.face_encodings(rgb, boxes)
-
-# Initialize predictions
-for (box, encoding) in zip(boxes, encodings):
-    # Predict
-    # Reshape encoding to (1, 128) for the model
-    preds = recognizer.predict_proba([encoding])[0]
-    j = np.argmax(preds)
-    proba = preds[j]
-    name = le.classes_[j]
-
-    # MANUAL THRESHOLDING FOR UNKNOWN CLASS
-    # If the model isn't at least 60% confident, it's likely an unknown person
-    # (or the classifier is forcing a fit).
-    if proba < 0.6:
-        name = "Unknown"
-        label_color = (0, 0, 255) # Red for unknown
-    else:
-        label_color = (0, 255, 0) # Green for known
-
-    # Draw result
-    (top, right, bottom, left) = box
-    cv2.rectangle(image, (left, top), (right, bottom), label_color, 2)
-    y = top - 15 if top - 15 > 15 else top + 15
-    text = "{}: {:.2f}%".format(name, proba * 100)
-    cv2.putText(image, text, (left, y), cv2.FONT_HERSHEY_SIMPLEX, 0.75, label_color, 2)
-
-    print(f"[RESULT] Found: {name} with confidence {proba*100:.2f}%")
-
-# Show output
-# cv2.imshow("Image", image)
-# cv2.waitKey(0)
-
-# Save output for review
-output_path = "output_prediction.jpg"
-cv2.imwrite(output_path, image)
-print(f"[INFO] Output saved to {output_path}")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+engine = None
+KnnEmbeddingEngine = None
+annotate_dir = None
+scale = 1.0
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def expand_inputs(inputs):
+    """(path, name for the annotated copy) for every image in files/directories/globs."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for file in sorted(files):
+                    if file.lower().endswith(IMAGE_EXTENSIONS):
+                        paths.append(os.path.join(root, file))
+        else:
+            matches = sorted(glob.glob(item)) if any(c in item for c in "*?[") else [item]
+            if not matches:
+                log(f"[WARN] no match for {item}")
+            paths.extend(matches)
+    return list(zip(paths, output_names(paths)))
+
+
+def output_names(paths):
+    """Annotated-copy names that never collide: the path relative to the working directory
+    (same-named images from different folders keep their folders), prefixed with the input
+    index when two still clash (e.g. '../a/x.jpg' and 'a/x.jpg')."""
+    names = []
+    for path in paths:
+        parts = [p for p in os.path.normpath(os.path.relpath(os.path.abspath(path))).split(os.sep)
+                 if p not in ("", ".", "..")]
+        names.append(os.path.join(*parts))
+    counts = {}
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+    return [name if counts[name] == 1 else os.path.join(os.path.dirname(name), f"{i:05d}_{os.path.basename(name)}")
+            for i, name in enumerate(names)]
+
+
+def init_worker(engine_name, bundle_path, model_path, le_path, annotate, resize):
+    """Pool initializer: load the engine once per process."""
+    global engine, KnnEmbeddingEngine, annotate_dir, scale
+    from app.services import recognition_engines
+    KnnEmbeddingEngine = recognition_engines.KnnEmbeddingEngine
+    recognition_engines.BUNDLE_PATH = bundle_path
+    recognition_engines.MODEL_PATH = model_path
+    recognition_engines.LE_PATH = le_path
+    engine = recognition_engines.RecognitionEngines.create(engine_name)
+    annotate_dir = annotate
+    scale = resize
+
+
+def predict(job):
+    path, name = job
+    image = cv2.imread(path)
+    if image is None:
+        return {"path": path, "error": "unreadable image"}
+    small = cv2.resize(image, (0, 0), fx=scale, fy=scale) if scale != 1.0 else image
+    rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+    boxes, face_data = engine.recognize(rgb, scale=scale)
+    boxes = [tuple(int(round(v / scale)) for v in box) for box in boxes]
+    # KNN-style engines report confidence as 1 - distance
+    has_distance = isinstance(engine, KnnEmbeddingEngine)
+    result = {
+        "path": path,
+        "boxes": [list(b) for b in boxes],  # (top, right, bottom, left)
+        "labels": [n for n, _ in face_data],
+        "confidences": [round(c, 4) for _, c in face_data],
+        "distances": [round(1.0 - c, 4) for _, c in face_data] if has_distance else None,
+    }
+
+    if annotate_dir:
+        for (top, right, bottom, left), (label, confidence) in zip(boxes, face_data):
+            color = (0, 0, 255) if "Unknown" in label else (0, 255, 0)  # Red unknown / green known
+            cv2.rectangle(image, (left, top), (right, bottom), color, 2)
+            y = top - 15 if top - 15 > 15 else top + 15
+            cv2.putText(image, f"{label}: {confidence * 100:.2f}%", (left, y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.75, color, 2)
+        out_path = os.path.join(annotate_dir, name)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        cv2.imwrite(out_path, image)
+        result["annotated"] = out_path
+    return result
+
+
+def run_one(fn, job):
+    """fn(job), or an error line for the image instead of aborting the batch."""
+    try:
+        return fn(job)
+    except Exception as e:
+        return {"path": job[0], "error": f"{type(e).__name__}: {e}"}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-i", "--image", nargs="+", required=True,
+                    help="input images, directories or globs")
+    ap.add_argument("-b", "--bundle", default="model/recognizer_bundle.npz",
+                    help="path to model bundle (used instead of the pickles when present)")
+    ap.add_argument("-m", "--model", default="model/recognizer.pickle",
+                    help="path to trained model")
+    ap.add_argument("-l", "--le", default="model/le.pickle",
+                    help="path to label encoder")
+    ap.add_argument("--engine", default=os.environ.get("RECOGNITION_ENGINE", "auto"),
+                    help="auto|knn|svm|centroid|lbph|sharded")
+    ap.add_argument("-o", "--output", default="-",
+                    help="JSONL output path ('-' = stdout)")
+    ap.add_argument("--annotate", default=None,
+                    help="directory for annotated copies (omit to skip drawing)")
+    ap.add_argument("--scale", type=float, default=1.0,
+                    help="resize factor before detection (live loop uses 0.5)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="worker processes (1 = run in this process)")
+    args = vars(ap.parse_args())
+
+    jobs = expand_inputs(args["image"])
+    if not jobs:
+        log("[ERROR] no images found.")
+        sys.exit(1)
+
+    workers = max(1, min(args["workers"], len(jobs)))
+    init_args = (args["engine"], args["bundle"], args["model"], args["le"], args["annotate"], args["scale"])
+    log(f"[INFO] {len(jobs)} images, {workers} worker(s), engine '{args['engine']}'")
+
+    out = sys.stdout if args["output"] == "-" else open(args["output"], "w")
+    start = time.perf_counter()
+    faces = unknown = errors = 0
+    pool = None
+    try:
+        if workers == 1:
+            init_worker(*init_args)
+            results = (run_one(predict, job) for job in jobs)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=init_args)
+            # One future per image, read in input order: a failure costs only its own line
+            futures = {job: pool.submit(predict, job) for job in jobs}
+            results = (run_one(lambda j: futures[j].result(), job) for job in jobs)
+
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            if "error" in result:
+                errors += 1
+                continue
+            faces += len(result["labels"])
+            unknown += sum("Unknown" in n for n in result["labels"])
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    log(f"[INFO] {len(jobs)} images ({errors} failed), {faces} faces ({unknown} unknown) "
+        f"in {elapsed:.1f}s ({len(jobs) / elapsed:.1f} images/s)")
+    if args["annotate"]:
+        log(f"[INFO] Annotated images saved to {args['annotate']}")
+
+
+if __name__ == "__main__":
+    main()
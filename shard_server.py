@@ -0,0 +1,41 @@
+# shard_server.py
+# -----------------------------------------------------------------------------------------
+# One shard of the gallery: serves rows [index/count] of the model bundle to the
+# 'sharded' recognition engine (or any ShardedMatcher).
+#
+# Usage (4 shards over two hosts, each host holding the same model/recognizer_bundle.npz):
+#   hostA$ python3 shard_server.py --index 0 --count 4 --listen 0.0.0.0:7100
+#   hostA$ python3 shard_server.py --index 1 --count 4 --listen 0.0.0.0:7101
+#   hostB$ python3 shard_server.py --index 2 --count 4 --listen 0.0.0.0:7100
+#   hostB$ python3 shard_server.py --index 3 --count 4 --listen 0.0.0.0:7101
+#   GALLERY_SHARDS=hostA:7100,hostA:7101,hostB:7100,hostB:7101 RECOGNITION_ENGINE=sharded python3 run.py
+#
+# --listen takes host:port (TCP) or a Unix socket path for shards on the same host.
+# SHARD_AUTHKEY is required (there is no default): generate one secret, e.g. with
+# `openssl rand -hex 32`, and set it on every shard and on the app. Still only expose the
+# port on the private network between the shards and the app.
+# -----------------------------------------------------------------------------------------
+
+import argparse
+import os
+
+from app.services.model_bundle import BUNDLE_PATH
+from app.services.shard_service import ShardServer
+
+ap = argparse.ArgumentParser()
+ap.add_argument("--index", type=int, required=True,
+                help="this shard's index (0-based)")
+ap.add_argument("--count", type=int, required=True,
+                help="total number of shards")
+ap.add_argument("--listen", required=True,
+                help="host:port or Unix socket path")
+ap.add_argument("-b", "--bundle", default=BUNDLE_PATH,
+                help="path to model bundle")
+args = vars(ap.parse_args())
+
+if not 0 <= args["index"] < args["count"]:
+    ap.error("--index must be in [0, --count)")
+if not os.environ.get("SHARD_AUTHKEY"):
+    ap.error("set SHARD_AUTHKEY (the same secret on every shard and the app) before starting a shard")
+
+ShardServer.from_bundle(args["index"], args["count"], args["listen"], args["bundle"]).serve_forever()
@@ -0,0 +1,219 @@
+// Admin dashboard tabs: each table pages through /admin/api/<table> on demand.
+// The last tab/page is kept in sessionStorage so a CRUD redirect lands back where you were.
+(function () {
+    var PER_PAGE = window.ADMIN_PER_PAGE || 25;
+    var STORAGE_KEY = 'adminDashboard';
+    var saved = JSON.parse(sessionStorage.getItem(STORAGE_KEY) || '{}');
+    var state = {};  // table -> {page, items, loaded}
+
+    function urlFor(template, id) {
+        return template.replace(/0$/, String(id));
+    }
+
+    function cell(text) {
+        var td = document.createElement('td');
+        td.textContent = text === null || text === undefined || text === '' ? '-' : text;
+        return td;
+    }
+
+    function iconButton(classes, icon, modal, index) {
+        var btn = document.createElement('button');
+        btn.type = 'button';
+        btn.className = 'btn btn-sm ' + classes;
+        btn.setAttribute('data-bs-toggle', 'modal');
+        btn.setAttribute('data-bs-target', modal);
+        btn.dataset.index = index;
+        btn.innerHTML = '<i class="fas ' + icon + '"></i>';
+        return btn;
+    }
+
+    function deleteLink(url, message) {
+        var a = document.createElement('a');
+        a.href = url;
+        a.className = 'btn btn-sm btn-outline-danger';
+        a.innerHTML = '<i class="fas fa-trash"></i>';
+        a.addEventListener('click', function (e) {
+            if (!confirm(message)) e.preventDefault();
+        });
+        return a;
+    }
+
+    var ROWS = {
+        teachers: function (tbody, t, i) {
+            var actions = document.createElement('td');
+            actions.append(
+                iconButton('btn-outline-info me-2', 'fa-edit', '#editTeacherModal', i),
+                iconButton('btn-outline-warning me-2', 'fa-book', '#manageSubjectsModal', i),
+                deleteLink(urlFor(tbody.dataset.deleteUrl, t.id), 'Are you sure? This will delete linked subjects.'));
+            return [cell(t.id), cell(t.name), cell(t.email), actions];
+        },
+        students: function (tbody, s, i) {
+            var actions = document.createElement('td');
+            actions.append(
+                iconButton('btn-outline-info me-2', 'fa-edit', '#editStudentModal', i),
+                deleteLink(urlFor(tbody.dataset.deleteUrl, s.id), 'Delete this student?'));
+            return [cell(s.id), cell(s.name), cell(s.roll_number), cell(s.email), actions];
+        },
+        attendance: function (tbody, r, i) {
+            var actions = document.createElement('td');
+            actions.append(
+                iconButton('btn-outline-info me-1', 'fa-edit', '#editAttendanceModal', i),
+                deleteLink(urlFor(tbody.dataset.deleteUrl, r.id), 'Delete record?'));
+            return [cell(r.date), cell(r.time), cell(r.student_name), cell(r.subject_name), cell(r.teacher_name), actions];
+        }
+    };
+
+    function tbodyFor(table) {
+        return document.querySelector('[data-admin-table="' + table + '"]');
+    }
+
+    function message(tbody, text) {
+        var tr = document.createElement('tr');
+        var td = document.createElement('td');
+        td.colSpan = tbody.closest('table').querySelectorAll('thead th').length;
+        td.className = 'text-center text-muted';
+        td.textContent = text;
+        tr.appendChild(td);
+        tbody.replaceChildren(tr);
+    }
+
+    function renderPager(table, data) {
+        var pager = document.querySelector('[data-pager="' + table + '"]');
+        var pages = Math.max(1, Math.ceil(data.total / data.per_page));
+        var first = data.total ? (data.page - 1) * data.per_page + 1 : 0;
+        var last = Math.min(data.total, data.page * data.per_page);
+
+        var info = document.createElement('small');
+        info.className = 'text-muted';
+        info.textContent = 'Showing ' + first + '-' + last + ' of ' + data.total;
+
+        var group = document.createElement('div');
+        group.className = 'btn-group';
+        [['Prev', data.page - 1, data.page <= 1], ['Next', data.page + 1, data.page >= pages]].forEach(function (b) {
+            var btn = document.createElement('button');
+            btn.type = 'button';
+            btn.className = 'btn btn-sm btn-outline-light';
+            btn.textContent = b[0];
+            btn.disabled = b[2];
+            btn.addEventListener('click', function () { load(table, b[1]); });
+            group.appendChild(btn);
+        });
+        pager.replaceChildren(info, group);
+    }
+
+    function load(table, page) {
+        var tbody = tbodyFor(table);
+        message(tbody, 'Loading...');
+        fetch(tbody.dataset.api + '?page=' + page + '&per_page=' + PER_PAGE, { credentials: 'same-origin' })
+            .then(function (res) {
+                if (!res.ok) throw new Error(res.status === 401 ? 'Session expired, please log in again.' : 'HTTP ' + res.status);
+                return res.json();
+            })
+            .then(function (data) {
+                state[table] = { page: data.page, items: data.items, loaded: true };
+                saved.pages = saved.pages || {};
+                saved.pages[table] = data.page;
+                sessionStorage.setItem(STORAGE_KEY, JSON.stringify(saved));
+
+                if (!data.items.length) {
+                    message(tbody, 'No records.');
+                } else {
+                    tbody.replaceChildren.apply(tbody, data.items.map(function (item, i) {
+                        var tr = document.createElement('tr');
+                        tr.append.apply(tr, ROWS[table](tbody, item, i));
+                        return tr;
+                    }));
+                }
+                renderPager(table, data);
+            })
+            .catch(function (err) { message(tbody, 'Could not load: ' + err.message); });
+    }
+
+    function ensureLoaded(table) {
+        if (!state[table] || !state[table].loaded) {
+            load(table, (saved.pages && saved.pages[table]) || 1);
+        }
+    }
+
+    // Shared modals: fill from the row that opened them
+    function rowFor(table, event) {
+        return state[table].items[Number(event.relatedTarget.dataset.index)];
+    }
+
+    function fill(form, values) {
+        Object.keys(values).forEach(function (name) {
+            form.elements[name].value = values[name] === null || values[name] === undefined ? '' : values[name];
+        });
+    }
+
+    function onModal(id, handler) {
+        document.getElementById(id).addEventListener('show.bs.modal', function (event) {
+            if (event.relatedTarget && event.relatedTarget.dataset.index !== undefined) handler(event, this);
+        });
+    }
+
+    onModal('editTeacherModal', function (event, modal) {
+        var t = rowFor('teachers', event);
+        var form = modal.querySelector('form');
+        form.action = urlFor(tbodyFor('teachers').dataset.editUrl, t.id);
+        fill(form, { name: t.name, email: t.email });
+    });
+
+    onModal('manageSubjectsModal', function (event, modal) {
+        var t = rowFor('teachers', event);
+        var tbody = tbodyFor('teachers');
+        modal.querySelector('[data-field="teacher-name"]').textContent = t.name;
+        modal.querySelector('form').action = urlFor(tbody.dataset.addSubjectUrl, t.id);
+
+        var list = modal.querySelector('[data-field="subjects"]');
+        var itemClass = 'list-group-item bg-dark text-white border-secondary';
+        if (!t.subjects.length) {
+            var empty = document.createElement('li');
+            empty.className = itemClass + ' text-center text-muted';
+            empty.textContent = 'No subjects assigned yet.';
+            list.replaceChildren(empty);
+            return;
+        }
+        list.replaceChildren.apply(list, t.subjects.map(function (s) {
+            var li = document.createElement('li');
+            li.className = itemClass + ' d-flex justify-content-between align-items-center';
+            li.textContent = s.name;
+            var remove = deleteLink(urlFor(tbody.dataset.deleteSubjectUrl, s.id), 'Remove subject ' + s.name + '?');
+            remove.className = 'btn btn-sm btn-danger py-0';
+            remove.innerHTML = '<i class="fas fa-times"></i>';
+            li.appendChild(remove);
+            return li;
+        }));
+    });
+
+    onModal('editStudentModal', function (event, modal) {
+        var s = rowFor('students', event);
+        var form = modal.querySelector('form');
+        form.action = urlFor(tbodyFor('students').dataset.editUrl, s.id);
+        fill(form, { name: s.name, roll_number: s.roll_number, email: s.email });
+    });
+
+    onModal('editAttendanceModal', function (event, modal) {
+        var r = rowFor('attendance', event);
+        var form = modal.querySelector('form');
+        form.action = urlFor(tbodyFor('attendance').dataset.editUrl, r.id);
+        fill(form, { student_name: r.student_name, date: r.date, time: r.time });
+    });
+
+    // Tabs load lazily on first show
+    document.querySelectorAll('#adminTabs button[data-bs-toggle="tab"]').forEach(function (tab) {
+        tab.addEventListener('shown.bs.tab', function () {
+            var table = tab.getAttribute('data-bs-target').slice(1);
+            saved.tab = table;
+            sessionStorage.setItem(STORAGE_KEY, JSON.stringify(saved));
+            ensureLoaded(table);
+        });
+    });
+
+    var initial = document.querySelector('#adminTabs button[data-bs-target="#' + (saved.tab || 'teachers') + '"]');
+    if (initial && saved.tab && saved.tab !== 'teachers') {
+        bootstrap.Tab.getOrCreateInstance(initial).show();  // fires shown.bs.tab -> load
+    } else {
+        ensureLoaded('teachers');
+    }
+})();
@@ -0,0 +1,50 @@
+// Live attendance page: starts a recognition session, keeps it alive with heartbeats and
+// stops it (releasing the camera on the server) on "Stop Session" or when the page goes away.
+(function () {
+    var feed = document.getElementById('liveFeed');
+    var status = document.getElementById('liveStatus');
+    var stopLink = document.getElementById('stopSession');
+    var live = null;
+    var timer = null;
+
+    function post(url) {
+        return fetch(url, { method: 'POST', credentials: 'same-origin' });
+    }
+
+    function ended(text) {
+        clearInterval(timer);
+        live = null;
+        feed.removeAttribute('src');
+        status.textContent = text;
+        status.classList.remove('d-none');
+    }
+
+    post(feed.dataset.startUrl)
+        .then(function (res) {
+            if (!res.ok) throw new Error(res.status === 401 ? 'Session expired, please log in again.' : 'HTTP ' + res.status);
+            return res.json();
+        })
+        .then(function (data) {
+            live = data;
+            feed.src = data.video_url;
+            status.classList.add('d-none');
+            timer = setInterval(function () {
+                post(live.heartbeat_url).then(function (res) {
+                    if (res.status === 404) ended('Session ended.');
+                });
+            }, Math.max(1000, data.idle_timeout * 1000 / 3));
+        })
+        .catch(function (err) { ended('Could not start the camera: ' + err.message); });
+
+    stopLink.addEventListener('click', function (e) {
+        if (!live) return;
+        e.preventDefault();
+        var stopUrl = live.stop_url;
+        ended('Stopping...');
+        post(stopUrl).finally(function () { window.location = stopLink.href; });
+    });
+
+    window.addEventListener('pagehide', function () {
+        if (live) navigator.sendBeacon(live.stop_url);
+    });
+})();
@@ -0,0 +1,36 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.services.face_quality import FaceQualityGate
+from app.services.frame_governor import SCALES
+
+
+def camera_frame(face_side):
+    """640x480 camera frame with a sharp, textured square 'face' of face_side pixels."""
+    rng = np.random.default_rng(0)
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    texture = cv2.GaussianBlur(rng.integers(0, 256, (face_side, face_side, 3), dtype=np.uint8), (3, 3), 0)
+    top, left = 150, 250
+    frame[top:top + face_side, left:left + face_side] = texture
+    return frame, (top, left + face_side, top + face_side, left)
+
+
+def detect_at(frame, box, scale):
+    """The frame and box as the live loop sees them after resizing by `scale`."""
+    small = cv2.resize(frame, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2RGB), tuple(int(round(v * scale)) for v in box)
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_classroom_face_passes_at_every_governor_scale(scale):
+    frame, box = camera_frame(100)
+    rgb, small_box = detect_at(frame, box, scale)
+    assert FaceQualityGate(min_score=0.5).assess(rgb, [small_box], scale=scale) == [(True, "encoded")]
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_tiny_face_is_rejected_at_every_governor_scale(scale):
+    frame, box = camera_frame(40)
+    rgb, small_box = detect_at(frame, box, scale)
+    assert FaceQualityGate(min_score=0.5).assess(rgb, [small_box], scale=scale) == [(False, "too_small")]
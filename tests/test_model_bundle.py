@@ -0,0 +1,26 @@
+import numpy as np
+
+from app.services.model_bundle import ModelBundle
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "bundle.npz")
+    embeddings = np.random.default_rng(0).normal(size=(6, 128))
+    ModelBundle(embeddings, np.array([0, 0, 1, 1, 2, 2]), np.array(["a", "b", "c"]),
+                thresholds={"distance_threshold": 0.5}).save(path)
+
+    bundle = ModelBundle.load(path)
+    np.testing.assert_array_equal(bundle.embeddings, embeddings)
+    assert list(bundle.names) == ["a", "a", "b", "b", "c", "c"]
+    assert bundle.thresholds == {"distance_threshold": 0.5}
+    assert bundle.sha256
+
+
+def test_empty_gallery_round_trip(tmp_path):
+    path = str(tmp_path / "bundle.npz")
+    ModelBundle(np.zeros((0, 128)), np.array([], dtype=np.int32), np.array([], dtype=np.str_)).save(path)
+
+    for mmap in (True, False):
+        bundle = ModelBundle.load(path, mmap=mmap)
+        assert bundle.embeddings.shape == (0, 128)
+        assert len(bundle.labels) == 0 and len(bundle.names) == 0
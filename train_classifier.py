@@ -13,13 +13,19 @@
 # the number of dimensions is greater than the number of samples—common in face recognition.
 # -----------------------------------------------------------------------------------------
 
+import os
 import pickle
 import argparse
+import time
 import numpy as np
+import sklearn
 from sklearn.preprocessing import LabelEncoder
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.model_selection import cross_val_predict, LeaveOneOut
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+from app.services.calibration_service import CalibrationService
+from app.services.matching_service import MatchingService
+from app.services.model_bundle import ModelBundle, BUNDLE_PATH
 
 # Argument Parsing
 ap = argparse.ArgumentParser()
@@ -29,6 +35,12 @@ ap.add_argument("-m", "--model", default="model/recognizer.pickle",
                 help="path to output trained model")
 ap.add_argument("-l", "--le", default="model/le.pickle",
                 help="path to output label encoder")
+ap.add_argument("-b", "--bundle", default=BUNDLE_PATH,
+                help="path to output model bundle (what the live app loads)")
+ap.add_argument("--loo-engine", choices=["vectorized", "sklearn"], default="vectorized",
+                help="'vectorized' = one blocked distance pass, 'sklearn' = cross_val_predict refits")
+ap.add_argument("--chunk-size", type=int, default=None,
+                help="rows per distance block for the vectorized LOO (default: ~64MB blocks)")
 args = vars(ap.parse_args())
 
 # Load embeddings
@@ -47,10 +59,18 @@ embeddings = np.array(data["embeddings"])
 
 # DATASET HANDLING & EVALUATION METRICS
 # We use Leave-One-Out Cross-Validation (LOO) for the evaluation report.
-print("[INFO] performing Leave-One-Out Cross-Validation for detailed report...")
-loo = LeaveOneOut()
-recognizer_eval = KNeighborsClassifier(n_neighbors=1, metric="euclidean")
-predictions = cross_val_predict(recognizer_eval, embeddings, labels, cv=loo)
+# For 1-NN, LOO is simply "the nearest *other* sample", so the vectorized engine
+# gets every prediction from one blocked pairwise-distance pass instead of N refits.
+print(f"[INFO] performing Leave-One-Out Cross-Validation ({args['loo_engine']}) for detailed report...")
+start = time.perf_counter()
+if args["loo_engine"] == "vectorized":
+    nn_idx, _ = MatchingService.leave_one_out_nearest(embeddings, chunk_size=args["chunk_size"])
+    predictions = labels[nn_idx]
+else:
+    loo = LeaveOneOut()
+    recognizer_eval = KNeighborsClassifier(n_neighbors=1, metric="euclidean")
+    predictions = cross_val_predict(recognizer_eval, embeddings, labels, cv=loo)
+print(f"[INFO] LOO evaluation took {time.perf_counter() - start:.3f}s for {len(labels)} samples")
 
 # TRAIN FINAL MODEL ON ALL DATA
 print("[INFO] training final KNN classifier on full dataset...")
@@ -80,14 +100,20 @@ print("[METRIC] Confusion Matrix:")
 cm = confusion_matrix(labels, predictions, labels=range(len(le.classes_)))
 print(cm)
 
-print("\n[INFO] saving model and label encoder...")
-f = open(args["model"], "wb")
-f.write(pickle.dumps(recognizer))
-f.close()
+print("\n[INFO] saving model bundle, model and label encoder...")
+# Bundle: gallery + labels + thresholds in one atomically replaced, checksummed file
+ModelBundle(embeddings, labels, le.classes_,
+            thresholds=CalibrationService.load_thresholds(),
+            metadata={"classifier": "knn", "samples": int(len(labels)), "classes": int(len(le.classes_)),
+                      "loo_accuracy": round(float(acc), 4), "source": args["embeddings"],
+                      "sklearn": sklearn.__version__}).save(args["bundle"])
 
-f = open(args["le"], "wb")
-f.write(pickle.dumps(le))
-f.close()
+# The pickles are still written for the 'svm' engine and older tools; replace them atomically too
+for path, obj in ((args["model"], recognizer), (args["le"], le)):
+    with open(path + ".tmp", "wb") as f:
+        f.write(pickle.dumps(obj))
+    os.replace(path + ".tmp", path)
 
+print(f"[INFO] Bundle saved to {args['bundle']}")
 print(f"[INFO] Model saved to {args['model']}")
 print("[RESEARCH NOTE] The model is now ready for real-time inference.")
@@ -1,86 +1,166 @@
 import os
 import cv2
+import hashlib
+import argparse
 import numpy as np
 import pickle
+from concurrent.futures import ProcessPoolExecutor
 
 # Paths
 IMAGE_DIR = "model/student_images"
 MODEL_PATH = "model/lbph_model.yml"
 LABELS_PATH = "model/lbph_labels.pkl"
+CACHE_PATH = "model/lbph_crop_cache.pkl"       # image hash -> 200x200 face crop (or None)
+MANIFEST_PATH = "model/lbph_manifest.pkl"      # (name, image hash) pairs in the saved model
 
-# Haar cascade for cropping faces from training images
-haar_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-face_cascade = cv2.CascadeClassifier(haar_path)
+face_size = (200, 200)
+# Changing the detector settings below invalidates every cached crop.
+CROP_VERSION = "haar_default/1.2/5/200"
 
-if face_cascade.empty():
-    print("[ERROR] Could not load Haar cascade.")
-    exit(1)
+face_cascade = None
 
-images = []
-labels = []
-label_names = []   # index -> name
 
-face_size = (200, 200)
-current_label = 0
+def init_worker():
+    # Haar cascade for cropping faces from training images (loaded once per process)
+    global face_cascade
+    haar_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+    face_cascade = cv2.CascadeClassifier(haar_path)
 
-for name in os.listdir(IMAGE_DIR):
-    if name.startswith("."):
-        continue
 
-    folder = os.path.join(IMAGE_DIR, name)
-    if not os.path.isdir(folder):
-        continue
+def crop_face(img_path):
+    img = cv2.imread(img_path)
+    if img is None:
+        return img_path, None, "Could not read image"
 
-    print(f"[INFO] Processing person: {name}")
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
-    for img_name in os.listdir(folder):
-        if img_name.startswith("."):
-            continue
+    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5)
+    if len(faces) == 0:
+        return img_path, None, "No face found"
 
-        img_path = os.path.join(folder, img_name)
-        img = cv2.imread(img_path)
+    # take the first detected face
+    (x, y, w, h) = faces[0]
+    face_roi = gray[y:y + h, x:x + w]
+    return img_path, cv2.resize(face_roi, face_size), None
 
-        if img is None:
-            print("  [WARN] Could not read image:", img_path)
-            continue
 
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+def image_hash(img_path):
+    with open(img_path, "rb") as f:
+        return hashlib.sha1(CROP_VERSION.encode() + f.read()).hexdigest()
 
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5)
-        if len(faces) == 0:
-            print("  [WARN] No face found in:", img_name)
-            continue
 
-        # take the first detected face
-        (x, y, w, h) = faces[0]
-        face_roi = gray[y:y + h, x:x + w]
-        face_roi = cv2.resize(face_roi, face_size)
+def load_pickle(path, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"[WARN] Ignoring unreadable {path}: {e}")
+        return default
 
-        images.append(face_roi)
-        labels.append(current_label)
 
-    if images:
-        label_names.append(name)
-        current_label += 1
+def save_pickle(obj, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(obj, f)
+    os.replace(tmp_path, path)
 
-if len(images) == 0:
-    print("[ERROR] No training images found with faces.")
-    exit(1)
 
-print(f"[INFO] Total training samples: {len(images)}")
-images = np.array(images, dtype="uint8")
-labels = np.array(labels, dtype="int32")
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--full", action="store_true",
+                    help="retrain from scratch instead of updating the saved model")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count(),
+                    help="processes used for face cropping")
+    args = vars(ap.parse_args())
 
-# Create and train LBPH recognizer
-recognizer = cv2.face.LBPHFaceRecognizer_create()
-recognizer.train(images, labels)
+    init_worker()
+    if face_cascade.empty():
+        print("[ERROR] Could not load Haar cascade.")
+        exit(1)
 
-os.makedirs("model", exist_ok=True)
-recognizer.write(MODEL_PATH)
+    # 1. Collect images and their content hashes
+    entries = []   # (name, image path, hash)
+    for name in sorted(os.listdir(IMAGE_DIR)):
+        if name.startswith("."):
+            continue
 
-with open(LABELS_PATH, "wb") as f:
-    pickle.dump(label_names, f)
+        folder = os.path.join(IMAGE_DIR, name)
+        if not os.path.isdir(folder):
+            continue
 
-print("[INFO] Training complete.")
-print("[INFO] Saved model to", MODEL_PATH)
-print("[INFO] Saved label mapping to", LABELS_PATH)
+        for img_name in sorted(os.listdir(folder)):
+            if img_name.startswith("."):
+                continue
+            img_path = os.path.join(folder, img_name)
+            entries.append((name, img_path, image_hash(img_path)))
+
+    # 2. Crop only images the cache has not seen, in parallel
+    cache = load_pickle(CACHE_PATH, {})
+    todo = [path for (_, path, h) in entries if h not in cache]
+    print(f"[INFO] {len(entries)} images, {len(entries) - len(todo)} cached, {len(todo)} to crop")
+
+    if todo:
+        path_to_hash = {path: h for (_, path, h) in entries}
+        with ProcessPoolExecutor(max_workers=args["workers"], initializer=init_worker) as pool:
+            for img_path, crop, warning in pool.map(crop_face, todo, chunksize=8):
+                if warning:
+                    print(f"  [WARN] {warning}: {img_path}")
+                cache[path_to_hash[img_path]] = crop
+
+    os.makedirs("model", exist_ok=True)
+    current_hashes = {h for (_, _, h) in entries}
+    save_pickle({h: c for h, c in cache.items() if h in current_hashes}, CACHE_PATH)
+
+    samples = [(name, h) for (name, _, h) in entries if cache[h] is not None]
+    if len(samples) == 0:
+        print("[ERROR] No training images found with faces.")
+        exit(1)
+
+    # 3. Update the saved model when images were only added, otherwise retrain
+    trained = load_pickle(MANIFEST_PATH, None)
+    incremental = (
+        not args["full"]
+        and trained is not None
+        and os.path.exists(MODEL_PATH)
+        and os.path.exists(LABELS_PATH)
+        and trained <= set(samples)
+    )
+
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    if incremental:
+        label_names = load_pickle(LABELS_PATH, [])
+        new_samples = [s for s in samples if s not in trained]
+        if not new_samples:
+            print("[INFO] Model is up to date; nothing to train.")
+            exit(0)
+        print(f"[INFO] Updating model with {len(new_samples)} new samples...")
+        recognizer.read(MODEL_PATH)
+    else:
+        label_names = []   # index -> name
+        new_samples = samples
+        print(f"[INFO] Training from scratch on {len(new_samples)} samples...")
+
+    for name, _ in new_samples:
+        if name not in label_names:
+            label_names.append(name)
+
+    images = np.array([cache[h] for (_, h) in new_samples], dtype="uint8")
+    labels = np.array([label_names.index(name) for (name, _) in new_samples], dtype="int32")
+
+    # LBPH histograms are per-sample, so update() adds new people without a full retrain
+    if incremental:
+        recognizer.update(images, labels)
+    else:
+        recognizer.train(images, labels)
+
+    recognizer.write(MODEL_PATH)
+
+    save_pickle(label_names, LABELS_PATH)
+    save_pickle(set(samples), MANIFEST_PATH)
+
+    print(f"[INFO] Total training samples: {len(samples)}")
+    print("[INFO] Training complete.")
+    print("[INFO] Saved model to", MODEL_PATH)
+    print("[INFO] Saved label mapping to", LABELS_PATH)